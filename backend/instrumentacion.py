@@ -0,0 +1,275 @@
+"""
+Instrumentación por request: consultas, tiempo en la base, consultas
+repetidas (N+1), tiempo de serialización y tamaño de la respuesta.
+
+InstrumentacionMiddleware mide una muestra de los requests
+(INSTRUMENTACION_MUESTREO) y acumula los resultados por nombre de ruta en
+`metricas`, que se exponen en GET /api/metricas/ y, si INSTRUMENTACION_LOG
+está activo, se escriben como una línea JSON por request en el logger
+"instrumentacion". Con INSTRUMENTACION_ACTIVA=False el middleware se
+descarta al iniciar (MiddlewareNotUsed), así que no agrega ningún costo.
+
+En las vistas async solo se miden el tiempo total y el tamaño: sus
+consultas corren en otro hilo, fuera del alcance de execute_wrapper.
+"""
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from usuarios.permisos import TieneRolOPermiso
+
+logger = logging.getLogger('instrumentacion')
+
+# Consultas repetidas (por firma) que guarda cada ruta
+MAXIMO_FIRMAS = 20
+
+# Los IN (...) con distinta cantidad de valores tienen la misma firma
+_LISTA_PARAMETROS = re.compile(r'%s(?:\s*,\s*%s)+')
+
+_medicion_actual = ContextVar('medicion_actual', default=None)
+
+
+def firma_consulta(sql):
+    """SQL sin la cantidad de parámetros de las listas, para agrupar consultas iguales"""
+    return _LISTA_PARAMETROS.sub('%s, ...', sql)
+
+
+class Medicion:
+    """Lo registrado durante un request muestreado"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.firmas = {}
+        self.tiempo_serializacion = 0.0
+        self._serializando = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django: se llama por cada consulta
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_db += time.perf_counter() - inicio
+            self.consultas += 1
+            firma = firma_consulta(sql)
+            self.firmas[firma] = self.firmas.get(firma, 0) + 1
+
+    def repetidas(self):
+        minimo = settings.INSTRUMENTACION_REPETICIONES_N1
+        return {firma: veces for firma, veces in self.firmas.items() if veces >= minimo}
+
+
+_data_original = None
+
+
+def instalar_medicion_serializers():
+    """
+    Medir el tiempo de `serializer.data` de DRF en los requests muestreados.
+    Solo cuenta el serializer más externo (los anidados ya están incluidos).
+    """
+    global _data_original
+    from rest_framework.serializers import BaseSerializer
+
+    if _data_original is not None:
+        return
+    _data_original = BaseSerializer.data.fget
+
+    def data(self):
+        medicion = _medicion_actual.get()
+        if medicion is None or medicion._serializando:
+            return _data_original(self)
+        medicion._serializando = True
+        inicio = time.perf_counter()
+        try:
+            return _data_original(self)
+        finally:
+            medicion.tiempo_serializacion += time.perf_counter() - inicio
+            medicion._serializando = False
+
+    BaseSerializer.data = property(data)
+
+
+class MetricasEndpoints:
+    """Acumulado por nombre de ruta de los requests medidos en este proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._rutas = {}
+
+    def _ruta(self, nombre):
+        if nombre not in self._rutas:
+            self._rutas[nombre] = {
+                'solicitudes': 0,
+                'muestreadas': 0,
+                'tiempo_total_ms': 0.0,
+                'tiempo_max_ms': 0.0,
+                'consultas': 0,
+                'consultas_max': 0,
+                'tiempo_db_ms': 0.0,
+                'tiempo_serializacion_ms': 0.0,
+                'bytes': 0,
+                'con_repetidas': 0,
+                'repetidas': {},
+            }
+        return self._rutas[nombre]
+
+    def registrar_solicitud(self, nombre):
+        with self._lock:
+            self._ruta(nombre)['solicitudes'] += 1
+
+    def registrar(self, nombre, registro):
+        with self._lock:
+            ruta = self._ruta(nombre)
+            ruta['muestreadas'] += 1
+            ruta['tiempo_total_ms'] += registro['tiempo_ms']
+            ruta['tiempo_max_ms'] = max(ruta['tiempo_max_ms'], registro['tiempo_ms'])
+            ruta['bytes'] += registro['bytes'] or 0
+            if registro['consultas'] is None:
+                return
+            ruta['consultas'] += registro['consultas']
+            ruta['consultas_max'] = max(ruta['consultas_max'], registro['consultas'])
+            ruta['tiempo_db_ms'] += registro['tiempo_db_ms']
+            ruta['tiempo_serializacion_ms'] += registro['tiempo_serializacion_ms']
+            if registro['repetidas']:
+                ruta['con_repetidas'] += 1
+            repetidas = ruta['repetidas']
+            for firma, veces in registro['repetidas'].items():
+                if firma in repetidas or len(repetidas) < MAXIMO_FIRMAS:
+                    repetidas[firma] = max(repetidas.get(firma, 0), veces)
+
+    def resumen(self):
+        with self._lock:
+            resumen = {}
+            for nombre, ruta in self._rutas.items():
+                medidas = ruta['muestreadas'] or 1
+                resumen[nombre] = {
+                    'solicitudes': ruta['solicitudes'],
+                    'muestreadas': ruta['muestreadas'],
+                    'tiempo_promedio_ms': round(ruta['tiempo_total_ms'] / medidas, 2),
+                    'tiempo_max_ms': round(ruta['tiempo_max_ms'], 2),
+                    'consultas_promedio': round(ruta['consultas'] / medidas, 2),
+                    'consultas_max': ruta['consultas_max'],
+                    'tiempo_db_promedio_ms': round(ruta['tiempo_db_ms'] / medidas, 2),
+                    'tiempo_serializacion_promedio_ms': round(ruta['tiempo_serializacion_ms'] / medidas, 2),
+                    'bytes_promedio': round(ruta['bytes'] / medidas),
+                    'muestras_con_repetidas': ruta['con_repetidas'],
+                    # Las firmas más repetidas primero: las candidatas a N+1
+                    'repetidas': dict(sorted(ruta['repetidas'].items(), key=lambda item: -item[1])),
+                }
+            return dict(sorted(resumen.items(), key=lambda item: -item[1]['consultas_promedio']))
+
+
+metricas = MetricasEndpoints()
+
+
+def _nombre_ruta(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    return coincidencia.view_name if coincidencia and coincidencia.view_name else 'sin_ruta'
+
+
+def _tamano(response):
+    return None if response.streaming else len(response.content)
+
+
+class InstrumentacionMiddleware:
+    """
+    Medir una muestra de los requests (ver el docstring del módulo). Va primero
+    en MIDDLEWARE para que el tiempo incluya a los demás middlewares.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTACION_ACTIVA:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        instalar_medicion_serializers()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= settings.INSTRUMENTACION_MUESTREO:
+            response = self.get_response(request)
+            metricas.registrar_solicitud(_nombre_ruta(request))
+            return response
+
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion))
+                response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        self._registrar(request, response, time.perf_counter() - inicio, medicion)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= settings.INSTRUMENTACION_MUESTREO:
+            response = await self.get_response(request)
+            metricas.registrar_solicitud(_nombre_ruta(request))
+            return response
+
+        inicio = time.perf_counter()
+        response = await self.get_response(request)
+        self._registrar(request, response, time.perf_counter() - inicio, None)
+        return response
+
+    def _registrar(self, request, response, duracion, medicion):
+        nombre = _nombre_ruta(request)
+        registro = {
+            'ruta': nombre,
+            'metodo': request.method,
+            'estado': response.status_code,
+            'tiempo_ms': round(duracion * 1000, 2),
+            'bytes': _tamano(response),
+            'consultas': medicion.consultas if medicion else None,
+            'tiempo_db_ms': round(medicion.tiempo_db * 1000, 2) if medicion else None,
+            'tiempo_serializacion_ms': round(medicion.tiempo_serializacion * 1000, 2) if medicion else None,
+            'repetidas': medicion.repetidas() if medicion else {},
+        }
+        metricas.registrar_solicitud(nombre)
+        metricas.registrar(nombre, registro)
+        if settings.INSTRUMENTACION_LOG:
+            logger.info(json.dumps(registro, ensure_ascii=False))
+
+
+class MetricasInstrumentacionView(APIView):
+    """Métricas por ruta de los requests medidos en este proceso. DELETE las reinicia."""
+    permission_classes = [TieneRolOPermiso]
+    roles_permitidos = ("ADMINISTRADOR",)
+
+    def get(self, request):
+        return Response({
+            'activa': settings.INSTRUMENTACION_ACTIVA,
+            'muestreo': settings.INSTRUMENTACION_MUESTREO,
+            # Cada worker acumula sus propias métricas: el resultado es del proceso que atendió el request
+            'alcance': 'proceso',
+            'pid': os.getpid(),
+            'rutas': metricas.resumen(),
+        })
+
+    def delete(self, request):
+        metricas.reiniciar()
+        return Response(status=204)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class PaginacionCursor(CursorPagination):
+    """
+    Paginación por cursor (keyset) para los listados de tablas grandes.
+
+    Ordena por la clave primaria, que siempre está indexada, por lo que cada
+    página es una consulta por rango sin OFFSET. El cliente puede elegir el
+    tamaño de página con ?page_size= hasta PAGINACION_TAMANO_MAXIMO.
+    """
+    ordering = '-id'
+    page_size = settings.PAGINACION_TAMANO
+    page_size_query_param = 'page_size'
+    max_page_size = settings.PAGINACION_TAMANO_MAXIMO
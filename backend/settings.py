@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "rest_framework_simplejwt",
+    "rest_framework_simplejwt.token_blacklist",
     "drf_yasg",
     "corsheaders",
     "usuarios",
@@ -60,6 +62,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.instrumentacion.InstrumentacionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -68,6 +71,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "seguimiento.middleware.RecalculoDiferidoMiddleware",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -154,12 +158,95 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "usuarios.Usuario"
 
+# La cache solo es compartida entre procesos con Redis (REDIS_URL, ver CACHES).
+# En memoria local cada proceso tiene la suya: lo que se descarta en uno sigue
+# guardado en los demás hasta que vence.
+CACHE_COMPARTIDA = bool(os.getenv("REDIS_URL"))
+
+# Autenticación JWT sin consultar el usuario en cada request (ver usuarios/autenticacion.py).
+# request.user es un usuario liviano armado con los claims del token. Requiere
+# cache compartida: si no, desactivar un usuario en un proceso no invalida sus
+# tokens en los demás.
+JWT_SIN_CONSULTA = os.getenv("JWT_SIN_CONSULTA") == "True"
+if JWT_SIN_CONSULTA and not CACHE_COMPARTIDA:
+    raise ImproperlyConfigured("JWT_SIN_CONSULTA=True requiere una cache compartida: defina REDIS_URL")
+# Tiempo (segundos) que se guarda la versión de sesión de cada usuario; se
+# descarta antes si el usuario cambia la contraseña, el email o se desactiva
+JWT_SIN_CONSULTA_CACHE_TIMEOUT = int(os.getenv("JWT_SIN_CONSULTA_CACHE_TIMEOUT", str(60 * 60)))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "usuarios.autenticacion.JWTSinConsulta"
+        if JWT_SIN_CONSULTA
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
 }
 
+# Paginación por cursor de los listados grandes (ver backend/paginacion.py).
+# Los catálogos pequeños (tipos de examen, turnos, roles...) no se paginan.
+PAGINACION_TAMANO = int(os.getenv("PAGINACION_TAMANO", "50"))
+PAGINACION_TAMANO_MAXIMO = int(os.getenv("PAGINACION_TAMANO_MAXIMO", "500"))
+
+# Microservicio de predicción de notas (Machine Learning)
+ML_PREDICCION_URL = os.getenv("ML_PREDICCION_URL", "http://localhost:8000/api/v1/predecir/")
+# Endpoint opcional que recibe una lista de entradas y devuelve una lista de predicciones
+ML_PREDICCION_LOTE_URL = os.getenv("ML_PREDICCION_LOTE_URL", "")
+ML_PREDICCION_TAMANO_LOTE = int(os.getenv("ML_PREDICCION_TAMANO_LOTE", "50"))
+ML_PREDICCION_CONCURRENCIA = int(os.getenv("ML_PREDICCION_CONCURRENCIA", "8"))
+# Conexiones simultáneas del cliente async (vistas ASGI) por proceso
+ML_PREDICCION_CONEXIONES_ASYNC = int(os.getenv("ML_PREDICCION_CONEXIONES_ASYNC", "200"))
+# Timeouts (segundos): para abrir la conexión y para esperar la respuesta
+ML_PREDICCION_TIMEOUT_CONEXION = float(os.getenv("ML_PREDICCION_TIMEOUT_CONEXION", "2"))
+ML_PREDICCION_TIMEOUT = float(os.getenv("ML_PREDICCION_TIMEOUT", "10"))
+# Circuit breaker: fallos consecutivos que lo abren y segundos que permanece abierto
+ML_PREDICCION_FALLOS_APERTURA = int(os.getenv("ML_PREDICCION_FALLOS_APERTURA", "5"))
+ML_PREDICCION_ESPERA_CIRCUITO = float(os.getenv("ML_PREDICCION_ESPERA_CIRCUITO", "30"))
+# Proporción máxima de reintentos respecto del total de solicitudes
+ML_PREDICCION_PROPORCION_REINTENTOS = float(os.getenv("ML_PREDICCION_PROPORCION_REINTENTOS", "0.1"))
+# Tiempo (segundos) que se guarda una predicción; se descarta antes si cambian las notas
+ML_PREDICCION_CACHE_TIMEOUT = int(os.getenv("ML_PREDICCION_CACHE_TIMEOUT", str(60 * 60 * 24)))
+
+# Tiempo (segundos) que se guarda el horario semanal de un docente; se descarta
+# antes si cambian sus asignaciones, los horarios, las materias o los cursos.
+# Sin cache compartida el descarte solo llega al proceso que hizo el cambio: el
+# tiempo se limita a HORARIO_DOCENTE_CACHE_TIMEOUT_LOCAL
+HORARIO_DOCENTE_CACHE_TIMEOUT = int(os.getenv("HORARIO_DOCENTE_CACHE_TIMEOUT", str(60 * 60 * 24)))
+if not CACHE_COMPARTIDA:
+    HORARIO_DOCENTE_CACHE_TIMEOUT = min(
+        HORARIO_DOCENTE_CACHE_TIMEOUT, int(os.getenv("HORARIO_DOCENTE_CACHE_TIMEOUT_LOCAL", "60"))
+    )
+# Tiempo (segundos) que se guardan los horarios por día y por materia; se
+# descartan antes si cambian los horarios o las asignaciones. Sin cache
+# compartida se limita a HORARIOS_PUBLICOS_CACHE_TIMEOUT_LOCAL, como el anterior
+HORARIOS_PUBLICOS_CACHE_TIMEOUT = int(os.getenv("HORARIOS_PUBLICOS_CACHE_TIMEOUT", str(60 * 60)))
+if not CACHE_COMPARTIDA:
+    HORARIOS_PUBLICOS_CACHE_TIMEOUT = min(
+        HORARIOS_PUBLICOS_CACHE_TIMEOUT, int(os.getenv("HORARIOS_PUBLICOS_CACHE_TIMEOUT_LOCAL", "60"))
+    )
+
+# Tiempo (segundos) que se guardan los roles y permisos de cada usuario; se
+# descartan antes si cambian sus roles o los permisos de un rol. Sin cache
+# compartida ese descarte no llega a los demás procesos, así que el tiempo se
+# limita a PERMISOS_CACHE_TIMEOUT_LOCAL (lo que tarda un cambio en valer en todos)
+PERMISOS_CACHE_TIMEOUT = int(os.getenv("PERMISOS_CACHE_TIMEOUT", str(60 * 60)))
+if not CACHE_COMPARTIDA:
+    PERMISOS_CACHE_TIMEOUT = min(PERMISOS_CACHE_TIMEOUT, int(os.getenv("PERMISOS_CACHE_TIMEOUT_LOCAL", "10")))
+
+# Cache: memoria local por defecto, o Redis si se define REDIS_URL (ej: redis://localhost:6379/0)
+if CACHE_COMPARTIDA:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {
@@ -180,6 +267,46 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": "usuarios.serializers.TokenRefreshConFiltroSerializer",
+}
+
+# Filtro de tokens revocados en memoria (ver usuarios/revocacion.py). Solo se
+# usa con cache compartida; si no, cada refresh consulta la lista negra.
+# Segundos entre actualizaciones con las revocaciones de otros procesos (además
+# de cuando cambia la versión en cache) y entre reconstrucciones completas.
+REVOCACION_INTERVALO = float(os.getenv("REVOCACION_INTERVALO", "30"))
+REVOCACION_RECONSTRUCCION = float(os.getenv("REVOCACION_RECONSTRUCCION", str(60 * 60)))
+REVOCACION_FALSOS_POSITIVOS = float(os.getenv("REVOCACION_FALSOS_POSITIVOS", "0.01"))
+REVOCACION_CAPACIDAD_MINIMA = int(os.getenv("REVOCACION_CAPACIDAD_MINIMA", "10000"))
+
+# Alta masiva de usuarios (ver usuarios/altas.py): procesos que hashean las
+# contraseñas (0 = uno por CPU) y cantidad mínima de contraseñas para usarlos
+ALTAS_PROCESOS = int(os.getenv("ALTAS_PROCESOS", "0"))
+ALTAS_MINIMO_PARALELO = int(os.getenv("ALTAS_MINIMO_PARALELO", "20"))
+
+# Días de anticipación con que se marcan las matrículas por vencer
+# (ver matricula/vigencias.py y el comando revisar_vigencias)
+VIGENCIA_DIAS_AVISO = int(os.getenv("VIGENCIA_DIAS_AVISO", "7"))
+
+# Instrumentación por request (ver backend/instrumentacion.py): consultas,
+# tiempo en la base, consultas repetidas (N+1), serialización y tamaño.
+# Apagada no tiene costo; INSTRUMENTACION_MUESTREO es la proporción de
+# requests medidos y una consulta que se repite INSTRUMENTACION_REPETICIONES_N1
+# veces en un mismo request se informa como repetida.
+INSTRUMENTACION_ACTIVA = os.getenv("INSTRUMENTACION_ACTIVA") == "True"
+INSTRUMENTACION_MUESTREO = float(os.getenv("INSTRUMENTACION_MUESTREO", "0.1"))
+INSTRUMENTACION_REPETICIONES_N1 = int(os.getenv("INSTRUMENTACION_REPETICIONES_N1", "5"))
+INSTRUMENTACION_LOG = os.getenv("INSTRUMENTACION_LOG", "True") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"json": {"format": "%(message)s"}},
+    "handlers": {"instrumentacion": {"class": "logging.StreamHandler", "formatter": "json"}},
+    "loggers": {
+        # Una línea JSON por request medido
+        "instrumentacion": {"handlers": ["instrumentacion"], "level": "INFO", "propagate": False},
+    },
 }
 
 # ===============================================
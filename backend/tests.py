@@ -0,0 +1,144 @@
+from unittest import mock
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.test import TestCase, override_settings
+from django.urls import path
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from cursos.models import Curso
+from usuarios.models import Rol, Usuario
+from . import instrumentacion
+from .instrumentacion import InstrumentacionMiddleware, Medicion, instalar_medicion_serializers, metricas
+
+
+def cursos_con_estudiantes(request):
+    """Vista con un N+1 conocido: una consulta por curso para contar sus estudiantes"""
+    return JsonResponse({curso.nombre: curso.estudiantes.count() for curso in Curso.objects.all()})
+
+
+urlpatterns = [
+    path('n-mas-1/', cursos_con_estudiantes, name='n-mas-1'),
+]
+
+
+@override_settings(
+    ROOT_URLCONF='backend.tests',
+    INSTRUMENTACION_ACTIVA=True,
+    INSTRUMENTACION_MUESTREO=1,
+    INSTRUMENTACION_REPETICIONES_N1=3,
+    INSTRUMENTACION_LOG=False,
+)
+class InstrumentacionTests(TestCase):
+    """Métricas por request del middleware de instrumentación"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Curso.objects.bulk_create([Curso(nombre=f'{grado}to A') for grado in range(1, 5)])
+
+    def setUp(self):
+        metricas.reiniciar()
+        self.addCleanup(metricas.reiniciar)
+
+    def ruta(self):
+        return metricas.resumen()['n-mas-1']
+
+    def test_desactivada(self):
+        with override_settings(INSTRUMENTACION_ACTIVA=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                InstrumentacionMiddleware(lambda request: None)
+
+    def test_consultas_y_repetidas(self):
+        self.assertEqual(self.client.get('/n-mas-1/').status_code, 200)
+        ruta = self.ruta()
+        self.assertEqual((ruta['solicitudes'], ruta['muestreadas']), (1, 1))
+        self.assertEqual(ruta['consultas_max'], 5)
+        self.assertEqual(ruta['muestras_con_repetidas'], 1)
+        # Los conteos por curso comparten firma: es la consulta del N+1
+        [(firma, veces)] = ruta['repetidas'].items()
+        self.assertEqual(veces, 4)
+        self.assertIn('COUNT(*)', firma)
+
+        Curso.objects.create(nombre='5to A')
+        self.client.get('/n-mas-1/')
+        ruta = self.ruta()
+        self.assertEqual(ruta['consultas_max'], 6)
+        self.assertEqual(list(ruta['repetidas'].values()), [5])
+
+    def test_sin_repetidas_bajo_el_umbral(self):
+        with override_settings(INSTRUMENTACION_REPETICIONES_N1=10):
+            self.client.get('/n-mas-1/')
+        self.assertEqual(self.ruta()['repetidas'], {})
+
+    def test_muestreo(self):
+        with override_settings(INSTRUMENTACION_MUESTREO=0.5), \
+                mock.patch.object(instrumentacion.random, 'random', side_effect=[0.2, 0.7, 0.4, 0.9]):
+            for _ in range(4):
+                self.client.get('/n-mas-1/')
+        ruta = self.ruta()
+        self.assertEqual((ruta['solicitudes'], ruta['muestreadas']), (4, 2))
+        self.assertEqual(ruta['consultas_promedio'], 5)
+
+        metricas.reiniciar()
+        with override_settings(INSTRUMENTACION_MUESTREO=0):
+            self.client.get('/n-mas-1/')
+        self.assertEqual((self.ruta()['solicitudes'], self.ruta()['muestreadas']), (1, 0))
+
+    def test_serializacion_solo_del_serializer_externo(self):
+        reloj = [0.0]
+
+        class InternoSerializer(serializers.Serializer):
+            def to_representation(self, instancia):
+                reloj[0] += 1
+                return {}
+
+        class ExternoSerializer(serializers.Serializer):
+            interno = serializers.SerializerMethodField()
+
+            def get_interno(self, instancia):
+                # Serializer anidado a mano: su .data ya está dentro del tiempo del externo
+                return InternoSerializer(instancia).data
+
+        instalar_medicion_serializers()
+        medicion = Medicion()
+        token = instrumentacion._medicion_actual.set(medicion)
+        try:
+            with mock.patch.object(instrumentacion.time, 'perf_counter', side_effect=lambda: reloj[0]):
+                ExternoSerializer([1, 2, 3], many=True).data
+        finally:
+            instrumentacion._medicion_actual.reset(token)
+        self.assertEqual(medicion.tiempo_serializacion, 3)
+
+
+class MetricasEndpointTests(TestCase):
+    """GET /api/metricas/ solo para administradores; DELETE reinicia"""
+
+    url = '/api/metricas/'
+
+    def setUp(self):
+        self.client = APIClient()
+        metricas.reiniciar()
+        self.addCleanup(metricas.reiniciar)
+        metricas.registrar_solicitud('ruta-de-prueba')
+
+    def test_permisos(self):
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+        usuario = Usuario.objects.create(email='docente@escuela.test')
+        self.client.force_authenticate(usuario)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.delete(self.url).status_code, 403)
+        self.assertIn('ruta-de-prueba', metricas.resumen())
+
+    def test_resumen_y_reinicio(self):
+        usuario = Usuario.objects.create(email='admin@escuela.test')
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario.roles.add(Rol.objects.create(nombre='ADMINISTRADOR'))
+        self.client.force_authenticate(usuario)
+
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['alcance'], 'proceso')
+        self.assertIn('pid', respuesta.data)
+        self.assertEqual(respuesta.data['rutas']['ruta-de-prueba']['solicitudes'], 1)
+
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertEqual(self.client.get(self.url).data['rutas'], {})
@@ -20,6 +20,7 @@ from django.urls import path, include
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from backend.instrumentacion import MetricasInstrumentacionView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -39,6 +40,7 @@ urlpatterns = [
     path("api/horarios/", include("horarios.urls")),
     path("api/seguimiento/", include("seguimiento.urls")),
     path("api/matricula/", include("matricula.urls")),
+    path("api/metricas/", MetricasInstrumentacionView.as_view(), name="metricas-instrumentacion"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
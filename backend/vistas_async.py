@@ -0,0 +1,56 @@
+import functools
+import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+def _autenticacion():
+    if settings.JWT_SIN_CONSULTA:
+        from usuarios.autenticacion import JWTSinConsulta
+        return JWTSinConsulta()
+    return JWTAuthentication()
+
+
+def api_async(metodos=('POST',)):
+    """
+    Decorador para vistas async (ASGI) que llaman a servicios externos.
+
+    DRF no ejecuta vistas async, así que aquí se hace lo mínimo que hacen las
+    vistas de la API: exento de CSRF, métodos permitidos, autenticación JWT
+    (como REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES']) y lectura del
+    cuerpo (JSON o formulario) en `request.datos`. La vista retorna un JsonResponse.
+    """
+    def decorador(vista):
+        @csrf_exempt
+        @functools.wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            if request.method not in metodos:
+                return JsonResponse(
+                    {'detail': f'Método "{request.method}" no permitido.'},
+                    status=405,
+                    headers={'Allow': ', '.join(metodos)}
+                )
+
+            try:
+                autenticado = await sync_to_async(_autenticacion().authenticate)(request)
+            except AuthenticationFailed as e:
+                detalle = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+                return JsonResponse(detalle, status=401)
+            if autenticado is not None:
+                request.user, request.auth = autenticado
+
+            if request.content_type == 'application/json':
+                try:
+                    request.datos = json.loads(request.body) if request.body else {}
+                except ValueError:
+                    return JsonResponse({'success': False, 'error': 'El cuerpo de la solicitud no es JSON válido'}, status=400)
+            else:
+                request.datos = request.POST.dict()
+
+            return await vista(request, *args, **kwargs)
+        return envoltura
+    return decorador
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Curso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=20)),
+                ('turno', models.CharField(choices=[('mañana', 'Mañana'), ('tarde', 'Tarde'), ('noche', 'Noche')], default='mañana', max_length=10)),
+                ('activo', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Curso',
+                'verbose_name_plural': 'Cursos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Trimestre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50)),
+                ('fecha_inicio', models.DateField()),
+                ('fecha_fin', models.DateField()),
+            ],
+            options={
+                'verbose_name': 'Trimestre',
+                'verbose_name_plural': 'Trimestres',
+                'ordering': ['fecha_inicio'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cursos', '0001_initial'),
+        ('materias', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='materias',
+            field=models.ManyToManyField(related_name='cursos', through='materias.MateriaCurso', to='materias.materia'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='curso',
+            unique_together={('nombre', 'turno')},
+        ),
+    ]
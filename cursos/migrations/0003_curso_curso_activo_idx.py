@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cursos', '0002_initial'),
+        ('materias', '0004_materia_materia_activa_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['id'], name='curso_activo_idx'),
+        ),
+    ]
@@ -16,6 +16,9 @@ class Curso(models.Model):
 
     class Meta:
         unique_together = ("nombre", "turno")  # Permite mismo nombre en diferentes turnos
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(activo=True), name='curso_activo_idx'),
+        ]
         verbose_name = "Curso"
         verbose_name_plural = "Cursos"
 
@@ -4,33 +4,35 @@ from cursos.models import Curso
 from materias.models import Materia, MateriaCurso
 from usuarios.models import Docente
 from horarios.models import Horario
+from horarios.conflictos import (
+    bloques_propuestos, cargar_bloques, describir_choque, detectar_choques, solapamientos
+)
 
 
 class MateriaConDocenteYHorariosSerializer(serializers.Serializer):
     materia_id = serializers.PrimaryKeyRelatedField(queryset=Materia.objects.all())
-    docente_id = serializers.PrimaryKeyRelatedField(queryset=Docente.objects.all())
+    docente_id = serializers.PrimaryKeyRelatedField(queryset=Docente.objects.select_related('usuario'))
     horarios_ids = serializers.PrimaryKeyRelatedField(
         queryset=Horario.objects.all(), 
         many=True, 
         required=False, 
         allow_empty=True
     )
+    horas_semanales = serializers.IntegerField(min_value=0, required=False, default=0)
 
     def validate_horarios_ids(self, value):
         """Validar que los horarios no se solapen entre sí"""
         if not value:
             return value
             
-        for i, horario1 in enumerate(value):
-            for j, horario2 in enumerate(value[i+1:], start=i+1):
-                if horario1.dia_semana == horario2.dia_semana:
-                    if (horario1.hora_inicio < horario2.hora_fin and 
-                        horario1.hora_fin > horario2.hora_inicio):
-                        raise serializers.ValidationError(
-                            f"Horarios solapados para {horario1.dia_semana}: "
-                            f"'{horario1.nombre}' ({horario1.hora_inicio}-{horario1.hora_fin}) y "
-                            f"'{horario2.nombre}' ({horario2.hora_inicio}-{horario2.hora_fin})"
-                        )
+        errores = [
+            f"Horarios solapados para {horario1.dia_semana}: "
+            f"'{horario1.nombre}' ({horario1.hora_inicio}-{horario1.hora_fin}) y "
+            f"'{horario2.nombre}' ({horario2.hora_inicio}-{horario2.hora_fin})"
+            for horario1, horario2 in solapamientos(value)
+        ]
+        if errores:
+            raise serializers.ValidationError(errores)
         return value
 
 
@@ -47,7 +49,7 @@ class MateriaCursoReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MateriaCurso
-        fields = ['id', 'materia_id', 'materia_nombre', 'docente_id', 'docente_nombre', 'horarios']
+        fields = ['id', 'materia_id', 'materia_nombre', 'docente_id', 'docente_nombre', 'horas_semanales', 'horarios']
 
     def get_docente_nombre(self, obj):
         return f"{obj.docente.usuario.first_name} {obj.docente.usuario.last_name}"
@@ -73,97 +75,35 @@ class CursoMateriaAsignacionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("No puedes asignar la misma materia dos veces al curso")
         return value
 
-    def _validar_choques_horarios_globales(self, curso, asignaciones_nuevas):
-        """Validar choques de horarios considerando asignaciones existentes y nuevas"""
-        
-        # Obtener todos los horarios ya asignados al curso
-        horarios_existentes = Horario.objects.filter(
-            materia_cursos__curso=curso
-        ).distinct()
-        
-        # Crear lista de todos los horarios (existentes + nuevos)
-        todos_horarios = []
-        
-        # Añadir horarios existentes que NO van a ser reemplazados
+    def _validar_choques(self, curso, asignaciones_nuevas):
+        """
+        Validar que las nuevas asignaciones no choquen con los horarios del curso
+        ni con los de sus docentes en cualquier curso. Informa todos los choques.
+        """
         materias_nuevas_ids = {item['materia_id'].id for item in asignaciones_nuevas}
-        for horario in horarios_existentes:
-            # Solo incluir si no está siendo reemplazado por una nueva asignación
-            materias_curso_del_horario = horario.materia_cursos.filter(curso=curso)
-            if not any(mc.materia.id in materias_nuevas_ids for mc in materias_curso_del_horario):
-                todos_horarios.append({
-                    'dia_semana': horario.dia_semana,
-                    'hora_inicio': horario.hora_inicio,
-                    'hora_fin': horario.hora_fin,
-                    'nombre': horario.nombre,
-                    'tipo': 'existente'
-                })
+        docentes_ids = {item['docente_id'].id for item in asignaciones_nuevas}
         
-        # Añadir horarios nuevos
+        # Horarios ya asignados al curso y a los docentes (una consulta),
+        # sin los de materias del curso que se reemplazan
+        bloques = [
+            bloque for bloque in cargar_bloques(cursos_ids=[curso.id], docentes_ids=docentes_ids)
+            if not (bloque.curso_id == curso.id and bloque.materia_id in materias_nuevas_ids)
+        ]
         for asignacion in asignaciones_nuevas:
-            for horario in asignacion.get('horarios_ids', []):
-                todos_horarios.append({
-                    'dia_semana': horario.dia_semana,
-                    'hora_inicio': horario.hora_inicio,
-                    'hora_fin': horario.hora_fin,
-                    'nombre': horario.nombre,
-                    'tipo': 'nuevo'
-                })
+            bloques.extend(bloques_propuestos(
+                asignacion.get('horarios_ids', []), asignacion['materia_id'], curso, asignacion['docente_id']
+            ))
         
-        # Verificar choques entre todos los horarios
-        for i, horario1 in enumerate(todos_horarios):
-            for j, horario2 in enumerate(todos_horarios[i+1:], start=i+1):
-                if horario1['dia_semana'] == horario2['dia_semana']:
-                    if (horario1['hora_inicio'] < horario2['hora_fin'] and 
-                        horario1['hora_fin'] > horario2['hora_inicio']):
-                        raise serializers.ValidationError(
-                            f"Choque de horarios detectado en {horario1['dia_semana']}: "
-                            f"'{horario1['nombre']}' ({horario1['hora_inicio']}-{horario1['hora_fin']}) "
-                            f"vs '{horario2['nombre']}' ({horario2['hora_inicio']}-{horario2['hora_fin']})"
-                        )
-
-    def _validar_choques_docente_global(self, asignaciones_nuevas):
-        """Validar que el docente no tenga choques de horarios con sus otras asignaciones en cualquier curso"""
-        
-        for asignacion in asignaciones_nuevas:
-            docente = asignacion['docente_id']
-            horarios_nuevos = asignacion.get('horarios_ids', [])
-            
-            # Obtener TODOS los horarios actuales del docente en cualquier curso
-            horarios_docente_existentes = Horario.objects.filter(
-                materia_cursos__docente=docente
-            ).distinct()
-            
-            # Verificar cada horario nuevo contra los existentes del docente
-            for horario_nuevo in horarios_nuevos:
-                for horario_existente in horarios_docente_existentes:
-                    # Verificar si son el mismo día de la semana
-                    if horario_nuevo.dia_semana == horario_existente.dia_semana:
-                        # Verificar si hay solapamiento de horarios
-                        if (horario_nuevo.hora_inicio < horario_existente.hora_fin and 
-                            horario_nuevo.hora_fin > horario_existente.hora_inicio):
-                            
-                            # Obtener información de la materia y curso del horario existente
-                            materia_curso_existente = horario_existente.materia_cursos.filter(docente=docente).first()
-                            if materia_curso_existente:
-                                raise serializers.ValidationError(
-                                    f"CHOQUE DE DOCENTE: El docente {docente.usuario.first_name} {docente.usuario.last_name} "
-                                    f"ya tiene asignado el horario '{horario_existente.nombre}' "
-                                    f"({horario_existente.hora_inicio}-{horario_existente.hora_fin}) "
-                                    f"el {horario_existente.dia_semana} para la materia '{materia_curso_existente.materia.nombre}' "
-                                    f"en el curso '{materia_curso_existente.curso.nombre} - {materia_curso_existente.curso.turno}'. "
-                                    f"No puede ser asignado al horario '{horario_nuevo.nombre}' "
-                                    f"({horario_nuevo.hora_inicio}-{horario_nuevo.hora_fin}) al mismo tiempo."
-                                )
+        choques = detectar_choques(bloques, solo_nuevos=True)
+        if choques:
+            raise serializers.ValidationError([describir_choque(choque) for choque in choques])
 
     @transaction.atomic
     def update(self, instance, validated_data):
         asignaciones = validated_data.pop("asignaciones", [])
         
-        # Validar choques de horarios globales antes de hacer cambios
-        self._validar_choques_horarios_globales(instance, asignaciones)
-        
-        # Validar choques de horarios del docente con sus otras asignaciones en cualquier curso
-        self._validar_choques_docente_global(asignaciones)
+        # Validar choques de horarios en el curso y de los docentes en cualquier curso
+        self._validar_choques(instance, asignaciones)
         
         # Validar que no se intente agregar materias que ya existen
         materias_existentes = MateriaCurso.objects.filter(curso=instance).values_list('materia_id', flat=True)
@@ -186,7 +126,8 @@ class CursoMateriaAsignacionSerializer(serializers.ModelSerializer):
             materia_curso = MateriaCurso.objects.create(
                 curso=instance,
                 materia=materia,
-                docente=docente
+                docente=docente,
+                horas_semanales=asignacion.get('horas_semanales', 0)
             )
             
             # Asignar horarios usando M2M
@@ -3,6 +3,9 @@ from cursos.models import Curso
 from materias.serializers import MateriaSerializer
 from materias.models import MateriaCurso, Materia
 from horarios.models import Horario
+from horarios.conflictos import (
+    CHOQUE_DOCENTE, bloques_propuestos, cargar_bloques, describir_choque, detectar_choques
+)
 from django.db.models import Q
 
 
@@ -55,28 +58,19 @@ class AsignarDocenteSerializer(serializers.Serializer):
         docente_id = data['docente_id']
         materia_curso = self.instance  # La instancia actual de MateriaCurso
 
-        # Si la materia ya tiene horarios asignados, verificar conflictos
-        if materia_curso.horarios.exists():
-            # Buscar otras materias que dicta el docente
-            otras_materias = MateriaCurso.objects.filter(
-                docente_id=docente_id
-            ).exclude(id=materia_curso.id)
-
-            # Verificar conflictos de horario
-            for horario in materia_curso.horarios.all():
-                conflictos = otras_materias.filter(
-                    horarios__dia_semana=horario.dia_semana,
-                    horarios__hora_inicio__lt=horario.hora_fin,
-                    horarios__hora_fin__gt=horario.hora_inicio
-                )
-                
-                if conflictos.exists():
-                    conflicto = conflictos.first()
-                    raise serializers.ValidationError(
-                        f"El docente ya tiene asignada la materia '{conflicto.materia.nombre}' "
-                        f"en el curso '{conflicto.curso.nombre}' durante el horario "
-                        f"{horario.dia_semana} de {horario.hora_inicio} a {horario.hora_fin}"
-                    )
+        # Horarios de esta materia (pasan al nuevo docente) y del docente en
+        # sus otras materias, en una sola consulta
+        bloques = [
+            bloque._replace(docente_id=docente_id, docente=None, nuevo=True)
+            if bloque.asignacion == materia_curso.id else bloque
+            for bloque in cargar_bloques(docentes_ids=[docente_id], materia_curso_ids=[materia_curso.id])
+        ]
+        choques = [
+            choque for choque in detectar_choques(bloques, solo_nuevos=True)
+            if choque.tipo == CHOQUE_DOCENTE
+        ]
+        if choques:
+            raise serializers.ValidationError([describir_choque(choque) for choque in choques])
 
         return data
 
@@ -94,39 +88,28 @@ class AsignarHorariosSerializer(serializers.Serializer):
 
     def validate_horarios_ids(self, value):
         # Verificar que todos los horarios existan y estén activos
-        horarios = Horario.objects.filter(id__in=value, activo=True)
-        if len(horarios) != len(value):
+        self._horarios = list(Horario.objects.filter(id__in=value, activo=True))
+        if len(self._horarios) != len(value):
             raise serializers.ValidationError("Uno o más horarios no existen o están inactivos")
         return value
 
     def validate(self, data):
-        horarios_ids = data['horarios_ids']
         materia_curso = self.instance  # La instancia actual de MateriaCurso
-        nuevos_horarios = Horario.objects.filter(id__in=horarios_ids)
-
-        # Si hay un docente asignado, verificar conflictos
-        if materia_curso.docente:
-            # Buscar otras materias que dicta el docente
-            otras_materias = MateriaCurso.objects.filter(
-                docente=materia_curso.docente
-            ).exclude(id=materia_curso.id)
-
-            # Verificar conflictos para cada nuevo horario
-            for horario in nuevos_horarios:
-                conflictos = otras_materias.filter(
-                    horarios__dia_semana=horario.dia_semana,
-                    horarios__hora_inicio__lt=horario.hora_fin,
-                    horarios__hora_fin__gt=horario.hora_inicio
-                )
-                
-                if conflictos.exists():
-                    conflicto = conflictos.first()
-                    raise serializers.ValidationError(
-                        f"El docente {materia_curso.docente.usuario.get_full_name()} "
-                        f"ya tiene asignada la materia '{conflicto.materia.nombre}' "
-                        f"en el curso '{conflicto.curso.nombre}' durante el horario "
-                        f"{horario.dia_semana} de {horario.hora_inicio} a {horario.hora_fin}"
-                    )
+
+        # Los nuevos horarios reemplazan a los actuales: se comparan con los de
+        # las otras materias del curso y del docente (una consulta)
+        bloques = cargar_bloques(
+            cursos_ids=[materia_curso.curso_id],
+            docentes_ids=[materia_curso.docente_id],
+            excluir_materia_curso_ids=[materia_curso.id],
+        )
+        bloques.extend(bloques_propuestos(
+            self._horarios, materia_curso.materia, materia_curso.curso, materia_curso.docente,
+            asignacion=materia_curso.id
+        ))
+        choques = detectar_choques(bloques, solo_nuevos=True)
+        if choques:
+            raise serializers.ValidationError([describir_choque(choque) for choque in choques])
 
         return data
 
@@ -55,7 +55,9 @@ class CursoViewSet(viewsets.ModelViewSet):
         """Asignar un docente a una materia específica del curso"""
         try:
             curso = self.get_object()
-            materia_curso = MateriaCurso.objects.get(curso=curso, materia_id=materia_id)
+            materia_curso = MateriaCurso.objects.select_related(
+                'materia', 'curso', 'docente__usuario'
+            ).get(curso=curso, materia_id=materia_id)
             
             serializer = AsignarDocenteSerializer(materia_curso, data=request.data)
             serializer.is_valid(raise_exception=True)
@@ -76,7 +78,9 @@ class CursoViewSet(viewsets.ModelViewSet):
         """Asignar horarios a una materia específica del curso"""
         try:
             curso = self.get_object()
-            materia_curso = MateriaCurso.objects.get(curso=curso, materia_id=materia_id)
+            materia_curso = MateriaCurso.objects.select_related(
+                'materia', 'curso', 'docente__usuario'
+            ).get(curso=curso, materia_id=materia_id)
             
             serializer = AsignarHorariosSerializer(materia_curso, data=request.data)
             serializer.is_valid(raise_exception=True)
@@ -0,0 +1,126 @@
+from collections import defaultdict
+from cursos.models import Curso
+from materias.models import Materia, MateriaCurso
+from usuarios.models import Docente
+from .conflictos import bloques_propuestos, cargar_bloques, detectar_choques
+from .models import Horario
+
+
+class AgendaEscolar:
+    """
+    Foto en memoria de los horarios de toda la escuela: materias-curso,
+    horarios, docentes, materias y cursos, cargados una sola vez (una consulta por tabla),
+    con los bloques indexados por curso y por docente.
+
+    Sirve para auditar la escuela completa y para simular cambios sin tocar
+    la base de datos.
+    """
+
+    def __init__(self, bloques, horarios, materias_curso, docentes, materias, cursos):
+        self.bloques = bloques
+        self.horarios = horarios
+        self.materias_curso = materias_curso
+        self.docentes = docentes
+        self.materias = materias
+        self.cursos = cursos
+
+        self.por_asignacion = defaultdict(list)
+        for bloque in bloques:
+            self.por_asignacion[bloque.asignacion].append(bloque)
+        self.por_curso_y_materia = {
+            (materia_curso.curso_id, materia_curso.materia_id): materia_curso
+            for materia_curso in materias_curso.values()
+        }
+
+    @classmethod
+    def cargar(cls):
+        materias_curso = MateriaCurso.objects.filter(activo=True).select_related('materia', 'curso')
+        return cls(
+            bloques=cargar_bloques(todos=True, solo_activos=True),
+            horarios=Horario.objects.filter(activo=True).in_bulk(),
+            materias_curso={materia_curso.id: materia_curso for materia_curso in materias_curso},
+            docentes=Docente.objects.select_related('usuario').in_bulk(),
+            materias=Materia.objects.filter(activo=True).in_bulk(),
+            cursos=Curso.objects.filter(activo=True).in_bulk(),
+        )
+
+    def choques(self):
+        """Todos los choques de curso y de docente de la escuela"""
+        return detectar_choques(self.bloques)
+
+    def simular(self, cambios):
+        """
+        Aplicar en memoria una lista de cambios y devolver (errores, choques).
+
+        Cada cambio indica la materia-curso (`materia_curso_id`, o `curso_id` y
+        `materia_id` para una asignación nueva) y lo que cambia: `docente_id`
+        y/o `horarios_ids` (reemplaza todos sus horarios). Los choques son solo
+        los que involucran a las materias-curso modificadas.
+        """
+        errores = []
+        por_asignacion = dict(self.por_asignacion)
+        cursos_afectados = set()
+        docentes_afectados = set()
+        modificadas = set()
+
+        for indice, cambio in enumerate(cambios, start=1):
+            resultado = self._resolver_cambio(cambio, por_asignacion)
+            if isinstance(resultado, str):
+                errores.append(f"Cambio {indice}: {resultado}")
+                continue
+            asignacion, nuevos = resultado
+            if asignacion in modificadas:
+                errores.append(f"Cambio {indice}: la materia-curso aparece en más de un cambio")
+                continue
+            modificadas.add(asignacion)
+            for bloque in por_asignacion.get(asignacion, []) + nuevos:
+                cursos_afectados.add(bloque.curso_id)
+                docentes_afectados.add(bloque.docente_id)
+            por_asignacion[asignacion] = nuevos
+
+        if errores:
+            return errores, []
+
+        docentes_afectados.discard(None)
+        bloques = [
+            bloque
+            for grupo in por_asignacion.values()
+            for bloque in grupo
+            if bloque.curso_id in cursos_afectados or bloque.docente_id in docentes_afectados
+        ]
+        return [], detectar_choques(bloques, solo_nuevos=True)
+
+    def _resolver_cambio(self, cambio, por_asignacion):
+        """Bloques propuestos de un cambio, o un mensaje de error"""
+        materia_curso_id = cambio.get('materia_curso_id')
+        if materia_curso_id:
+            materia_curso = self.materias_curso.get(materia_curso_id)
+            if materia_curso is None:
+                return f"no existe la materia-curso activa {materia_curso_id}"
+            materia, curso = materia_curso.materia, materia_curso.curso
+        else:
+            materia = self.materias.get(cambio.get('materia_id'))
+            curso = self.cursos.get(cambio.get('curso_id'))
+            if materia is None or curso is None:
+                return "la materia o el curso no existen o están inactivos"
+            materia_curso = self.por_curso_y_materia.get((curso.id, materia.id))
+        asignacion = materia_curso.id if materia_curso else ('nueva', curso.id, materia.id)
+
+        if 'docente_id' in cambio:
+            docente_id = cambio['docente_id']
+            docente = self.docentes.get(docente_id) if docente_id else None
+            if docente_id and (docente is None or not docente.usuario.activo):
+                return f"no existe el docente activo {docente_id}"
+        else:
+            docente = self.docentes.get(materia_curso.docente_id) if materia_curso else None
+
+        if 'horarios_ids' in cambio:
+            horarios_ids = cambio['horarios_ids']
+        else:
+            horarios_ids = [bloque.horario_id for bloque in por_asignacion.get(asignacion, [])]
+        faltantes = [horario_id for horario_id in horarios_ids if horario_id not in self.horarios]
+        if faltantes:
+            return f"no existen o están inactivos los horarios {faltantes}"
+
+        horarios = [self.horarios[horario_id] for horario_id in horarios_ids]
+        return asignacion, bloques_propuestos(horarios, materia, curso, docente, asignacion=asignacion)
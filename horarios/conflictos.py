@@ -0,0 +1,182 @@
+"""
+Detección de choques de horarios.
+
+Cada asignación de un Horario a una MateriaCurso es un "bloque" (día, hora de
+inicio y fin, curso y docente). Dos bloques chocan si son del mismo día y sus
+intervalos se solapan, y además:
+
+- son del mismo curso (el curso tendría dos clases a la vez), o
+- son del mismo docente en distintas materias-curso (el docente estaría en
+  dos lugares a la vez).
+
+Los solapamientos se buscan con un barrido por día (sweep line) sobre los
+bloques ordenados por hora de inicio: O(n log n + k) para n bloques y k choques,
+en lugar de comparar todos los pares. Se informan todos los choques, no solo
+el primero.
+"""
+import heapq
+from collections import defaultdict, namedtuple
+from django.db.models import Q
+from materias.models import MateriaCurso
+
+HorarioMateriaCurso = MateriaCurso.horarios.through
+
+# `asignacion` identifica la materia-curso: su id, o una clave provisional
+# para las que todavía no existen. `nuevo` marca los bloques propuestos.
+Bloque = namedtuple('Bloque', [
+    'asignacion', 'horario_id', 'nombre', 'dia_semana', 'hora_inicio', 'hora_fin',
+    'materia_id', 'materia', 'curso_id', 'curso', 'docente_id', 'docente', 'nuevo',
+])
+
+CHOQUE_CURSO = 'curso'
+CHOQUE_DOCENTE = 'docente'
+
+Choque = namedtuple('Choque', ['tipo', 'primero', 'segundo'])
+
+
+def cargar_bloques(cursos_ids=(), docentes_ids=(), materia_curso_ids=(), excluir_materia_curso_ids=(),
+                   todos=False, solo_activos=False):
+    """
+    Bloques existentes en la base de datos con una sola consulta sobre la
+    tabla intermedia MateriaCurso.horarios: los de los cursos, docentes o
+    materias-curso indicados (o todos con `todos=True`).
+    """
+    filas = HorarioMateriaCurso.objects.all()
+    if not todos:
+        filtro = (
+            Q(materiacurso__curso_id__in=list(cursos_ids)) |
+            Q(materiacurso__docente_id__in=[d for d in docentes_ids if d]) |
+            Q(materiacurso_id__in=list(materia_curso_ids))
+        )
+        filas = filas.filter(filtro)
+    if excluir_materia_curso_ids:
+        filas = filas.exclude(materiacurso_id__in=list(excluir_materia_curso_ids))
+    if solo_activos:
+        filas = filas.filter(materiacurso__activo=True, horario__activo=True)
+
+    filas = filas.values_list(
+        'materiacurso_id', 'horario_id', 'horario__nombre', 'horario__dia_semana',
+        'horario__hora_inicio', 'horario__hora_fin', 'materiacurso__materia_id',
+        'materiacurso__materia__nombre', 'materiacurso__curso_id', 'materiacurso__curso__nombre',
+        'materiacurso__curso__turno', 'materiacurso__docente_id',
+        'materiacurso__docente__usuario__first_name', 'materiacurso__docente__usuario__last_name',
+    )
+    return [
+        Bloque(
+            mc_id, horario_id, nombre, dia, inicio, fin, materia_id, materia,
+            curso_id, f"{curso} - {turno}", docente_id,
+            f"{nombre_docente} {apellido_docente}" if docente_id else None, False,
+        )
+        for (mc_id, horario_id, nombre, dia, inicio, fin, materia_id, materia, curso_id, curso, turno,
+             docente_id, nombre_docente, apellido_docente) in filas
+    ]
+
+
+def bloques_propuestos(horarios, materia, curso, docente, asignacion=None):
+    """
+    Bloques de una asignación propuesta (todavía no guardada). `docente` puede
+    ser None; conviene traerlo con select_related('usuario').
+    """
+    asignacion = asignacion or ('nueva', curso.id, materia.id)
+    return [
+        Bloque(
+            asignacion, horario.id, horario.nombre, horario.dia_semana, horario.hora_inicio,
+            horario.hora_fin, materia.id, materia.nombre, curso.id, f"{curso.nombre} - {curso.turno}",
+            docente.id if docente else None,
+            f"{docente.usuario.first_name} {docente.usuario.last_name}" if docente else None,
+            True,
+        )
+        for horario in horarios
+    ]
+
+
+def solapamientos(bloques):
+    """
+    Pares de bloques (o de cualquier objeto con dia_semana, hora_inicio y
+    hora_fin) que se solapan, con un barrido por día.
+    """
+    por_dia = defaultdict(list)
+    for bloque in bloques:
+        por_dia[bloque.dia_semana].append(bloque)
+
+    for lista in por_dia.values():
+        lista.sort(key=lambda bloque: (bloque.hora_inicio, bloque.hora_fin))
+        # Bloques que siguen abiertos, ordenados por hora de fin
+        abiertos = []
+        for orden, bloque in enumerate(lista):
+            while abiertos and abiertos[0][0] <= bloque.hora_inicio:
+                heapq.heappop(abiertos)
+            for _, _, abierto in abiertos:
+                yield abierto, bloque
+            heapq.heappush(abiertos, (bloque.hora_fin, orden, bloque))
+
+
+def detectar_choques(bloques, solo_nuevos=False):
+    """
+    Todos los choques de curso y de docente entre los bloques. Con
+    `solo_nuevos=True` se ignoran los choques entre dos bloques existentes.
+    """
+    por_curso = defaultdict(list)
+    por_docente = defaultdict(list)
+    for bloque in bloques:
+        por_curso[bloque.curso_id].append(bloque)
+        if bloque.docente_id:
+            por_docente[bloque.docente_id].append(bloque)
+
+    choques = []
+    for grupo in por_curso.values():
+        choques.extend(Choque(CHOQUE_CURSO, a, b) for a, b in solapamientos(grupo))
+    for grupo in por_docente.values():
+        choques.extend(
+            Choque(CHOQUE_DOCENTE, a, b) for a, b in solapamientos(grupo)
+            if a.asignacion != b.asignacion
+        )
+
+    if solo_nuevos:
+        choques = [choque for choque in choques if choque.primero.nuevo or choque.segundo.nuevo]
+    return choques
+
+
+def _franja(bloque):
+    return f"'{bloque.nombre}' ({bloque.hora_inicio}-{bloque.hora_fin})"
+
+
+def describir_choque(choque):
+    """Mensaje legible de un choque"""
+    # El bloque existente primero, el propuesto después
+    a, b = sorted((choque.primero, choque.segundo), key=lambda bloque: bloque.nuevo)
+    if choque.tipo == CHOQUE_CURSO:
+        return (
+            f"Choque de horarios en el curso '{a.curso}' el {a.dia_semana}: "
+            f"'{a.materia}' {_franja(a)} vs '{b.materia}' {_franja(b)}"
+        )
+    return (
+        f"CHOQUE DE DOCENTE: El docente {a.docente or b.docente} tiene la materia '{a.materia}' "
+        f"en el curso '{a.curso}' {_franja(a)} y la materia '{b.materia}' en el curso '{b.curso}' "
+        f"{_franja(b)} al mismo tiempo el {a.dia_semana}."
+    )
+
+
+def choque_a_dict(choque):
+    """Representación de un choque para las respuestas de la API"""
+    return {
+        'tipo': choque.tipo,
+        'dia_semana': choque.primero.dia_semana,
+        'mensaje': describir_choque(choque),
+        'bloques': [
+            {
+                'materia_curso_id': bloque.asignacion if isinstance(bloque.asignacion, int) else None,
+                'horario_id': bloque.horario_id,
+                'horario': bloque.nombre,
+                'hora_inicio': bloque.hora_inicio,
+                'hora_fin': bloque.hora_fin,
+                'materia': bloque.materia,
+                'curso_id': bloque.curso_id,
+                'curso': bloque.curso,
+                'docente_id': bloque.docente_id,
+                'docente': bloque.docente,
+                'nuevo': bloque.nuevo,
+            }
+            for bloque in (choque.primero, choque.segundo)
+        ],
+    }
@@ -0,0 +1,189 @@
+"""
+Generador automático de horarios.
+
+Cada materia-curso activa con `horas_semanales > 0` es una "tarea": necesita
+esa cantidad de bloques horarios (Horario) sin chocar con otras clases de su
+curso ni de su docente. El resto de las asignaciones existentes se respetan
+tal como están.
+
+El algoritmo es voraz, de a un bloque por vez, eligiendo siempre la tarea
+más restringida (la que tiene menos bloques libres de sobra para las horas que
+le faltan). Para cada tarea se lleva la cuenta de sus bloques libres y, al
+asignar un bloque, solo se recalculan las tareas del mismo curso o del mismo
+docente, así que una escuela completa se resuelve en segundos. No hay vuelta
+atrás: si una tarea se queda sin bloques libres se informa lo que le falta.
+"""
+import heapq
+from collections import Counter, defaultdict, namedtuple
+from django.db import transaction
+from materias.models import MateriaCurso
+from .conflictos import cargar_bloques, solapamientos
+from .models import Horario
+from .proyecciones import ORDEN_DIAS, invalidar_horarios_docentes, invalidar_horarios_publicos
+
+HorarioMateriaCurso = MateriaCurso.horarios.through
+
+# `preferidos` son los horarios actuales de la tarea: se conservan mientras no choquen
+Tarea = namedtuple('Tarea', ['asignacion', 'curso_id', 'docente_id', 'horas', 'preferidos'])
+
+# `ocupados` son tuplas (curso_id, docente_id, horario_id) de las clases que no se tocan
+Problema = namedtuple('Problema', ['tareas', 'franjas', 'ocupados'])
+
+Solucion = namedtuple('Solucion', ['asignados', 'faltantes'])
+
+
+def resolver(tareas, franjas, ocupados=()):
+    """
+    Asignar bloques a las tareas sin choques de curso ni de docente.
+
+    `franjas` son los bloques disponibles (cualquier objeto con id,
+    dia_semana, hora_inicio y hora_fin). Retorna una Solucion con los horarios
+    asignados a cada tarea y las horas que no se pudieron asignar.
+    """
+    franjas = sorted(franjas, key=lambda franja: (ORDEN_DIAS.get(franja.dia_semana, 99), franja.hora_inicio, franja.id))
+    ids = [franja.id for franja in franjas]
+    dia_de = {franja.id: franja.dia_semana for franja in franjas}
+
+    # Bloques que se solapan con cada bloque (incluido él mismo)
+    solapados = {franja.id: [franja.id] for franja in franjas}
+    for a, b in solapamientos(franjas):
+        solapados[a.id].append(b.id)
+        solapados[b.id].append(a.id)
+
+    # Cuántas clases asignadas bloquean cada horario, por curso y por docente
+    bloqueos_curso = defaultdict(Counter)
+    bloqueos_docente = defaultdict(Counter)
+
+    def ocupar(curso_id, docente_id, horario_id):
+        for otro in solapados[horario_id]:
+            bloqueos_curso[curso_id][otro] += 1
+            if docente_id:
+                bloqueos_docente[docente_id][otro] += 1
+
+    def libre(tarea, horario_id):
+        if bloqueos_curso[tarea.curso_id][horario_id]:
+            return False
+        return not (tarea.docente_id and bloqueos_docente[tarea.docente_id][horario_id])
+
+    for curso_id, docente_id, horario_id in ocupados:
+        if horario_id in solapados:
+            ocupar(curso_id, docente_id, horario_id)
+
+    asignados = {tarea.asignacion: [] for tarea in tareas}
+    dias_usados = {tarea.asignacion: Counter() for tarea in tareas}
+
+    def asignar(tarea, horario_id):
+        ocupar(tarea.curso_id, tarea.docente_id, horario_id)
+        asignados[tarea.asignacion].append(horario_id)
+        dias_usados[tarea.asignacion][dia_de[horario_id]] += 1
+
+    # Primero se conservan los horarios actuales que siguen siendo válidos
+    for tarea in tareas:
+        for horario_id in tarea.preferidos:
+            if len(asignados[tarea.asignacion]) < tarea.horas and horario_id in solapados and libre(tarea, horario_id):
+                asignar(tarea, horario_id)
+
+    por_curso = defaultdict(list)
+    por_docente = defaultdict(list)
+    for tarea in tareas:
+        por_curso[tarea.curso_id].append(tarea)
+        if tarea.docente_id:
+            por_docente[tarea.docente_id].append(tarea)
+
+    orden = {tarea.asignacion: indice for indice, tarea in enumerate(tareas)}
+    version = Counter()
+    faltantes = {}
+    cola = []
+
+    def restantes(tarea):
+        return tarea.horas - len(asignados[tarea.asignacion])
+
+    def encolar(tarea):
+        version[tarea.asignacion] += 1
+        holgura = sum(1 for horario_id in ids if libre(tarea, horario_id)) - restantes(tarea)
+        heapq.heappush(cola, (holgura, orden[tarea.asignacion], version[tarea.asignacion], tarea))
+
+    for tarea in tareas:
+        if restantes(tarea) > 0:
+            encolar(tarea)
+
+    while cola:
+        _, _, numero, tarea = heapq.heappop(cola)
+        if numero != version[tarea.asignacion] or restantes(tarea) <= 0:
+            continue
+
+        candidatos = [horario_id for horario_id in ids if libre(tarea, horario_id)]
+        if not candidatos:
+            faltantes[tarea.asignacion] = restantes(tarea)
+            continue
+
+        # Repartir la materia en la semana: primero los días en que todavía no tiene clase
+        dias = dias_usados[tarea.asignacion]
+        horario_id = min(candidatos, key=lambda candidato: dias[dia_de[candidato]])
+        asignar(tarea, horario_id)
+
+        afectadas = {otra.asignacion: otra for otra in por_curso[tarea.curso_id]}
+        afectadas.update((otra.asignacion, otra) for otra in por_docente.get(tarea.docente_id, ()))
+        for otra in afectadas.values():
+            if restantes(otra) > 0:
+                encolar(otra)
+
+    return Solucion(asignados, faltantes)
+
+
+def cargar_problema(docentes_ids=None, conservar=False):
+    """
+    Armar el problema con los datos de la base: las tareas de toda la escuela
+    o solo las de algunos docentes (para volver a resolver cuando cambia un
+    docente, dejando fijo el resto de la escuela). Con `conservar=True` se
+    intenta mantener los horarios actuales de las tareas.
+    """
+    materias_curso = MateriaCurso.objects.filter(activo=True, horas_semanales__gt=0)
+    if docentes_ids is not None:
+        materias_curso = materias_curso.filter(docente_id__in=list(docentes_ids))
+    materias_curso = list(materias_curso.values_list('id', 'curso_id', 'docente_id', 'horas_semanales'))
+    tareas_ids = {materia_curso_id for materia_curso_id, _, _, _ in materias_curso}
+
+    actuales = defaultdict(list)
+    ocupados = []
+    for bloque in cargar_bloques(todos=True, solo_activos=True):
+        if bloque.asignacion in tareas_ids:
+            actuales[bloque.asignacion].append(bloque.horario_id)
+        else:
+            ocupados.append((bloque.curso_id, bloque.docente_id, bloque.horario_id))
+
+    tareas = [
+        Tarea(materia_curso_id, curso_id, docente_id, horas, actuales[materia_curso_id] if conservar else [])
+        for materia_curso_id, curso_id, docente_id, horas in materias_curso
+    ]
+    franjas = list(Horario.objects.filter(activo=True))
+    return Problema(tareas, franjas, ocupados)
+
+
+@transaction.atomic
+def guardar_horarios(asignados):
+    """Reemplazar los horarios de las materias-curso resueltas en una sola transacción"""
+    HorarioMateriaCurso.objects.filter(materiacurso_id__in=list(asignados)).delete()
+    HorarioMateriaCurso.objects.bulk_create([
+        HorarioMateriaCurso(materiacurso_id=materia_curso_id, horario_id=horario_id)
+        for materia_curso_id, horarios_ids in asignados.items()
+        for horario_id in horarios_ids
+    ])
+    # bulk_create no dispara m2m_changed: se descartan a mano los horarios guardados
+    transaction.on_commit(invalidar_horarios_docentes)
+    transaction.on_commit(invalidar_horarios_publicos)
+
+
+def generar_horarios(docentes_ids=None, conservar=None, guardar=True):
+    """
+    Generar (y guardar) los horarios de toda la escuela o de algunos docentes.
+    Por defecto, al resolver solo algunos docentes se conservan sus horarios
+    actuales que sigan siendo válidos.
+    """
+    if conservar is None:
+        conservar = docentes_ids is not None
+    problema = cargar_problema(docentes_ids=docentes_ids, conservar=conservar)
+    solucion = resolver(*problema)
+    if guardar and solucion.asignados:
+        guardar_horarios(solucion.asignados)
+    return problema, solucion
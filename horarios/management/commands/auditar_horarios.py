@@ -0,0 +1,38 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from horarios.agenda import AgendaEscolar
+from horarios.conflictos import CHOQUE_DOCENTE, choque_a_dict, describir_choque
+
+
+class Command(BaseCommand):
+    help = (
+        "Busca todos los choques de horarios de la escuela: docentes con dos clases a la "
+        "vez y cursos con materias solapadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Imprimir los choques como JSON')
+        parser.add_argument(
+            '--estricto',
+            action='store_true',
+            help='Terminar con error si hay choques (útil en scripts)',
+        )
+
+    def handle(self, *args, **options):
+        agenda = AgendaEscolar.cargar()
+        choques = agenda.choques()
+
+        if options['json']:
+            self.stdout.write(json.dumps([choque_a_dict(choque) for choque in choques], indent=2, default=str))
+        else:
+            for choque in choques:
+                self.stdout.write(describir_choque(choque))
+            de_docente = sum(1 for choque in choques if choque.tipo == CHOQUE_DOCENTE)
+            resumen = (
+                f'{len(agenda.bloques)} bloques revisados: {len(choques)} choques '
+                f'({de_docente} de docente, {len(choques) - de_docente} de curso)'
+            )
+            self.stdout.write(self.style.WARNING(resumen) if choques else self.style.SUCCESS(resumen))
+
+        if choques and options['estricto']:
+            raise CommandError(f'Se encontraron {len(choques)} choques de horarios')
@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import time as hora
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from horarios.conflictos import Bloque, cargar_bloques, detectar_choques
+from horarios.models import Horario
+
+DIAS = [dia for dia, _ in Horario.DIAS_SEMANA[:5]]
+
+
+def _escuela_sintetica(cursos, materias, docentes, bloques_por_dia, horas_por_materia, semilla):
+    """Bloques de una escuela ficticia con asignaciones al azar (con algunos choques)"""
+    azar = random.Random(semilla)
+    franjas = [
+        (dia, hora(7 + i), hora(8 + i) if 8 + i < 24 else hora(23, 59))
+        for dia in DIAS for i in range(bloques_por_dia)
+    ]
+    bloques = []
+    for curso_id in range(1, cursos + 1):
+        for materia_id in range(1, materias + 1):
+            asignacion = curso_id * 1000 + materia_id
+            docente_id = azar.randint(1, docentes)
+            for dia, inicio, fin in azar.sample(franjas, min(horas_por_materia, len(franjas))):
+                bloques.append(Bloque(
+                    asignacion, None, f'{dia} {inicio}', dia, inicio, fin, materia_id, f'Materia {materia_id}',
+                    curso_id, f'Curso {curso_id}', docente_id, f'Docente {docente_id}', False,
+                ))
+    return bloques
+
+
+def _choques_por_pares(bloques):
+    """El método anterior: comparar todos los pares de cada curso y de cada docente"""
+    grupos = {}
+    for bloque in bloques:
+        grupos.setdefault(('curso', bloque.curso_id), []).append(bloque)
+        grupos.setdefault(('docente', bloque.docente_id), []).append(bloque)
+
+    total = 0
+    for (tipo, _), grupo in grupos.items():
+        for i, a in enumerate(grupo):
+            for b in grupo[i + 1:]:
+                if tipo == 'docente' and a.asignacion == b.asignacion:
+                    continue
+                if a.dia_semana == b.dia_semana and a.hora_inicio < b.hora_fin and a.hora_fin > b.hora_inicio:
+                    total += 1
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la detección de choques de horarios (barrido por día) contra la comparación "
+        "de todos los pares, sobre una escuela sintética o sobre los horarios de la base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cursos', type=int, default=60, help='Cursos de la escuela sintética (por defecto 60)')
+        parser.add_argument('--materias', type=int, default=12, help='Materias por curso (por defecto 12)')
+        parser.add_argument('--docentes', type=int, default=120, help='Docentes (por defecto 120)')
+        parser.add_argument('--bloques-por-dia', type=int, default=8, help='Bloques horarios por día (por defecto 8)')
+        parser.add_argument('--horas', type=int, default=3, help='Horas semanales por materia (por defecto 3)')
+        parser.add_argument('--semilla', type=int, default=1, help='Semilla del generador (por defecto 1)')
+        parser.add_argument(
+            '--base-de-datos',
+            action='store_true',
+            help='Usar los horarios asignados en la base de datos en lugar de la escuela sintética',
+        )
+
+    def handle(self, *args, **options):
+        if options['base_de_datos']:
+            inicio = time.perf_counter()
+            with CaptureQueriesContext(connection) as consultas:
+                bloques = cargar_bloques(todos=True)
+            self.stdout.write(
+                f'Carga: {len(bloques)} bloques en {len(consultas.captured_queries)} consulta(s), '
+                f'{(time.perf_counter() - inicio) * 1000:.1f} ms'
+            )
+        else:
+            bloques = _escuela_sintetica(
+                options['cursos'], options['materias'], options['docentes'],
+                options['bloques_por_dia'], options['horas'], options['semilla'],
+            )
+            self.stdout.write(
+                f"Escuela sintética: {options['cursos']} cursos, {options['cursos'] * options['materias']} "
+                f"materias-curso, {options['docentes']} docentes, {len(bloques)} bloques"
+            )
+
+        inicio = time.perf_counter()
+        choques = detectar_choques(bloques)
+        barrido = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        total_por_pares = _choques_por_pares(bloques)
+        por_pares = time.perf_counter() - inicio
+
+        self.stdout.write(f'Barrido por día: {len(choques)} choques en {barrido * 1000:.1f} ms')
+        self.stdout.write(f'Todos los pares: {total_por_pares} choques en {por_pares * 1000:.1f} ms')
+        if total_por_pares != len(choques):
+            self.stdout.write(self.style.ERROR('Los dos métodos no coinciden'))
+        elif barrido:
+            self.stdout.write(self.style.SUCCESS(f'Resultados iguales, {por_pares / barrido:.1f}x más rápido'))
@@ -0,0 +1,107 @@
+import random
+import time
+from collections import namedtuple
+from datetime import time as hora
+from django.core.management.base import BaseCommand
+from horarios.conflictos import Bloque, detectar_choques
+from horarios.generador import Tarea, resolver
+from horarios.models import Horario
+
+DIAS = [dia for dia, _ in Horario.DIAS_SEMANA[:5]]
+
+Franja = namedtuple('Franja', ['id', 'nombre', 'dia_semana', 'hora_inicio', 'hora_fin'])
+
+
+def _franjas(bloques_por_dia):
+    return [
+        Franja(orden, f'{dia} {7 + i}', dia, hora(7 + i), hora(8 + i) if 8 + i < 24 else hora(23, 59))
+        for orden, (dia, i) in enumerate((dia, i) for dia in DIAS for i in range(bloques_por_dia))
+    ]
+
+
+def _tareas(cursos, materias, horas, materias_por_docente, semilla):
+    """Tareas de una escuela ficticia: cada docente dicta varias materias-curso al azar"""
+    azar = random.Random(semilla)
+    asignaciones = [(curso_id, materia_id) for curso_id in range(1, cursos + 1) for materia_id in range(1, materias + 1)]
+    docentes = max(1, len(asignaciones) // materias_por_docente)
+    docentes_ids = [docente_id for docente_id in range(1, docentes + 1) for _ in range(materias_por_docente)]
+    docentes_ids += [azar.randint(1, docentes) for _ in range(len(asignaciones) - len(docentes_ids))]
+    azar.shuffle(docentes_ids)
+    return [
+        Tarea(curso_id * 1000 + materia_id, curso_id, docente_id, horas, [])
+        for (curso_id, materia_id), docente_id in zip(asignaciones, docentes_ids)
+    ], docentes
+
+
+def _choques(tareas, franjas, solucion):
+    """Verificar la solución con el detector de choques"""
+    por_id = {franja.id: franja for franja in franjas}
+    bloques = [
+        Bloque(
+            tarea.asignacion, horario_id, por_id[horario_id].nombre, por_id[horario_id].dia_semana,
+            por_id[horario_id].hora_inicio, por_id[horario_id].hora_fin, None, None,
+            tarea.curso_id, f'Curso {tarea.curso_id}', tarea.docente_id, f'Docente {tarea.docente_id}', False,
+        )
+        for tarea in tareas
+        for horario_id in solucion.asignados[tarea.asignacion]
+    ]
+    return detectar_choques(bloques)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el generador automático de horarios sobre escuelas sintéticas de tamaño "
+        "creciente y verifica que las soluciones no tengan choques."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cursos',
+            default='10,25,50,100',
+            help='Tamaños de escuela a medir, en cursos, separados por coma (por defecto 10,25,50,100)',
+        )
+        parser.add_argument('--materias', type=int, default=10, help='Materias por curso (por defecto 10)')
+        parser.add_argument('--horas', type=int, default=3, help='Horas semanales por materia (por defecto 3)')
+        parser.add_argument(
+            '--materias-por-docente',
+            type=int,
+            default=5,
+            help='Materias-curso por docente (por defecto 5)',
+        )
+        parser.add_argument('--bloques-por-dia', type=int, default=8, help='Bloques horarios por día (por defecto 8)')
+        parser.add_argument('--semilla', type=int, default=1, help='Semilla del generador (por defecto 1)')
+
+    def handle(self, *args, **options):
+        franjas = _franjas(options['bloques_por_dia'])
+        self.stdout.write(f'{len(franjas)} bloques horarios por semana')
+
+        for cursos in [int(valor) for valor in options['cursos'].split(',') if valor.strip()]:
+            tareas, docentes = _tareas(
+                cursos, options['materias'], options['horas'], options['materias_por_docente'], options['semilla'],
+            )
+            inicio = time.perf_counter()
+            solucion = resolver(tareas, franjas)
+            duracion = time.perf_counter() - inicio
+
+            # Volver a resolver un docente con el resto de la escuela fija
+            docente_id = tareas[0].docente_id
+            propias = [
+                tarea._replace(preferidos=solucion.asignados[tarea.asignacion])
+                for tarea in tareas if tarea.docente_id == docente_id
+            ]
+            ocupados = [
+                (tarea.curso_id, tarea.docente_id, horario_id)
+                for tarea in tareas if tarea.docente_id != docente_id
+                for horario_id in solucion.asignados[tarea.asignacion]
+            ]
+            inicio = time.perf_counter()
+            resolver(propias, franjas, ocupados)
+            incremental = time.perf_counter() - inicio
+
+            choques = _choques(tareas, franjas, solucion)
+            linea = (
+                f'{cursos} cursos, {len(tareas)} materias-curso, {docentes} docentes: '
+                f'{sum(solucion.faltantes.values())} horas sin asignar, {len(choques)} choques, '
+                f'{duracion * 1000:.0f} ms (un docente: {incremental * 1000:.1f} ms)'
+            )
+            self.stdout.write(self.style.ERROR(linea) if choques else linea)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from horarios.generador import generar_horarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Asigna automáticamente los horarios de las materias-curso activas con horas "
+        "semanales, sin choques de curso ni de docente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--docente',
+            type=int,
+            action='append',
+            dest='docentes',
+            help='Solo volver a resolver las materias de este docente (se puede repetir)',
+        )
+        parser.add_argument(
+            '--conservar',
+            action='store_true',
+            default=None,
+            help='Mantener los horarios actuales que sigan siendo válidos (por defecto al indicar --docente)',
+        )
+        parser.add_argument('--simular', action='store_true', help='Mostrar el resultado sin guardarlo')
+
+    def handle(self, *args, **options):
+        problema, solucion = generar_horarios(
+            docentes_ids=options['docentes'],
+            conservar=options['conservar'],
+            guardar=not options['simular'],
+        )
+        asignadas = sum(len(horarios) for horarios in solucion.asignados.values())
+        for materia_curso_id, horas in solucion.faltantes.items():
+            self.stdout.write(self.style.WARNING(f'Materia-curso {materia_curso_id}: faltan {horas} hora(s)'))
+
+        accion = 'simuladas' if options['simular'] else 'guardadas'
+        resumen = (
+            f'{len(problema.tareas)} materias-curso: {asignadas} horas {accion}, '
+            f'{sum(solucion.faltantes.values())} sin asignar'
+        )
+        self.stdout.write(self.style.WARNING(resumen) if solucion.faltantes else self.style.SUCCESS(resumen))
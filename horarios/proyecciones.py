@@ -0,0 +1,165 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from materias.models import MateriaCurso
+from .models import Horario
+
+# Versión global de las proyecciones: cambiarla descarta todas las guardadas
+# (se usa cuando cambia un Horario, una Materia o un Curso)
+CLAVE_VERSION = 'horario_docente:version'
+
+# Versión de los horarios por día y por materia: cambia con cualquier
+# modificación de horarios o asignaciones
+CLAVE_VERSION_PUBLICOS = 'horarios_publicos:version'
+
+HorarioMateriaCurso = MateriaCurso.horarios.through
+
+ORDEN_DIAS = {dia: orden for orden, (dia, _) in enumerate(Horario.DIAS_SEMANA)}
+
+
+def _version(clave=CLAVE_VERSION):
+    version = cache.get(clave)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(clave, version, timeout=None)
+        version = cache.get(clave, version)
+    return version
+
+
+def _clave_docente(docente_id, version=None):
+    return f'horario_docente:{version or _version()}:{docente_id}'
+
+
+def construir_horario_docente(docente_id):
+    """
+    Horario semanal de un docente: una fila por bloque horario con la materia
+    y el curso que dicta, obtenida con una sola consulta sobre la tabla
+    intermedia MateriaCurso.horarios.
+
+    Si el docente tiene dos materias en el mismo bloque se muestra la primera
+    asignación (menor id de materia-curso).
+    """
+    filas = (
+        HorarioMateriaCurso.objects
+        .filter(materiacurso__docente_id=docente_id)
+        .order_by('horario__dia_semana', 'horario__hora_inicio', 'horario_id', 'materiacurso_id')
+        .values_list(
+            'horario_id', 'horario__nombre', 'horario__dia_semana', 'horario__hora_inicio',
+            'horario__hora_fin', 'materiacurso__materia__nombre', 'materiacurso__curso__nombre',
+            'materiacurso__curso__turno',
+        )
+    )
+
+    horarios = []
+    vistos = set()
+    for horario_id, nombre, dia_semana, hora_inicio, hora_fin, materia, curso, turno in filas:
+        if horario_id in vistos:
+            continue
+        vistos.add(horario_id)
+        horarios.append({
+            'horario_id': horario_id,
+            'nombre': nombre,
+            'dia_semana': dia_semana,
+            'hora_inicio': hora_inicio,
+            'hora_fin': hora_fin,
+            'materia': materia,
+            'curso': f"{curso} - {turno}"
+        })
+    return horarios
+
+
+def obtener_horario_docente(docente_id):
+    """Horario semanal de un docente desde la cache; se construye si no está"""
+    clave = _clave_docente(docente_id)
+    horarios = cache.get(clave)
+    if horarios is None:
+        horarios = construir_horario_docente(docente_id)
+        cache.set(clave, horarios, timeout=settings.HORARIO_DOCENTE_CACHE_TIMEOUT)
+    return horarios
+
+
+def invalidar_horario_docente(*docente_ids):
+    """Descartar el horario guardado de uno o varios docentes"""
+    docente_ids = [docente_id for docente_id in docente_ids if docente_id]
+    if docente_ids:
+        version = _version()
+        cache.delete_many([_clave_docente(docente_id, version) for docente_id in docente_ids])
+
+
+def invalidar_horarios_docentes():
+    """Descartar el horario guardado de todos los docentes"""
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+
+
+def construir_horarios_por_dia(dia):
+    """
+    Clases de un día: una fila por bloque horario y materia-curso que lo usa
+    (un mismo bloque puede ser de varios cursos), con dos consultas.
+    """
+    materias_curso = MateriaCurso.objects.filter(activo=True).select_related('curso', 'materia')
+    bloques = (
+        Horario.objects.filter(dia_semana=dia, activo=True)
+        .order_by('hora_inicio', 'hora_fin')
+        .prefetch_related(Prefetch('materia_cursos', queryset=materias_curso.order_by('curso__nombre', 'materia__nombre')))
+    )
+    return [
+        {
+            "horario_id": bloque.id,
+            "hora_inicio": bloque.hora_inicio.strftime("%H:%M"),
+            "hora_fin": bloque.hora_fin.strftime("%H:%M"),
+            "curso": materia_curso.curso.nombre,
+            "turno": materia_curso.curso.turno,
+            "materia": materia_curso.materia.nombre,
+        }
+        for bloque in bloques
+        for materia_curso in bloque.materia_cursos.all()
+    ]
+
+
+def construir_horarios_por_materia(materia_id):
+    """Clases de una materia en todos sus cursos, ordenadas por día y hora, con dos consultas"""
+    relaciones = (
+        MateriaCurso.objects.filter(materia_id=materia_id, activo=True)
+        .select_related('curso')
+        .prefetch_related(Prefetch('horarios', queryset=Horario.objects.filter(activo=True)))
+    )
+    filas = [
+        {
+            "horario_id": horario.id,
+            "curso": relacion.curso.nombre,
+            "turno": relacion.curso.turno,
+            "dia": horario.dia_semana,
+            "hora_inicio": horario.hora_inicio.strftime("%H:%M"),
+            "hora_fin": horario.hora_fin.strftime("%H:%M"),
+        }
+        for relacion in relaciones
+        for horario in relacion.horarios.all()
+    ]
+    filas.sort(key=lambda fila: (ORDEN_DIAS.get(fila["dia"], len(ORDEN_DIAS)), fila["hora_inicio"], fila["curso"]))
+    return filas
+
+
+def _obtener(clave, construir, *args):
+    filas = cache.get(clave)
+    if filas is None:
+        filas = construir(*args)
+        cache.set(clave, filas, timeout=settings.HORARIOS_PUBLICOS_CACHE_TIMEOUT)
+    return filas
+
+
+def obtener_horarios_por_dia(dia):
+    """Clases de un día desde la cache; se construyen si no están"""
+    clave = f'horarios_por_dia:{_version(CLAVE_VERSION_PUBLICOS)}:{dia}'
+    return _obtener(clave, construir_horarios_por_dia, dia)
+
+
+def obtener_horarios_por_materia(materia_id):
+    """Clases de una materia desde la cache; se construyen si no están"""
+    clave = f'horarios_por_materia:{_version(CLAVE_VERSION_PUBLICOS)}:{materia_id}'
+    return _obtener(clave, construir_horarios_por_materia, materia_id)
+
+
+def invalidar_horarios_publicos():
+    """Descartar los horarios por día y por materia guardados"""
+    cache.set(CLAVE_VERSION_PUBLICOS, uuid.uuid4().hex, timeout=None)
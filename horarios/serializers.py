@@ -20,3 +20,44 @@ class HorarioSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La hora de inicio debe ser menor que la hora de fin")
 
         return data
+
+
+class CambioHorarioSerializer(serializers.Serializer):
+    """Un cambio propuesto: a qué materia-curso afecta y qué cambia"""
+    materia_curso_id = serializers.IntegerField(required=False, help_text="ID de una materia-curso existente")
+    curso_id = serializers.IntegerField(required=False, help_text="Curso de una asignación nueva")
+    materia_id = serializers.IntegerField(required=False, help_text="Materia de una asignación nueva")
+    docente_id = serializers.IntegerField(required=False, allow_null=True, help_text="Nuevo docente (null para quitarlo)")
+    horarios_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Horarios que reemplazan a los actuales"
+    )
+
+    def validate(self, data):
+        if not data.get('materia_curso_id') and not (data.get('curso_id') and data.get('materia_id')):
+            raise serializers.ValidationError("Indique materia_curso_id, o curso_id y materia_id para una asignación nueva")
+        if 'docente_id' not in data and 'horarios_ids' not in data:
+            raise serializers.ValidationError("Indique docente_id y/o horarios_ids")
+        return data
+
+
+class SimulacionHorariosSerializer(serializers.Serializer):
+    """Lote de cambios a validar contra los horarios actuales sin guardarlos"""
+    cambios = CambioHorarioSerializer(many=True, allow_empty=False)
+
+
+class GenerarHorariosSerializer(serializers.Serializer):
+    """Opciones del generador automático de horarios"""
+    docentes_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Solo volver a resolver las materias de estos docentes (por defecto toda la escuela)"
+    )
+    conservar = serializers.BooleanField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="Mantener los horarios actuales que sigan siendo válidos (por defecto sí al indicar docentes)"
+    )
+    guardar = serializers.BooleanField(default=True, help_text="False para ver el resultado sin guardarlo")
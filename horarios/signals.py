@@ -0,0 +1,51 @@
+# horarios/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from cursos.models import Curso
+from materias.models import Materia, MateriaCurso
+from .models import Horario
+from .proyecciones import invalidar_horario_docente, invalidar_horarios_docentes, invalidar_horarios_publicos
+
+# Las proyecciones se descartan al confirmar la transacción, para que una
+# lectura concurrente no vuelva a guardar los datos anteriores. Los horarios
+# por día y por materia se descartan con cualquier cambio.
+
+
+@receiver(m2m_changed, sender=MateriaCurso.horarios.through)
+def horarios_asignados(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    transaction.on_commit(invalidar_horarios_publicos)
+    if reverse:
+        # Se modificaron las materias-curso de un horario: pueden ser de varios docentes
+        transaction.on_commit(invalidar_horarios_docentes)
+    else:
+        docente_id = instance.docente_id
+        transaction.on_commit(lambda: invalidar_horario_docente(docente_id))
+
+
+@receiver(pre_save, sender=MateriaCurso)
+def recordar_docente_anterior(sender, instance, **kwargs):
+    instance._docente_anterior_id = None
+    if instance.pk:
+        instance._docente_anterior_id = (
+            MateriaCurso.objects.filter(pk=instance.pk).values_list('docente_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=MateriaCurso)
+@receiver(post_delete, sender=MateriaCurso)
+def materia_curso_modificada(sender, instance, **kwargs):
+    docente_ids = {instance.docente_id, getattr(instance, '_docente_anterior_id', None)}
+    transaction.on_commit(lambda: invalidar_horario_docente(*docente_ids))
+    transaction.on_commit(invalidar_horarios_publicos)
+
+
+@receiver(post_save, sender=Horario)
+@receiver(post_delete, sender=Horario)
+@receiver(post_save, sender=Materia)
+@receiver(post_save, sender=Curso)
+def datos_de_horario_modificados(sender, **kwargs):
+    transaction.on_commit(invalidar_horarios_docentes)
+    transaction.on_commit(invalidar_horarios_publicos)
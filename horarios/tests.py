@@ -1,3 +1,299 @@
+from datetime import time
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from cursos.models import Curso
+from cursos.serializersMaterias import AsignarDocenteSerializer, AsignarHorariosSerializer
+from materias.models import Materia, MateriaCurso
+from usuarios.models import Docente, Rol, Usuario
+from .conflictos import CHOQUE_CURSO, CHOQUE_DOCENTE, cargar_bloques, detectar_choques
+from .generador import generar_horarios
+from .models import Horario
 
-# Create your tests here.
+
+class EscuelaTestMixin:
+    """Dos cursos, dos docentes y los bloques de la mañana del lunes y el martes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cursos = [Curso.objects.create(nombre=nombre) for nombre in ('1ro A', '2do A')]
+        cls.docentes = [
+            Docente.objects.create(usuario=Usuario.objects.create(
+                email=f'docente{i}@escuela.test', first_name='Ana', last_name=f'Docente{i}'
+            ))
+            for i in (1, 2)
+        ]
+        cls.materias = [Materia.objects.create(nombre=nombre) for nombre in ('Matemáticas', 'Lenguaje')]
+        cls.bloques = {
+            (dia, hora): Horario.objects.create(
+                nombre=f'Bloque {hora - 7}', dia_semana=dia, hora_inicio=time(hora), hora_fin=time(hora, 50)
+            )
+            for dia in ('Lunes', 'Martes')
+            for hora in (8, 9)
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def asignar(self, curso, materia, docente, *bloques, horas=0):
+        materia_curso = MateriaCurso.objects.create(
+            curso=curso, materia=materia, docente=docente, horas_semanales=horas
+        )
+        materia_curso.horarios.set([self.bloques[bloque] for bloque in bloques])
+        return materia_curso
+
+
+class HorarioDocenteTests(EscuelaTestMixin, TestCase):
+    """Horario de un docente desde la proyección guardada en cache"""
+
+    def url(self, docente):
+        return f'/api/docentes/{docente.id}/horarios/'
+
+    def test_horario_docente(self):
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 9), ('Lunes', 8))
+        self.asignar(self.cursos[1], self.materias[1], self.docentes[1], ('Lunes', 8))
+        respuesta = self.client.get(self.url(self.docentes[0]))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['total_horarios'], 2)
+        self.assertEqual(
+            [(fila['hora_inicio'], fila['materia'], fila['curso']) for fila in respuesta.data['horarios']],
+            [(time(8), 'Matemáticas', '1ro A - mañana'), (time(9), 'Matemáticas', '1ro A - mañana')],
+        )
+
+    def test_una_consulta_y_luego_cache(self):
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8), ('Martes', 8))
+        # Docente y proyección; después solo el docente
+        with self.assertNumQueries(2):
+            self.client.get(self.url(self.docentes[0]))
+        with self.assertNumQueries(1):
+            self.client.get(self.url(self.docentes[0]))
+
+    def test_cambios_descartan_la_cache(self):
+        materia_curso = self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8))
+        self.client.get(self.url(self.docentes[0]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            materia_curso.horarios.add(self.bloques[('Martes', 8)])
+        self.assertEqual(self.client.get(self.url(self.docentes[0])).data['total_horarios'], 2)
+
+        # Cambio de docente: se descartan los horarios del anterior y del nuevo
+        self.client.get(self.url(self.docentes[1]))
+        with self.captureOnCommitCallbacks(execute=True):
+            materia_curso.docente = self.docentes[1]
+            materia_curso.save()
+        self.assertEqual(self.client.get(self.url(self.docentes[0])).data['total_horarios'], 0)
+        self.assertEqual(self.client.get(self.url(self.docentes[1])).data['total_horarios'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.materias[0].nombre = 'Álgebra'
+            self.materias[0].save()
+        self.assertEqual(self.client.get(self.url(self.docentes[1])).data['horarios'][0]['materia'], 'Álgebra')
+
+
+class ConflictosTests(EscuelaTestMixin, TestCase):
+    """Choques de curso y de docente con el barrido por día"""
+
+    def choques(self):
+        return sorted(
+            (choque.tipo, choque.primero.asignacion, choque.segundo.asignacion)
+            for choque in detectar_choques(cargar_bloques(todos=True))
+        )
+
+    def test_choques_de_curso_y_de_docente(self):
+        matematicas = self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8))
+        # Se solapa media hora con el bloque de las 8 del lunes
+        solapado = Horario.objects.create(dia_semana='Lunes', hora_inicio=time(8, 30), hora_fin=time(9, 20))
+        lenguaje = self.asignar(self.cursos[0], self.materias[1], self.docentes[1])
+        lenguaje.horarios.set([solapado])
+        otro_curso = self.asignar(self.cursos[1], self.materias[0], self.docentes[0], ('Lunes', 8))
+
+        tipos = [tipo for tipo, _, _ in self.choques()]
+        self.assertEqual(tipos, [CHOQUE_CURSO, CHOQUE_DOCENTE])
+        self.assertEqual(
+            {frozenset((a, b)) for _, a, b in self.choques()},
+            {frozenset((matematicas.id, lenguaje.id)), frozenset((matematicas.id, otro_curso.id))},
+        )
+
+    def test_sin_choques(self):
+        # Bloques consecutivos, otro día, o el mismo docente en su única materia-curso
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8), ('Martes', 8))
+        self.asignar(self.cursos[0], self.materias[1], self.docentes[0], ('Lunes', 9))
+        contiguo = Horario.objects.create(dia_semana='Martes', hora_inicio=time(8, 50), hora_fin=time(9, 40))
+        self.asignar(self.cursos[1], self.materias[0], self.docentes[0]).horarios.set([contiguo])
+        self.assertEqual(self.choques(), [])
+
+    def test_asignar_horarios_rechaza_choques(self):
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8))
+        self.asignar(self.cursos[1], self.materias[0], self.docentes[1], ('Martes', 8))
+        lenguaje = self.asignar(self.cursos[0], self.materias[1], self.docentes[1])
+
+        horarios_ids = [self.bloques[('Lunes', 8)].id, self.bloques[('Martes', 8)].id]
+        serializer = AsignarHorariosSerializer(lenguaje, data={'horarios_ids': horarios_ids})
+        self.assertFalse(serializer.is_valid())
+        errores = serializer.errors['non_field_errors']
+        self.assertEqual(len(errores), 2)
+        self.assertTrue(any(error.startswith('Choque de horarios en el curso') for error in errores))
+        self.assertTrue(any(error.startswith('CHOQUE DE DOCENTE') for error in errores))
+
+        serializer = AsignarHorariosSerializer(lenguaje, data={'horarios_ids': [self.bloques[('Lunes', 9)].id]})
+        self.assertTrue(serializer.is_valid())
+
+    def test_asignar_docente_rechaza_choques(self):
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8))
+        lenguaje = self.asignar(self.cursos[1], self.materias[1], self.docentes[1], ('Lunes', 8))
+        serializer = AsignarDocenteSerializer(lenguaje, data={'docente_id': self.docentes[0].id})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(serializer.errors['non_field_errors']), 1)
+
+
+class AuditoriaHorariosTests(EscuelaTestMixin, TestCase):
+    """Auditoría de toda la escuela y simulación de cambios sin guardarlos"""
+
+    def setUp(self):
+        super().setUp()
+        self.matematicas = self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Lunes', 8))
+        self.lenguaje = self.asignar(self.cursos[1], self.materias[1], self.docentes[1], ('Lunes', 9))
+
+    def simular(self, *cambios):
+        return self.client.post('/api/horarios/auditoria/simular/', {'cambios': list(cambios)}, format='json')
+
+    def test_auditoria(self):
+        # El primer docente también da Matemáticas en el segundo curso a la misma hora
+        self.asignar(self.cursos[1], self.materias[0], self.docentes[0], ('Lunes', 8))
+        # Una consulta por tabla, sin importar el tamaño de la escuela
+        with self.assertNumQueries(6):
+            respuesta = self.client.get('/api/horarios/auditoria/')
+        self.assertEqual(respuesta.data['total_bloques'], 3)
+        self.assertEqual(respuesta.data['total_choques'], 1)
+        self.assertEqual(respuesta.data['choques_docente'], 1)
+
+    def test_simulacion(self):
+        cambio = {'materia_curso_id': self.lenguaje.id, 'docente_id': self.docentes[0].id,
+                  'horarios_ids': [self.bloques[('Lunes', 8)].id]}
+        respuesta = self.simular(cambio)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(respuesta.data['valido'])
+        self.assertEqual([choque['tipo'] for choque in respuesta.data['choques']], [CHOQUE_DOCENTE])
+
+        # Mover también la otra materia del docente resuelve el choque
+        respuesta = self.simular(
+            cambio, {'materia_curso_id': self.matematicas.id, 'horarios_ids': [self.bloques[('Martes', 8)].id]}
+        )
+        self.assertTrue(respuesta.data['valido'])
+        # Nada se guardó
+        self.assertEqual(list(self.lenguaje.horarios.all()), [self.bloques[('Lunes', 9)]])
+        self.lenguaje.refresh_from_db()
+        self.assertEqual(self.lenguaje.docente, self.docentes[1])
+
+    def test_asignacion_nueva(self):
+        cambio = {'curso_id': self.cursos[0].id, 'materia_id': self.materias[1].id,
+                  'horarios_ids': [self.bloques[('Lunes', 8)].id]}
+        respuesta = self.simular(cambio)
+        self.assertEqual([choque['tipo'] for choque in respuesta.data['choques']], [CHOQUE_CURSO])
+
+    def test_errores(self):
+        respuesta = self.simular(
+            {'materia_curso_id': 999999, 'horarios_ids': []},
+            {'materia_curso_id': self.lenguaje.id, 'horarios_ids': [999999]},
+        )
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(len(respuesta.data['errores']), 2)
+
+
+class GeneradorHorariosTests(EscuelaTestMixin, TestCase):
+    """Generador automático de horarios: sin choques, y lo que no entra se informa"""
+
+    def setUp(self):
+        super().setUp()
+        # Cuatro bloques; el primer docente y el primer curso los necesitan todos
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], horas=2)
+        self.asignar(self.cursos[0], self.materias[1], self.docentes[1], horas=2)
+        self.asignar(self.cursos[1], self.materias[0], self.docentes[0], horas=2)
+
+    def horarios(self):
+        return {
+            materia_curso.id: sorted(horario.id for horario in materia_curso.horarios.all())
+            for materia_curso in MateriaCurso.objects.prefetch_related('horarios')
+        }
+
+    def test_genera_sin_choques(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _, solucion = generar_horarios()
+        self.assertEqual(solucion.faltantes, {})
+        self.assertEqual([len(horarios) for horarios in self.horarios().values()], [2, 2, 2])
+        self.assertEqual(detectar_choques(cargar_bloques(todos=True)), [])
+
+    def test_informa_lo_que_no_entra(self):
+        # Dos horas más para el primer docente, que ya no tiene bloques libres
+        self.asignar(self.cursos[1], self.materias[1], self.docentes[0], horas=2)
+        _, solucion = generar_horarios()
+        self.assertEqual(sum(solucion.faltantes.values()), 2)
+        self.assertEqual(detectar_choques(cargar_bloques(todos=True)), [])
+        self.assertEqual(sum(len(horarios) for horarios in solucion.asignados.values()), 6)
+
+    def test_sin_guardar(self):
+        _, solucion = generar_horarios(guardar=False)
+        self.assertEqual(sum(len(horarios) for horarios in solucion.asignados.values()), 6)
+        self.assertEqual(list(self.horarios().values()), [[], [], []])
+
+    def test_volver_a_resolver_un_docente(self):
+        generar_horarios()
+        antes = self.horarios()
+        # Las materias del resto de la escuela quedan fijas y se conservan los horarios válidos
+        problema, solucion = generar_horarios(docentes_ids=[self.docentes[1].id])
+        self.assertEqual(len(problema.tareas), 1)
+        self.assertEqual(solucion.faltantes, {})
+        self.assertEqual(self.horarios(), antes)
+
+    def test_endpoint_solo_para_administradores(self):
+        usuario = Usuario.objects.create(email='admin@escuela.test')
+        self.client.force_authenticate(usuario)
+        self.assertEqual(self.client.post('/api/horarios/generar/', {}, format='json').status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario.roles.add(Rol.objects.create(nombre='ADMINISTRADOR'))
+        respuesta = self.client.post('/api/horarios/generar/', {'guardar': False}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['horas_asignadas'], 6)
+        self.assertFalse(respuesta.data['guardado'])
+
+
+class HorariosPublicosTests(EscuelaTestMixin, TestCase):
+    """Clases por día y por materia"""
+
+    def setUp(self):
+        super().setUp()
+        self.asignar(self.cursos[0], self.materias[0], self.docentes[0], ('Martes', 9), ('Lunes', 8))
+        self.asignar(self.cursos[1], self.materias[0], self.docentes[1], ('Lunes', 8))
+        miercoles = Horario.objects.create(dia_semana='Miércoles', hora_inicio=time(8), hora_fin=time(8, 50))
+        self.asignar(self.cursos[1], self.materias[1], self.docentes[1]).horarios.set([miercoles])
+
+    def test_por_dia(self):
+        # Un mismo bloque de varios cursos aparece una vez por curso
+        with self.assertNumQueries(2):
+            respuesta = self.client.get('/api/horarios/por-dia/Lunes/')
+        self.assertEqual([(fila['hora_inicio'], fila['curso']) for fila in respuesta.data],
+                         [('08:00', '1ro A'), ('08:00', '2do A')])
+        # Después, desde la cache
+        with self.assertNumQueries(0):
+            self.client.get('/api/horarios/por-dia/Lunes/')
+
+    def test_dia_sin_acento_ni_mayusculas(self):
+        respuesta = self.client.get('/api/horarios/por-dia/miercoles/')
+        self.assertEqual([fila['materia'] for fila in respuesta.data], ['Lenguaje'])
+        self.assertEqual(self.client.get('/api/horarios/por-dia/domingo/').status_code, 400)
+
+    def test_por_materia_en_orden_de_la_semana(self):
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(f'/api/horarios/por-materia/{self.materias[0].id}/')
+        self.assertEqual([(fila['dia'], fila['curso']) for fila in respuesta.data],
+                         [('Lunes', '1ro A'), ('Lunes', '2do A'), ('Martes', '1ro A')])
+
+    def test_cambios_descartan_la_cache(self):
+        self.client.get('/api/horarios/por-dia/Martes/')
+        with self.captureOnCommitCallbacks(execute=True):
+            MateriaCurso.objects.get(curso=self.cursos[0], materia=self.materias[0]).horarios.remove(
+                self.bloques[('Martes', 9)]
+            )
+        self.assertEqual(self.client.get('/api/horarios/por-dia/Martes/').data, [])
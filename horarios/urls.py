@@ -5,6 +5,9 @@ from .views import (
     HorarioViewSet,
     HorariosPorDiaView,
     HorariosPorMateriaView,
+    AuditoriaHorariosView,
+    SimularHorariosView,
+    GenerarHorariosView,
 )
 
 router = DefaultRouter()
@@ -19,5 +22,8 @@ urlpatterns = [
         HorariosPorMateriaView.as_view(),
         name="horarios-por-materia",
     ),
+    path("auditoria/", AuditoriaHorariosView.as_view(), name="auditoria-horarios"),
+    path("auditoria/simular/", SimularHorariosView.as_view(), name="simular-horarios"),
+    path("generar/", GenerarHorariosView.as_view(), name="generar-horarios"),
     path("", include(router.urls)),
 ]
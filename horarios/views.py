@@ -1,10 +1,16 @@
 from rest_framework import viewsets
 from horarios.models import Horario
-from materias.models import MateriaCurso
-from horarios.serializers import HorarioSerializer
+from horarios.serializers import GenerarHorariosSerializer, HorarioSerializer, SimulacionHorariosSerializer
+from horarios.agenda import AgendaEscolar
+from horarios.conflictos import CHOQUE_CURSO, CHOQUE_DOCENTE, choque_a_dict
+from horarios.generador import generar_horarios
+from horarios.proyecciones import obtener_horarios_por_dia, obtener_horarios_por_materia
+from usuarios.permisos import TieneRolOPermiso
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
+from rest_framework import status
+from drf_yasg.utils import swagger_auto_schema
 from unidecode import unidecode
 
 
@@ -17,9 +23,9 @@ class HorarioViewSet(viewsets.ModelViewSet):
         instance.save()
 
 
-# unidecode(dia) quita acentos ("Miércoles" → "Miercoles").
-# .capitalize() convierte "miercoles" → "Miercoles" (si así lo guardaste en tu base de datos).
-# __iexact en el filtro ignora mayúsculas/minúsculas.
+# unidecode(dia) quita acentos ("Miércoles" → "miercoles"), así el día se
+# puede pedir con o sin acento y en cualquier combinación de mayúsculas.
+DIAS_NORMALIZADOS = {unidecode(dia).lower(): dia for dia, _ in Horario.DIAS_SEMANA}
 
 
 class DiasSemanaChoicesView(APIView):
@@ -29,44 +35,92 @@ class DiasSemanaChoicesView(APIView):
 
 
 class HorariosPorDiaView(APIView):
-    def get(self, request, dia):
-        dia = unidecode(dia).capitalize()
-        # bloques = Horario.objects.filter(dia_semana=dia).order_by("hora_inicio")
-        bloques = Horario.objects.filter(dia_semana__iexact=dia).order_by("hora_inicio")
-        response = []
+    """Clases de un día: cada bloque horario con todos los cursos y materias que lo usan"""
 
-        for bloque in bloques:
-            mc = bloque.materia_curso
-            response.append(
-                {
-                    "hora_inicio": bloque.hora_inicio.strftime("%H:%M"),
-                    "hora_fin": bloque.hora_fin.strftime("%H:%M"),
-                    "curso": mc.curso.nombre,
-                    "materia": mc.materia.nombre,
-                }
-            )
+    def get(self, request, dia):
+        dia_semana = DIAS_NORMALIZADOS.get(unidecode(dia).lower())
+        if dia_semana is None:
+            return Response({"error": f"Día no válido: {dia}"}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(response)
+        return Response(obtener_horarios_por_dia(dia_semana))
 
 
 class HorariosPorMateriaView(APIView):
+    """Clases de una materia en todos sus cursos, por día y hora"""
+
     def get(self, request, materia_id):
-        relaciones = MateriaCurso.objects.filter(materia_id=materia_id)
-
-        response = []
-
-        for relacion in relaciones:
-            horarios = Horario.objects.filter(materia_curso=relacion).order_by(
-                "dia_semana", "hora_inicio"
-            )
-            for horario in horarios:
-                response.append(
-                    {
-                        "curso": relacion.curso.nombre,
-                        "dia": horario.dia_semana,
-                        "hora_inicio": horario.hora_inicio.strftime("%H:%M"),
-                        "hora_fin": horario.hora_fin.strftime("%H:%M"),
-                    }
-                )
-
-        return Response(response)
+        return Response(obtener_horarios_por_materia(materia_id))
+
+
+class AuditoriaHorariosView(APIView):
+    """Todos los choques de horarios de la escuela (docentes con dos clases a la vez y cursos solapados)"""
+
+    def get(self, request):
+        agenda = AgendaEscolar.cargar()
+        choques = agenda.choques()
+        return Response({
+            "total_bloques": len(agenda.bloques),
+            "total_choques": len(choques),
+            "choques_docente": sum(1 for choque in choques if choque.tipo == CHOQUE_DOCENTE),
+            "choques_curso": sum(1 for choque in choques if choque.tipo == CHOQUE_CURSO),
+            "choques": [choque_a_dict(choque) for choque in choques],
+        })
+
+
+class SimularHorariosView(APIView):
+    """
+    Validar un lote de cambios de horarios y docentes contra los horarios
+    actuales de toda la escuela, sin guardar nada
+    """
+
+    @swagger_auto_schema(request_body=SimulacionHorariosSerializer)
+    def post(self, request):
+        serializer = SimulacionHorariosSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        agenda = AgendaEscolar.cargar()
+        errores, choques = agenda.simular(serializer.validated_data["cambios"])
+        if errores:
+            return Response({"valido": False, "errores": errores}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "valido": not choques,
+            "total_choques": len(choques),
+            "choques": [choque_a_dict(choque) for choque in choques],
+        })
+
+
+class GenerarHorariosView(APIView):
+    """
+    Asignar automáticamente los horarios de las materias-curso con horas
+    semanales, sin choques de curso ni de docente, y guardarlos en una sola
+    transacción. Solo para administradores.
+    """
+    permission_classes = [TieneRolOPermiso]
+    roles_permitidos = ("ADMINISTRADOR",)
+
+    @swagger_auto_schema(request_body=GenerarHorariosSerializer)
+    def post(self, request):
+        serializer = GenerarHorariosSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+
+        problema, solucion = generar_horarios(
+            docentes_ids=datos.get("docentes_ids"),
+            conservar=datos["conservar"],
+            guardar=datos["guardar"],
+        )
+        return Response({
+            "guardado": datos["guardar"],
+            "total_materias_curso": len(problema.tareas),
+            "horas_asignadas": sum(len(horarios) for horarios in solucion.asignados.values()),
+            "horas_faltantes": sum(solucion.faltantes.values()),
+            "asignaciones": [
+                {"materia_curso_id": materia_curso_id, "horarios_ids": horarios_ids}
+                for materia_curso_id, horarios_ids in solucion.asignados.items()
+            ],
+            "faltantes": [
+                {"materia_curso_id": materia_curso_id, "horas_faltantes": horas}
+                for materia_curso_id, horas in solucion.faltantes.items()
+            ],
+        })
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cursos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Materia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+                ('descripcion', models.TextField(blank=True)),
+                ('activo', models.BooleanField(default=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MateriaCurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cursos.curso')),
+            ],
+            options={
+                'verbose_name': 'Materia por curso',
+                'verbose_name_plural': 'Materias por curso',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('horarios', '0001_initial'),
+        ('materias', '0001_initial'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materiacurso',
+            name='docente',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='materias_asignadas', to='usuarios.docente'),
+        ),
+        migrations.AddField(
+            model_name='materiacurso',
+            name='horarios',
+            field=models.ManyToManyField(blank=True, help_text='Horarios asignados a esta materia en este curso', related_name='materia_cursos', to='horarios.horario'),
+        ),
+        migrations.AddField(
+            model_name='materiacurso',
+            name='materia',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='materias.materia'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='materiacurso',
+            unique_together={('curso', 'materia')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materias', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materiacurso',
+            name='horas_semanales',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Bloques horarios por semana que necesita la materia (0: el generador de horarios no la toca)'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materias', '0003_materiacurso_horas_semanales'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='materia',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['id'], name='materia_activa_idx'),
+        ),
+    ]
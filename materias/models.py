@@ -7,6 +7,11 @@ class Materia(models.Model):
     descripcion = models.TextField(blank=True)
     activo = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(activo=True), name='materia_activa_idx'),
+        ]
+
     def __str__(self):
         return self.nombre
 
@@ -27,6 +32,10 @@ class MateriaCurso(models.Model):
         related_name="materia_cursos",
         help_text="Horarios asignados a esta materia en este curso"
     )
+    horas_semanales = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Bloques horarios por semana que necesita la materia (0: el generador de horarios no la toca)"
+    )
     activo = models.BooleanField(default=True)
 
     class Meta:
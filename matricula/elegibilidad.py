@@ -0,0 +1,62 @@
+"""
+Habilitación para rendir exámenes según la matrícula, para muchos estudiantes a la vez.
+
+Un estudiante puede rendir si su matrícula activa más reciente está vigente
+para la fecha del examen (Matricula.esta_vigente_para_fecha). Esa vigencia
+está precalculada por estudiante en VigenciaMatricula (ver vigencias.py), así
+que la habilitación de cualquier cantidad de estudiantes se resuelve con una
+consulta por clave, sin buscar la última matrícula de cada uno.
+"""
+from collections import namedtuple
+from .models import Matricula, VigenciaMatricula
+
+# `matricula` es la matrícula que lo habilita (o la última, si está vencida); None si no tiene
+Elegibilidad = namedtuple('Elegibilidad', ['puede_rendir', 'mensaje', 'matricula'])
+
+SIN_MATRICULA = Elegibilidad(False, "No tiene matrícula activa", None)
+
+
+def ultimas_matriculas(estudiantes_ids):
+    """{estudiante_id: su matrícula activa más reciente} con una sola consulta"""
+    matriculas = (
+        Matricula.objects.filter(estudiante_id__in=estudiantes_ids, estado=True)
+        .select_related('tipo_pago')
+        .order_by('estudiante_id', '-fecha', '-id')
+        .distinct('estudiante_id')
+    )
+    return {matricula.estudiante_id: matricula for matricula in matriculas}
+
+
+def evaluar(matricula, fecha_examen):
+    """Elegibilidad dada la última matrícula activa del estudiante (o None)"""
+    if matricula is None:
+        return SIN_MATRICULA
+    if matricula.esta_vigente_para_fecha(fecha_examen):
+        return Elegibilidad(True, "Matrícula vigente", matricula)
+    if matricula.tipo_pago and matricula.tipo_pago.tipo == 'mensual':
+        return Elegibilidad(False, "Matrícula mensual vencida. Debe renovar el pago.", matricula)
+    return Elegibilidad(False, "Matrícula no vigente", matricula)
+
+
+def evaluar_vigencia(vigencia, fecha_examen):
+    """Elegibilidad dada la vigencia precalculada del estudiante (o None); mismo resultado que evaluar()"""
+    if vigencia is None:
+        return SIN_MATRICULA
+    if vigencia.valida_hasta is not None and fecha_examen <= vigencia.valida_hasta:
+        return Elegibilidad(True, "Matrícula vigente", vigencia.matricula)
+    if vigencia.tipo_pago == 'mensual':
+        return Elegibilidad(False, "Matrícula mensual vencida. Debe renovar el pago.", vigencia.matricula)
+    return Elegibilidad(False, "Matrícula no vigente", vigencia.matricula)
+
+
+def evaluar_elegibilidad(estudiantes_ids, fecha_examen):
+    """{estudiante_id: Elegibilidad} para una fecha de examen, con una sola consulta"""
+    estudiantes_ids = set(estudiantes_ids)
+    if not estudiantes_ids:
+        return {}
+    vigencias = VigenciaMatricula.objects.select_related('matricula__tipo_pago').in_bulk(estudiantes_ids)
+    return {
+        estudiante_id: evaluar_vigencia(vigencias.get(estudiante_id), fecha_examen)
+        for estudiante_id in estudiantes_ids
+    }
+
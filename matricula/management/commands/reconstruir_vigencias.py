@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from usuarios.models import Estudiante
+from matricula.models import VigenciaMatricula
+from matricula.vigencias import TAMANO_LOTE, actualizar_vigencias, calcular_vigencias
+
+CAMPOS = ('matricula_id', 'tipo_pago', 'valida_desde', 'valida_hasta')
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la vigencia precalculada de la matrícula (VigenciaMatricula) de todos "
+        "los estudiantes. Con --verificar solo compara sin escribir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Comparar las vigencias guardadas con las matrículas sin modificar nada',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Cantidad de estudiantes procesados por lote (por defecto {TAMANO_LOTE})',
+        )
+
+    def handle(self, *args, **options):
+        ids = list(Estudiante.objects.order_by('id').values_list('id', flat=True))
+        lote = max(1, options['lote'])
+
+        if options['verificar']:
+            self._verificar(ids, lote)
+            return
+
+        con_vigencia = 0
+        for inicio in range(0, len(ids), lote):
+            con_vigencia += actualizar_vigencias(ids[inicio:inicio + lote])
+        self.stdout.write(self.style.SUCCESS(
+            f'Vigencias reconstruidas para {len(ids)} estudiantes ({con_vigencia} con matrícula activa)'
+        ))
+
+    def _verificar(self, ids, lote):
+        diferencias = 0
+        for inicio in range(0, len(ids), lote):
+            bloque = ids[inicio:inicio + lote]
+            esperadas = calcular_vigencias(bloque)
+            guardadas = VigenciaMatricula.objects.in_bulk(bloque)
+            for estudiante_id in bloque:
+                esperada, guardada = esperadas.get(estudiante_id), guardadas.get(estudiante_id)
+                if esperada is None and guardada is None:
+                    continue
+                if esperada is None or guardada is None:
+                    diferencias += 1
+                    estado = 'sin vigencia guardada' if guardada is None else 'vigencia de más'
+                    self.stdout.write(f'Estudiante {estudiante_id}: {estado}')
+                    continue
+                for campo in CAMPOS:
+                    if getattr(guardada, campo) != getattr(esperada, campo):
+                        diferencias += 1
+                        self.stdout.write(
+                            f'Estudiante {estudiante_id}: {campo} guardado={getattr(guardada, campo)} '
+                            f'esperado={getattr(esperada, campo)}'
+                        )
+
+        if diferencias:
+            raise CommandError(
+                f'Se encontraron {diferencias} diferencias. Ejecute el comando sin --verificar para reconstruir.'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Vigencias correctas para {len(ids)} estudiantes'))
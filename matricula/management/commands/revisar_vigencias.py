@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from matricula.vigencias import marcar_por_vencer
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca las matrículas que vencen en los próximos días (VigenciaMatricula.por_vencer) "
+        "y las lista. Pensado para ejecutarse una vez por día (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=settings.VIGENCIA_DIAS_AVISO,
+            help=f'Días de anticipación (por defecto VIGENCIA_DIAS_AVISO={settings.VIGENCIA_DIAS_AVISO})',
+        )
+
+    def handle(self, *args, **options):
+        por_vencer = (
+            marcar_por_vencer(dias=options['dias'])
+            .select_related('estudiante__usuario')
+            .order_by('valida_hasta', 'estudiante_id')
+        )
+        total = 0
+        for vigencia in por_vencer:
+            total += 1
+            usuario = vigencia.estudiante.usuario
+            self.stdout.write(
+                f'{vigencia.valida_hasta}: {usuario.first_name} {usuario.last_name} '
+                f'(estudiante {vigencia.estudiante_id}, matrícula {vigencia.matricula_id})'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} matrículas vencen en los próximos {options["dias"]} días'
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('matricula', '0001_initial'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matricula',
+            name='estudiante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='usuarios.estudiante'),
+        ),
+        migrations.AddField(
+            model_name='matricula',
+            name='tipo_pago',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='matricula.tipopago'),
+        ),
+    ]
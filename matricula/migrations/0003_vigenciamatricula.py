@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matricula', '0002_initial'),
+        ('usuarios', '0002_usuario_version_sesion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VigenciaMatricula',
+            fields=[
+                ('estudiante', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vigencia_matricula', serialize=False, to='usuarios.estudiante')),
+                ('tipo_pago', models.CharField(blank=True, help_text="Tipo de pago de la matrícula ('' si no tiene)", max_length=20)),
+                ('valida_desde', models.DateField()),
+                ('valida_hasta', models.DateField(blank=True, help_text='Último día en que puede rendir (9999-12-31 si es anual, vacío si la matrícula no habilita)', null=True)),
+                ('por_vencer', models.BooleanField(default=False, help_text='Vence en los próximos VIGENCIA_DIAS_AVISO días')),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('matricula', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='matricula.matricula')),
+            ],
+            options={
+                'verbose_name': 'Vigencia de matrícula',
+                'verbose_name_plural': 'Vigencias de matrícula',
+                'indexes': [models.Index(fields=['valida_hasta'], name='matricula_v_valida__6e1689_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matricula', '0003_vigenciamatricula'),
+        ('usuarios', '0002_usuario_version_sesion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='matricula',
+            index=models.Index(condition=models.Q(('estado', True)), fields=['estudiante', '-fecha', '-id'], name='matricula_activa_idx'),
+        ),
+    ]
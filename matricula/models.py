@@ -2,6 +2,9 @@ from django.db import models
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 
+# Vencimiento de las matrículas que no vencen (pago anual)
+SIN_VENCIMIENTO = date.max
+
 # Create your models here.
 
 class TipoPago(models.Model):
@@ -24,44 +27,84 @@ class Matricula(models.Model):
     descuento = models.FloatField(default=0)
     estado = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Última matrícula activa de cada estudiante (ver elegibilidad.ultimas_matriculas)
+            models.Index(
+                fields=['estudiante', '-fecha', '-id'],
+                condition=models.Q(estado=True),
+                name='matricula_activa_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.estudiante} - {self.fecha}"
 
+    def vigente_hasta(self):
+        """
+        Último día en que la matrícula habilita a rendir (SIN_VENCIMIENTO si es
+        anual), o None si no habilita en ninguna fecha
+        """
+        if not self.estado or not self.tipo_pago:
+            return None
+
+        if self.tipo_pago.tipo == 'anual':
+            # Si es pago anual, está vigente por todo el año académico
+            return SIN_VENCIMIENTO
+        elif self.tipo_pago.tipo == 'mensual':
+            # Si es pago mensual, vence al mes del pago
+            return self.fecha + relativedelta(months=1)
+
+        return None
+
     def esta_vigente_para_fecha(self, fecha_examen):
         """
         Verifica si la matrícula está vigente para una fecha de examen específica
         """
-        if not self.estado:
-            return False
-            
-        if self.tipo_pago and self.tipo_pago.tipo == 'anual':
-            # Si es pago anual, está vigente por todo el año académico
-            return True
-        elif self.tipo_pago and self.tipo_pago.tipo == 'mensual':
-            # Si es pago mensual, verificar si está dentro del mes de pago
-            fecha_vencimiento = self.fecha + relativedelta(months=1)
-            return fecha_examen <= fecha_vencimiento
-        
-        return False
+        vencimiento = self.vigente_hasta()
+        return vencimiento is not None and fecha_examen <= vencimiento
 
     @classmethod
     def estudiante_puede_rendir_examen(cls, estudiante, fecha_examen):
         """
         Método de clase para verificar si un estudiante puede rendir un examen en una fecha específica
         """
-        # Buscar la matrícula más reciente del estudiante que esté activa
-        matricula_activa = cls.objects.filter(
-            estudiante=estudiante,
-            estado=True
-        ).order_by('-fecha').first()
-        
-        if not matricula_activa:
-            return False, "No tiene matrícula activa"
-            
-        if matricula_activa.esta_vigente_para_fecha(fecha_examen):
-            return True, matricula_activa
-        else:
-            if matricula_activa.tipo_pago.tipo == 'mensual':
-                return False, "Matrícula mensual vencida. Debe renovar el pago."
-            else:
-                return False, "Matrícula no vigente"
+        from .elegibilidad import evaluar_elegibilidad
+
+        estudiante_id = getattr(estudiante, 'pk', estudiante)
+        elegibilidad = evaluar_elegibilidad([estudiante_id], fecha_examen)[estudiante_id]
+        if elegibilidad.puede_rendir:
+            return True, elegibilidad.matricula
+        return False, elegibilidad.mensaje
+
+
+class VigenciaMatricula(models.Model):
+    """
+    Vigencia precalculada de la matrícula de cada estudiante (según su última
+    matrícula activa). Se mantiene al modificar matrículas y tipos de pago;
+    un estudiante sin matrícula activa no tiene fila.
+    """
+    estudiante = models.OneToOneField(
+        'usuarios.Estudiante',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='vigencia_matricula'
+    )
+    matricula = models.ForeignKey('matricula.Matricula', on_delete=models.CASCADE, related_name='+')
+    tipo_pago = models.CharField(max_length=20, blank=True, help_text="Tipo de pago de la matrícula ('' si no tiene)")
+    valida_desde = models.DateField()
+    valida_hasta = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Último día en que puede rendir (9999-12-31 si es anual, vacío si la matrícula no habilita)"
+    )
+    por_vencer = models.BooleanField(default=False, help_text="Vence en los próximos VIGENCIA_DIAS_AVISO días")
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Vigencia de matrícula"
+        verbose_name_plural = "Vigencias de matrícula"
+        indexes = [models.Index(fields=['valida_hasta'])]
+
+    def __str__(self):
+        return f"{self.estudiante_id}: {self.valida_desde} - {self.valida_hasta}"
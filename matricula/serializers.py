@@ -9,4 +9,13 @@ class MatriculaSerializer(serializers.ModelSerializer):
 class TipoPagoSerializer(serializers.ModelSerializer):
     class Meta:
         model = TipoPago
-        fields = '__all__' 
\ No newline at end of file
+        fields = '__all__' 
+
+class ElegibilidadLoteSerializer(serializers.Serializer):
+    fecha = serializers.DateField(required=False, help_text="Fecha del examen (por defecto hoy)")
+    curso_id = serializers.IntegerField(required=False, help_text="Solo los estudiantes de este curso")
+    estudiantes_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False,
+        help_text="Solo estos estudiantes"
+    )
+    solo_no_habilitados = serializers.BooleanField(required=False, default=False)
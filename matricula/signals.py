@@ -0,0 +1,41 @@
+# matricula/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import Matricula, TipoPago
+from .vigencias import actualizar_vigencias, estudiantes_con_tipo_pago
+
+
+@receiver(pre_save, sender=Matricula)
+def recordar_estudiante(sender, instance, **kwargs):
+    # Si la matrícula cambia de estudiante, también hay que recalcular al anterior
+    instance._estudiante_anterior = None
+    if instance.pk:
+        instance._estudiante_anterior = (
+            Matricula.objects.filter(pk=instance.pk).values_list('estudiante_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Matricula)
+@receiver(post_delete, sender=Matricula)
+def matricula_modificada(sender, instance, origin=None, **kwargs):
+    # Un borrado en cascada desde el estudiante elimina también su vigencia
+    if origin is not None and getattr(origin, 'model', type(origin)) is not sender:
+        return
+    actualizar_vigencias({instance.estudiante_id, getattr(instance, '_estudiante_anterior', None)} - {None})
+
+
+@receiver(post_save, sender=TipoPago)
+def tipo_pago_modificado(sender, instance, created, **kwargs):
+    if not created:
+        actualizar_vigencias(estudiantes_con_tipo_pago(instance.pk))
+
+
+@receiver(pre_delete, sender=TipoPago)
+def recordar_estudiantes_del_tipo_pago(sender, instance, **kwargs):
+    # Al borrarlo, las matrículas quedan sin tipo de pago (SET_NULL) antes del post_delete
+    instance._estudiantes = estudiantes_con_tipo_pago(instance.pk)
+
+
+@receiver(post_delete, sender=TipoPago)
+def tipo_pago_eliminado(sender, instance, **kwargs):
+    actualizar_vigencias(getattr(instance, '_estudiantes', ()))
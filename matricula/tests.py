@@ -1,3 +1,173 @@
+import io
+from datetime import date
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+from cursos.models import Curso, Trimestre
+from materias.models import Materia, MateriaCurso
+from seguimiento.models import Examen, Seguimiento
+from usuarios.models import Estudiante, Usuario
+from .elegibilidad import evaluar_elegibilidad
+from .models import SIN_VENCIMIENTO, Matricula, TipoPago, VigenciaMatricula
+from .vigencias import marcar_por_vencer
 
-# Create your tests here.
+FECHA_EXAMEN = date(2025, 3, 20)
+
+
+class MatriculasTestMixin:
+    """
+    Un curso con un estudiante por caso: pago anual, pago mensual vigente,
+    pago mensual vencido (aunque antes tuvo uno anual) y sin matrícula
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.curso = Curso.objects.create(nombre='5to A')
+        cls.anual = TipoPago.objects.create(nombre='Anual', tipo='anual')
+        cls.mensual = TipoPago.objects.create(nombre='Mensual', tipo='mensual')
+        cls.estudiantes = {
+            caso: Estudiante.objects.create(
+                usuario=Usuario.objects.create(email=f'{caso}@escuela.test', first_name=caso.capitalize()),
+                direccion='Calle 1', fecha_nacimiento=date(2012, 1, 1), curso=cls.curso,
+            )
+            for caso in ('anual', 'vigente', 'vencida', 'sin_matricula')
+        }
+        cls.matricular('anual', cls.anual, date(2025, 2, 1))
+        cls.matricular('vigente', cls.mensual, date(2025, 3, 1))
+        # La matrícula anual anterior no cuenta: decide la última activa
+        cls.matricular('vencida', cls.anual, date(2024, 2, 1))
+        cls.matricular('vencida', cls.mensual, date(2025, 1, 10))
+
+    @classmethod
+    def matricular(cls, caso, tipo_pago, fecha, estado=True):
+        return Matricula.objects.create(
+            estudiante=cls.estudiantes[caso], tipo_pago=tipo_pago, fecha=fecha, monto=100, estado=estado
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def elegibilidad(self, fecha=FECHA_EXAMEN):
+        ids = {estudiante.id: caso for caso, estudiante in self.estudiantes.items()}
+        return {ids[estudiante_id]: resultado for estudiante_id, resultado in evaluar_elegibilidad(ids, fecha).items()}
+
+
+class ElegibilidadTests(MatriculasTestMixin, TestCase):
+    """Habilitación para rendir de muchos estudiantes a la vez"""
+
+    def test_elegibilidad(self):
+        with self.assertNumQueries(1):
+            elegibilidad = self.elegibilidad()
+        self.assertEqual(
+            {caso: (resultado.puede_rendir, resultado.mensaje) for caso, resultado in elegibilidad.items()},
+            {
+                'anual': (True, 'Matrícula vigente'),
+                'vigente': (True, 'Matrícula vigente'),
+                'vencida': (False, 'Matrícula mensual vencida. Debe renovar el pago.'),
+                'sin_matricula': (False, 'No tiene matrícula activa'),
+            },
+        )
+        self.assertEqual(elegibilidad['vencida'].matricula.fecha, date(2025, 1, 10))
+
+    def test_mismo_resultado_que_el_metodo_del_modelo(self):
+        for caso, resultado in self.elegibilidad().items():
+            puede_rendir, _ = Matricula.estudiante_puede_rendir_examen(self.estudiantes[caso], FECHA_EXAMEN)
+            self.assertEqual(puede_rendir, resultado.puede_rendir, caso)
+
+    def test_endpoint_por_curso(self):
+        respuesta = self.client.post(
+            '/api/matricula/elegibilidad/',
+            {'fecha': FECHA_EXAMEN, 'curso_id': self.curso.id, 'solo_no_habilitados': True},
+            format='json',
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.data['habilitados'], respuesta.data['no_habilitados']), (2, 2))
+        self.assertEqual(
+            sorted(fila['estudiante_id'] for fila in respuesta.data['estudiantes']),
+            sorted([self.estudiantes['vencida'].id, self.estudiantes['sin_matricula'].id]),
+        )
+
+    def test_examenes_en_lote(self):
+        materia_curso = MateriaCurso.objects.create(curso=self.curso, materia=Materia.objects.create(nombre='Historia'))
+        trimestre = Trimestre.objects.create(
+            nombre='Primer Trimestre', fecha_inicio=date(2025, 2, 3), fecha_fin=date(2025, 5, 9)
+        )
+        seguimientos = {
+            caso: Seguimiento.objects.create(materia_curso=materia_curso, trimestre=trimestre, estudiante=estudiante)
+            for caso, estudiante in self.estudiantes.items()
+        }
+
+        def examenes(*casos):
+            return [{'seguimiento': seguimientos[caso].id, 'fecha': FECHA_EXAMEN, 'nota_examen': 70} for caso in casos]
+
+        url = '/api/seguimiento/examenes/crear_lote/'
+        # Un estudiante no habilitado: no se crea ningún examen
+        respuesta = self.client.post(url, examenes('anual', 'vencida'), format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Examen.objects.exists())
+
+        respuesta = self.client.post(url, examenes('anual', 'vigente'), format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(
+            sorted(Examen.objects.values_list('matricula__estudiante_id', flat=True)),
+            sorted([self.estudiantes['anual'].id, self.estudiantes['vigente'].id]),
+        )
+
+
+class VigenciasTests(MatriculasTestMixin, TestCase):
+    """La vigencia precalculada sigue a las matrículas y a los tipos de pago"""
+
+    def vigencia(self, caso):
+        return VigenciaMatricula.objects.filter(estudiante=self.estudiantes[caso]).first()
+
+    def verificar(self):
+        call_command('reconstruir_vigencias', verificar=True, stdout=io.StringIO())
+
+    def test_vigencias(self):
+        self.assertEqual(self.vigencia('anual').valida_hasta, SIN_VENCIMIENTO)
+        self.assertEqual(self.vigencia('vigente').valida_hasta, date(2025, 4, 1))
+        self.assertEqual(self.vigencia('vencida').valida_desde, date(2025, 1, 10))
+        self.assertIsNone(self.vigencia('sin_matricula'))
+        self.verificar()
+
+    def test_nueva_matricula_y_baja(self):
+        matricula = self.matricular('vencida', self.mensual, date(2025, 3, 5))
+        self.assertEqual(self.vigencia('vencida').matricula, matricula)
+        self.assertTrue(self.elegibilidad()['vencida'].puede_rendir)
+
+        # Al desactivarla vuelve a decidir la anterior
+        matricula.estado = False
+        matricula.save()
+        self.assertEqual(self.vigencia('vencida').valida_desde, date(2025, 1, 10))
+
+        Matricula.objects.filter(estudiante=self.estudiantes['vigente']).delete()
+        self.assertIsNone(self.vigencia('vigente'))
+        self.verificar()
+
+    def test_cambio_de_estudiante(self):
+        matricula = Matricula.objects.get(estudiante=self.estudiantes['anual'])
+        matricula.estudiante = self.estudiantes['sin_matricula']
+        matricula.save()
+        self.assertIsNone(self.vigencia('anual'))
+        self.assertEqual(self.vigencia('sin_matricula').tipo_pago, 'anual')
+
+    def test_cambio_y_borrado_del_tipo_de_pago(self):
+        self.mensual.tipo = 'anual'
+        self.mensual.save()
+        self.assertTrue(self.elegibilidad()['vencida'].puede_rendir)
+        self.verificar()
+
+        self.mensual.delete()
+        # Sin tipo de pago la matrícula no habilita en ninguna fecha
+        self.assertIsNone(self.vigencia('vigente').valida_hasta)
+        self.assertEqual(self.elegibilidad()['vigente'].mensaje, 'Matrícula no vigente')
+        self.verificar()
+
+    def test_por_vencer(self):
+        por_vencer = marcar_por_vencer(dias=7, hoy=date(2025, 3, 28))
+        self.assertEqual(
+            list(por_vencer.values_list('estudiante_id', flat=True)), [self.estudiantes['vigente'].id]
+        )
+        self.assertTrue(self.vigencia('vigente').por_vencer)
+        marcar_por_vencer(dias=7, hoy=date(2025, 4, 2))
+        self.assertFalse(VigenciaMatricula.objects.filter(por_vencer=True).exists())
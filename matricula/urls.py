@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MatriculaViewSet, TipoPagoViewSet
+from .views import ElegibilidadLoteView, MatriculaViewSet, TipoPagoViewSet
 
 router = DefaultRouter()
 router.register(r'matriculas', MatriculaViewSet)
 router.register(r'tipopago', TipoPagoViewSet)
 
 urlpatterns = [
+    path('elegibilidad/', ElegibilidadLoteView.as_view(), name='elegibilidad-lote'),
     path('', include(router.urls)),
 ] 
\ No newline at end of file
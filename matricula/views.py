@@ -1,14 +1,75 @@
 from django.shortcuts import render
+from datetime import date
 from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from usuarios.models import Estudiante
+from .elegibilidad import evaluar_elegibilidad
 from .models import Matricula, TipoPago
-from .serializers import MatriculaSerializer, TipoPagoSerializer
+from .serializers import ElegibilidadLoteSerializer, MatriculaSerializer, TipoPagoSerializer
+from backend.paginacion import PaginacionCursor
 
 # Create your views here.
 
 class MatriculaViewSet(viewsets.ModelViewSet):
     queryset = Matricula.objects.all()
     serializer_class = MatriculaSerializer
+    pagination_class = PaginacionCursor
 
 class TipoPagoViewSet(viewsets.ModelViewSet):
     queryset = TipoPago.objects.all()
     serializer_class = TipoPagoSerializer
+
+
+class ElegibilidadLoteView(APIView):
+    """
+    Qué estudiantes pueden rendir exámenes en una fecha según su matrícula:
+    los de un curso, una lista de estudiantes o (sin filtros) toda la escuela.
+    """
+
+    @swagger_auto_schema(request_body=ElegibilidadLoteSerializer)
+    def post(self, request):
+        serializer = ElegibilidadLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+        fecha = datos.get('fecha') or date.today()
+
+        estudiantes = Estudiante.objects.filter(usuario__activo=True)
+        if 'curso_id' in datos:
+            estudiantes = estudiantes.filter(curso_id=datos['curso_id'])
+        if 'estudiantes_ids' in datos:
+            estudiantes = estudiantes.filter(id__in=datos['estudiantes_ids'])
+        estudiantes = list(
+            estudiantes.order_by('usuario__last_name', 'usuario__first_name', 'id')
+            .values_list('id', 'usuario__first_name', 'usuario__last_name', 'curso_id')
+        )
+
+        elegibilidad = evaluar_elegibilidad([estudiante[0] for estudiante in estudiantes], fecha)
+        resultados = []
+        for estudiante_id, nombre, apellido, curso_id in estudiantes:
+            resultado = elegibilidad[estudiante_id]
+            if datos['solo_no_habilitados'] and resultado.puede_rendir:
+                continue
+            matricula = resultado.matricula
+            resultados.append({
+                'estudiante_id': estudiante_id,
+                'estudiante': f"{nombre} {apellido}",
+                'curso_id': curso_id,
+                'puede_rendir': resultado.puede_rendir,
+                'mensaje': resultado.mensaje,
+                'matricula': {
+                    'id': matricula.id,
+                    'tipo_pago': matricula.tipo_pago.get_tipo_display() if matricula.tipo_pago else 'Sin tipo',
+                    'fecha_pago': matricula.fecha,
+                } if matricula else None,
+            })
+
+        habilitados = sum(1 for resultado in elegibilidad.values() if resultado.puede_rendir)
+        return Response({
+            'fecha': fecha,
+            'total_estudiantes': len(estudiantes),
+            'habilitados': habilitados,
+            'no_habilitados': len(estudiantes) - habilitados,
+            'estudiantes': resultados,
+        })
@@ -0,0 +1,92 @@
+"""
+Vigencia precalculada de la matrícula de cada estudiante (VigenciaMatricula).
+
+La habilitación para rendir depende solo de la última matrícula activa del
+estudiante, así que se guarda una fila por estudiante con el rango en que
+esa matrícula lo habilita. Las señales de matricula/signals.py la
+recalculan al guardar o borrar una matrícula o un tipo de pago; las
+consultas de habilitación pasan a ser una búsqueda por clave o por rango
+de `valida_hasta` (indexado).
+"""
+from datetime import date, timedelta
+from django.conf import settings
+from django.db import transaction
+from .models import Matricula, VigenciaMatricula
+
+TAMANO_LOTE = 500
+
+CAMPOS_VIGENCIA = ['matricula', 'tipo_pago', 'valida_desde', 'valida_hasta', 'por_vencer', 'actualizado_en']
+
+
+def _en_lotes(ids):
+    ids = list(ids)
+    for inicio in range(0, len(ids), TAMANO_LOTE):
+        yield ids[inicio:inicio + TAMANO_LOTE]
+
+
+def _por_vencer(valida_hasta, hoy=None):
+    hoy = hoy or date.today()
+    return valida_hasta is not None and hoy <= valida_hasta <= hoy + timedelta(days=settings.VIGENCIA_DIAS_AVISO)
+
+
+def calcular_vigencias(estudiantes_ids):
+    """{estudiante_id: VigenciaMatricula sin guardar} de los estudiantes con matrícula activa"""
+    from .elegibilidad import ultimas_matriculas
+
+    vigencias = {}
+    for estudiante_id, matricula in ultimas_matriculas(estudiantes_ids).items():
+        valida_hasta = matricula.vigente_hasta()
+        vigencias[estudiante_id] = VigenciaMatricula(
+            estudiante_id=estudiante_id,
+            matricula=matricula,
+            tipo_pago=matricula.tipo_pago.tipo if matricula.tipo_pago else '',
+            valida_desde=matricula.fecha,
+            valida_hasta=valida_hasta,
+            por_vencer=_por_vencer(valida_hasta),
+        )
+    return vigencias
+
+
+def actualizar_vigencias(estudiantes_ids):
+    """
+    Recalcular la vigencia de varios estudiantes: upsert de los que tienen
+    matrícula activa y borrado de los que ya no. Una consulta de lectura y
+    dos de escritura por lote.
+    """
+    total = 0
+    for lote in _en_lotes(set(estudiantes_ids)):
+        vigencias = calcular_vigencias(lote)
+        with transaction.atomic():
+            if vigencias:
+                VigenciaMatricula.objects.bulk_create(
+                    vigencias.values(),
+                    update_conflicts=True,
+                    unique_fields=['estudiante'],
+                    update_fields=CAMPOS_VIGENCIA,
+                )
+            VigenciaMatricula.objects.filter(estudiante_id__in=lote).exclude(estudiante_id__in=list(vigencias)).delete()
+        total += len(vigencias)
+    return total
+
+
+def estudiantes_con_tipo_pago(tipo_pago_id):
+    """Estudiantes que tienen alguna matrícula activa con el tipo de pago"""
+    return set(
+        Matricula.objects.filter(tipo_pago_id=tipo_pago_id, estado=True).values_list('estudiante_id', flat=True)
+    )
+
+
+def marcar_por_vencer(dias=None, hoy=None):
+    """
+    Actualizar `por_vencer` de todas las vigencias (las que vencen entre hoy
+    y `dias` días más) con dos UPDATE. Retorna las vigencias por vencer.
+    """
+    hoy = hoy or date.today()
+    limite = hoy + timedelta(days=settings.VIGENCIA_DIAS_AVISO if dias is None else dias)
+    por_vencer = VigenciaMatricula.objects.filter(valida_hasta__gte=hoy, valida_hasta__lte=limite)
+    with transaction.atomic():
+        VigenciaMatricula.objects.filter(por_vencer=True).exclude(pk__in=por_vencer.values('pk')).update(
+            por_vencer=False
+        )
+        por_vencer.filter(por_vencer=False).update(por_vencer=True)
+    return por_vencer
@@ -0,0 +1,235 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from .models import Seguimiento, EstadisticaSeguimiento, Tarea, Participacion, Examen, Asistencia
+
+# Pesos de la fórmula de nota trimestral (puedes modificarlos)
+PESO_TAREAS = 0.25
+PESO_PARTICIPACIONES = 0.15
+PESO_EXAMENES = 0.50
+PESO_ASISTENCIA = 0.10
+
+# Cantidad máxima de seguimientos por consulta agregada
+TAMANO_LOTE = 500
+
+# Campos de EstadisticaSeguimiento que se actualizan en cada recálculo
+CAMPOS_ESTADISTICA = [
+    'total_tareas', 'suma_tareas', 'prom_tareas',
+    'total_participaciones', 'suma_participaciones', 'prom_participaciones',
+    'total_examenes', 'suma_examenes', 'prom_examenes',
+    'total_asistencias', 'total_presentes', 'porcentaje_asistencia',
+    'actualizado_en',
+]
+
+# Seguimientos pendientes de recálculo mientras hay un bloque diferido activo
+_pendientes = ContextVar('seguimientos_pendientes', default=None)
+
+
+def _subconsulta(modelo, expresion):
+    """Subconsulta correlacionada que agrega las filas hijas de cada seguimiento"""
+    return Subquery(
+        modelo.objects.filter(seguimiento=OuterRef('pk'))
+        .order_by()
+        .values('seguimiento')
+        .annotate(valor=expresion)
+        .values('valor')[:1]
+    )
+
+
+def _anotar_agregados(queryset):
+    """Anotar conteos y sumas de tareas, participaciones, exámenes y asistencia en una sola consulta"""
+    return queryset.annotate(
+        _total_tareas=_subconsulta(Tarea, Count('id')),
+        _suma_tareas=_subconsulta(Tarea, Sum('nota_tarea')),
+        _total_participaciones=_subconsulta(Participacion, Count('id')),
+        _suma_participaciones=_subconsulta(Participacion, Sum('nota_participacion')),
+        _total_examenes=_subconsulta(Examen, Count('id')),
+        _suma_examenes=_subconsulta(Examen, Sum('nota_examen')),
+        _total_asistencias=_subconsulta(Asistencia, Count('id')),
+        _total_presentes=_subconsulta(Asistencia, Count('id', filter=Q(asistencia=True))),
+    )
+
+
+def _estadistica_de(seguimiento):
+    """Construir (sin guardar) la EstadisticaSeguimiento a partir de las anotaciones"""
+    estadistica = EstadisticaSeguimiento(seguimiento_id=seguimiento.pk, actualizado_en=timezone.now())
+    for tipo in ('tareas', 'participaciones', 'examenes'):
+        total = getattr(seguimiento, f'_total_{tipo}') or 0
+        suma = getattr(seguimiento, f'_suma_{tipo}') or 0.0
+        setattr(estadistica, f'total_{tipo}', total)
+        setattr(estadistica, f'suma_{tipo}', suma)
+        setattr(estadistica, f'prom_{tipo}', suma / total if total else 0)
+
+    estadistica.total_asistencias = seguimiento._total_asistencias or 0
+    estadistica.total_presentes = seguimiento._total_presentes or 0
+    estadistica.porcentaje_asistencia = (
+        estadistica.total_presentes / estadistica.total_asistencias * 100
+        if estadistica.total_asistencias else 0
+    )
+    return estadistica
+
+
+def _en_lotes(ids):
+    ids = list(dict.fromkeys(ids))
+    for inicio in range(0, len(ids), TAMANO_LOTE):
+        yield ids[inicio:inicio + TAMANO_LOTE]
+
+
+def calcular_nota(promedios):
+    """Aplicar la fórmula de nota trimestral sobre un diccionario de promedios"""
+    nota_final = (
+        promedios['prom_tareas'] * PESO_TAREAS +
+        promedios['prom_participaciones'] * PESO_PARTICIPACIONES +
+        promedios['prom_examenes'] * PESO_EXAMENES +
+        (promedios['porcentaje_asistencia'] / 100) * PESO_ASISTENCIA
+    )
+    return round(nota_final, 2)
+
+
+def calcular_estadisticas(seguimiento_ids):
+    """
+    Calcular desde las tablas de origen (sin guardar) las estadísticas de varios
+    seguimientos, con una consulta agregada por lote.
+    Retorna {seguimiento_id: EstadisticaSeguimiento}
+    """
+    estadisticas = {}
+    for lote in _en_lotes(seguimiento_ids):
+        seguimientos = _anotar_agregados(Seguimiento.objects.filter(pk__in=lote).only('id'))
+        for seguimiento in seguimientos:
+            estadisticas[seguimiento.pk] = _estadistica_de(seguimiento)
+    return estadisticas
+
+
+def obtener_promedios(seguimiento_ids):
+    """
+    Obtener los promedios de varios seguimientos con una consulta agregada por lote.
+    Retorna {seguimiento_id: {'prom_tareas', 'prom_participaciones', 'prom_examenes', 'porcentaje_asistencia'}}
+    """
+    return {
+        seguimiento_id: estadistica.promedios()
+        for seguimiento_id, estadistica in calcular_estadisticas(seguimiento_ids).items()
+    }
+
+
+def obtener_estadisticas(seguimiento_ids):
+    """
+    Leer las estadísticas precalculadas de varios seguimientos.
+    Las que todavía no existen se calculan y guardan en el momento.
+    Retorna {seguimiento_id: EstadisticaSeguimiento}
+    """
+    seguimiento_ids = list(dict.fromkeys(seguimiento_ids))
+    estadisticas = EstadisticaSeguimiento.objects.in_bulk(seguimiento_ids)
+    faltantes = [i for i in seguimiento_ids if i not in estadisticas]
+    if faltantes:
+        recalcular_notas(faltantes)
+        estadisticas.update(EstadisticaSeguimiento.objects.in_bulk(faltantes))
+    return estadisticas
+
+
+def guardar_estadisticas(estadisticas):
+    """Insertar o actualizar (upsert) un lote de EstadisticaSeguimiento"""
+    EstadisticaSeguimiento.objects.bulk_create(
+        estadisticas,
+        update_conflicts=True,
+        unique_fields=['seguimiento'],
+        update_fields=CAMPOS_ESTADISTICA,
+        batch_size=TAMANO_LOTE,
+    )
+
+
+def recalcular_notas(seguimiento_ids):
+    """
+    Recalcular las estadísticas y la nota trimestral de varios seguimientos.
+
+    Los agregados se obtienen con una consulta por lote; las estadísticas se
+    guardan con un upsert, solo las notas que cambiaron se escriben con
+    bulk_update y se descartan las predicciones en cache de los estudiantes
+    afectados. Los seguimientos que ya no existen se ignoran.
+    Retorna {seguimiento_id: nota_trimestral}.
+    """
+    from .prediccion import invalidar_predicciones
+
+    notas = {}
+    for lote in _en_lotes(seguimiento_ids):
+        seguimientos = _anotar_agregados(
+            Seguimiento.objects.filter(pk__in=lote).only('id', 'nota_trimestral', 'estudiante', 'materia_curso')
+        )
+        estadisticas = []
+        modificados = []
+        pares = set()
+        for seguimiento in seguimientos:
+            pares.add((seguimiento.estudiante_id, seguimiento.materia_curso_id))
+            estadistica = _estadistica_de(seguimiento)
+            estadisticas.append(estadistica)
+            nota = calcular_nota(estadistica.promedios())
+            notas[seguimiento.pk] = nota
+            if seguimiento.nota_trimestral != nota:
+                seguimiento.nota_trimestral = nota
+                modificados.append(seguimiento)
+        if estadisticas:
+            guardar_estadisticas(estadisticas)
+        if modificados:
+            Seguimiento.objects.bulk_update(modificados, ['nota_trimestral'])
+        # Los datos de entrada del modelo ML cambiaron: descartar predicciones guardadas
+        invalidar_predicciones(pares)
+    return notas
+
+
+def programar_recalculo(seguimiento_id):
+    """
+    Recalcular la nota de un seguimiento, o dejarla pendiente si hay un
+    bloque recalculo_diferido() activo.
+    """
+    pendientes = _pendientes.get()
+    if pendientes is None:
+        recalcular_notas([seguimiento_id])
+    else:
+        pendientes.add(seguimiento_id)
+
+
+def _confirmar_pendientes(pendientes):
+    if pendientes:
+        transaction.on_commit(lambda: recalcular_notas(pendientes))
+
+
+@contextmanager
+def recalculo_diferido():
+    """
+    Agrupar los recálculos de nota disparados dentro del bloque.
+
+    Cada seguimiento afectado se recalcula una sola vez, en una única pasada,
+    cuando se confirma la transacción actual (transaction.on_commit). Fuera de
+    una transacción el recálculo se ejecuta al salir del bloque. Los bloques
+    anidados se integran al bloque más externo.
+    """
+    if _pendientes.get() is not None:
+        yield
+        return
+
+    pendientes = set()
+    token = _pendientes.set(pendientes)
+    try:
+        yield
+    finally:
+        _pendientes.reset(token)
+        _confirmar_pendientes(pendientes)
+
+
+@asynccontextmanager
+async def arecalculo_diferido():
+    """Versión async de recalculo_diferido(): el recálculo final corre fuera del event loop"""
+    if _pendientes.get() is not None:
+        yield
+        return
+
+    pendientes = set()
+    token = _pendientes.set(pendientes)
+    try:
+        yield
+    finally:
+        _pendientes.reset(token)
+        if pendientes:
+            await sync_to_async(_confirmar_pendientes)(pendientes)
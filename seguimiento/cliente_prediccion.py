@@ -0,0 +1,393 @@
+import asyncio
+import threading
+import time
+import weakref
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+# Límites (en ms) del histograma de latencia; el último tramo es "más de 10 s"
+LIMITES_LATENCIA_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Respuestas que indican un problema transitorio del microservicio
+ESTADOS_REINTENTABLES = (502, 503, 504)
+
+
+class ErrorPrediccion(Exception):
+    """Error al obtener una predicción del microservicio"""
+
+
+class ServicioNoDisponibleError(ErrorPrediccion):
+    """El circuito está abierto: el microservicio falló repetidamente y no se llama"""
+
+
+class ConexionPrediccionError(ErrorPrediccion):
+    """No se pudo conectar al microservicio"""
+
+
+class TimeoutPrediccionError(ErrorPrediccion):
+    """El microservicio no respondió a tiempo"""
+
+
+class RespuestaPrediccionError(ErrorPrediccion):
+    """El microservicio respondió con un estado distinto de 200 o con un contenido inválido"""
+
+    def __init__(self, status_code, texto):
+        super().__init__(f'Error del microservicio ML: {texto}')
+        self.status_code = status_code
+
+
+class Circuito:
+    """
+    Circuit breaker: tras `umbral_fallos` fallos consecutivos se abre y
+    rechaza las llamadas durante `espera` segundos. Luego deja pasar una
+    llamada de prueba (semiabierto): si funciona se cierra, si falla se
+    vuelve a abrir.
+    """
+    CERRADO = 'cerrado'
+    ABIERTO = 'abierto'
+    SEMIABIERTO = 'semiabierto'
+
+    def __init__(self, umbral_fallos, espera):
+        self.umbral_fallos = umbral_fallos
+        self.espera = espera
+        self._fallos = 0
+        self._abierto_desde = None
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        with self._lock:
+            return self._estado()
+
+    def _estado(self):
+        if self._abierto_desde is None:
+            return self.CERRADO
+        if time.monotonic() - self._abierto_desde >= self.espera:
+            return self.SEMIABIERTO
+        return self.ABIERTO
+
+    def permitir(self):
+        """Indica si se puede llamar al servicio ahora"""
+        with self._lock:
+            estado = self._estado()
+            if estado == self.CERRADO:
+                return True
+            if estado == self.SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            return False
+
+    def registrar_exito(self):
+        with self._lock:
+            self._fallos = 0
+            self._abierto_desde = None
+            self._prueba_en_curso = False
+
+    def registrar_fallo(self):
+        with self._lock:
+            self._fallos += 1
+            if self._prueba_en_curso or self._fallos >= self.umbral_fallos:
+                self._abierto_desde = time.monotonic()
+            self._prueba_en_curso = False
+
+    def liberar_prueba(self):
+        """La llamada terminó sin resultado sobre el servicio (cancelada, error propio): otra puede probar"""
+        with self._lock:
+            self._prueba_en_curso = False
+
+
+class PresupuestoReintentos:
+    """
+    Cada solicitud suma `proporcion` de ficha y cada reintento gasta una, de
+    modo que los reintentos nunca superan esa proporción del tráfico (evita
+    multiplicar la carga cuando el servicio ya está saturado).
+    """
+
+    def __init__(self, proporcion, maximo):
+        self.proporcion = proporcion
+        self.maximo = maximo
+        self._fichas = maximo
+        self._lock = threading.Lock()
+
+    def registrar_solicitud(self):
+        with self._lock:
+            self._fichas = min(self.maximo, self._fichas + self.proporcion)
+
+    def usar_reintento(self):
+        with self._lock:
+            if self._fichas >= 1:
+                self._fichas -= 1
+                return True
+            return False
+
+
+class MetricasPrediccion:
+    """Contadores e histograma de latencia de las llamadas al microservicio"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._solicitudes = 0
+            self._exitos = 0
+            self._reintentos = 0
+            self._errores = {}
+            self._histograma = [0] * (len(LIMITES_LATENCIA_MS) + 1)
+            self._latencia_total_ms = 0.0
+
+    def registrar_latencia(self, ms):
+        with self._lock:
+            self._latencia_total_ms += ms
+            tramo = next(
+                (i for i, limite in enumerate(LIMITES_LATENCIA_MS) if ms <= limite),
+                len(LIMITES_LATENCIA_MS)
+            )
+            self._histograma[tramo] += 1
+
+    def registrar_solicitud(self):
+        with self._lock:
+            self._solicitudes += 1
+
+    def registrar_exito(self):
+        with self._lock:
+            self._exitos += 1
+
+    def registrar_reintento(self):
+        with self._lock:
+            self._reintentos += 1
+
+    def registrar_error(self, tipo):
+        with self._lock:
+            self._errores[tipo] = self._errores.get(tipo, 0) + 1
+
+    def resumen(self):
+        with self._lock:
+            medidas = sum(self._histograma)
+            etiquetas = [f'<= {limite} ms' for limite in LIMITES_LATENCIA_MS]
+            etiquetas.append(f'> {LIMITES_LATENCIA_MS[-1]} ms')
+            return {
+                'solicitudes': self._solicitudes,
+                'exitos': self._exitos,
+                'reintentos': self._reintentos,
+                'errores': dict(self._errores),
+                'latencia_promedio_ms': round(self._latencia_total_ms / medidas, 2) if medidas else 0,
+                'histograma_latencia': dict(zip(etiquetas, self._histograma)),
+            }
+
+
+class ClientePrediccion:
+    """
+    Cliente HTTP del microservicio de predicción.
+
+    - Reutiliza conexiones (keep-alive) con un pool por proceso.
+    - Usa timeouts de conexión y de lectura separados.
+    - Reintenta errores de conexión y respuestas 502/503/504 dentro de un
+      presupuesto de reintentos.
+    - Corta las llamadas con un circuit breaker mientras el servicio está caído.
+    - Registra métricas de latencia y errores.
+
+    Los métodos `apredecir` y `apredecir_lote` hacen lo mismo sin bloquear
+    (httpx.AsyncClient) para las vistas async; comparten circuito, presupuesto
+    de reintentos y métricas con los métodos síncronos.
+    """
+
+    def __init__(self):
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=settings.ML_PREDICCION_CONCURRENCIA,
+        )
+        self.sesion.mount('http://', adaptador)
+        self.sesion.mount('https://', adaptador)
+        self.circuito = Circuito(
+            settings.ML_PREDICCION_FALLOS_APERTURA,
+            settings.ML_PREDICCION_ESPERA_CIRCUITO,
+        )
+        self.presupuesto = PresupuestoReintentos(
+            settings.ML_PREDICCION_PROPORCION_REINTENTOS,
+            maximo=10,
+        )
+        self.metricas = MetricasPrediccion()
+        # Un AsyncClient está atado a su event loop: uno por loop
+        self._sesiones_async = weakref.WeakKeyDictionary()
+
+    @property
+    def timeout(self):
+        return (settings.ML_PREDICCION_TIMEOUT_CONEXION, settings.ML_PREDICCION_TIMEOUT)
+
+    def _sesion_async(self):
+        loop = asyncio.get_running_loop()
+        sesion = self._sesiones_async.get(loop)
+        if sesion is None:
+            sesion = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.ML_PREDICCION_CONEXIONES_ASYNC,
+                    max_keepalive_connections=settings.ML_PREDICCION_CONEXIONES_ASYNC,
+                ),
+            )
+            self._sesiones_async[loop] = sesion
+        return sesion
+
+    def predecir(self, datos_ml):
+        """Predicción de un estudiante; retorna el JSON del microservicio (un objeto)"""
+        return self._post(settings.ML_PREDICCION_URL, datos_ml, dict)
+
+    def predecir_lote(self, lista_datos_ml):
+        """Predicciones de varias entradas con una sola llamada al endpoint de lote (una lista)"""
+        return self._post(settings.ML_PREDICCION_LOTE_URL, lista_datos_ml, list)
+
+    async def apredecir(self, datos_ml):
+        """Versión async de predecir()"""
+        return await self._apost(settings.ML_PREDICCION_URL, datos_ml, dict)
+
+    async def apredecir_lote(self, lista_datos_ml):
+        """Versión async de predecir_lote()"""
+        return await self._apost(settings.ML_PREDICCION_LOTE_URL, lista_datos_ml, list)
+
+    def _post(self, url, cuerpo, tipo_respuesta):
+        self.presupuesto.registrar_solicitud()
+        while True:
+            self._verificar_circuito()
+            try:
+                return self._intentar(url, cuerpo, tipo_respuesta)
+            except ErrorPrediccion as error:
+                if not self._reintentar(error):
+                    raise
+            except BaseException:
+                # Cancelación (asyncio.CancelledError) o error inesperado: si era la llamada de
+                # prueba del circuito semiabierto, sin esto el circuito no volvería a dejar pasar ninguna
+                self.circuito.liberar_prueba()
+                raise
+
+    async def _apost(self, url, cuerpo, tipo_respuesta):
+        self.presupuesto.registrar_solicitud()
+        while True:
+            self._verificar_circuito()
+            try:
+                return await self._aintentar(url, cuerpo, tipo_respuesta)
+            except ErrorPrediccion as error:
+                if not self._reintentar(error):
+                    raise
+            except BaseException:
+                # Cancelación (asyncio.CancelledError) o error inesperado: si era la llamada de
+                # prueba del circuito semiabierto, sin esto el circuito no volvería a dejar pasar ninguna
+                self.circuito.liberar_prueba()
+                raise
+
+    def _verificar_circuito(self):
+        if not self.circuito.permitir():
+            self.metricas.registrar_error('circuito_abierto')
+            raise ServicioNoDisponibleError(
+                'El microservicio de predicción no está disponible temporalmente'
+            )
+
+    def _reintentar(self, error):
+        """Decide si reintentar tras un error, dentro del presupuesto"""
+        reintentable = (
+            isinstance(error, ConexionPrediccionError) or
+            getattr(error, 'status_code', None) in ESTADOS_REINTENTABLES
+        )
+        if not reintentable or not self.presupuesto.usar_reintento():
+            return False
+        self.metricas.registrar_reintento()
+        return True
+
+    def _intentar(self, url, cuerpo, tipo_respuesta):
+        self.metricas.registrar_solicitud()
+        inicio = time.perf_counter()
+        try:
+            respuesta = self.sesion.post(url, json=cuerpo, timeout=self.timeout)
+        except requests.exceptions.ConnectionError as e:
+            raise self._error_de_conexion(url) from e
+        except requests.exceptions.Timeout as e:
+            raise self._error_de_timeout() from e
+        except requests.exceptions.RequestException as e:
+            raise self._error_inesperado(e) from e
+        finally:
+            self.metricas.registrar_latencia((time.perf_counter() - inicio) * 1000)
+        return self._procesar_respuesta(respuesta, tipo_respuesta)
+
+    async def _aintentar(self, url, cuerpo, tipo_respuesta):
+        self.metricas.registrar_solicitud()
+        inicio = time.perf_counter()
+        try:
+            respuesta = await self._sesion_async().post(url, json=cuerpo, timeout=httpx.Timeout(
+                settings.ML_PREDICCION_TIMEOUT,
+                connect=settings.ML_PREDICCION_TIMEOUT_CONEXION,
+                pool=None,
+            ))
+        except httpx.ConnectTimeout as e:
+            # Igual que requests: no poder abrir la conexión es un error de conexión
+            raise self._error_de_conexion(url) from e
+        except httpx.TimeoutException as e:
+            raise self._error_de_timeout() from e
+        except httpx.TransportError as e:
+            raise self._error_de_conexion(url) from e
+        except httpx.HTTPError as e:
+            raise self._error_inesperado(e) from e
+        finally:
+            self.metricas.registrar_latencia((time.perf_counter() - inicio) * 1000)
+        return self._procesar_respuesta(respuesta, tipo_respuesta)
+
+    def _error_de_conexion(self, url):
+        self._fallo('conexion')
+        return ConexionPrediccionError(
+            f'No se puede conectar al microservicio de predicción. Verifique que esté ejecutándose en {url}'
+        )
+
+    def _error_de_timeout(self):
+        self._fallo('timeout')
+        return TimeoutPrediccionError('Timeout al conectar con el microservicio de predicción')
+
+    def _error_inesperado(self, error):
+        self._fallo('otro')
+        return ErrorPrediccion(f'Error inesperado al llamar al microservicio: {str(error)}')
+
+    def _procesar_respuesta(self, respuesta, tipo_respuesta):
+        """Respuesta de requests o de httpx (misma interfaz: status_code, text, json())"""
+        if respuesta.status_code >= 500:
+            self._fallo(f'http_{respuesta.status_code}')
+            raise RespuestaPrediccionError(respuesta.status_code, respuesta.text)
+
+        if respuesta.status_code != 200:
+            # Un 4xx es un error de la solicitud, no del servicio: no abre el circuito
+            self.circuito.registrar_exito()
+            self.metricas.registrar_error(f'http_{respuesta.status_code}')
+            raise RespuestaPrediccionError(respuesta.status_code, respuesta.text)
+
+        # Un 200 que no es JSON (o no tiene la forma esperada) es una falla del servicio
+        try:
+            contenido = respuesta.json()
+        except ValueError:
+            contenido = None
+        if not isinstance(contenido, tipo_respuesta):
+            self._fallo('respuesta_invalida')
+            raise RespuestaPrediccionError(
+                respuesta.status_code, 'la respuesta no tiene el formato esperado'
+            )
+        self.circuito.registrar_exito()
+        self.metricas.registrar_exito()
+        return contenido
+
+    def _fallo(self, tipo):
+        self.metricas.registrar_error(tipo)
+        self.circuito.registrar_fallo()
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def obtener_cliente():
+    """Cliente compartido por todo el proceso (un pool de conexiones y un circuito)"""
+    global _cliente
+    if _cliente is None:
+        with _cliente_lock:
+            if _cliente is None:
+                _cliente = ClientePrediccion()
+    return _cliente
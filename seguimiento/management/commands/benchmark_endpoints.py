@@ -0,0 +1,223 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from cursos.models import Curso
+from materias.models import Materia
+from seguimiento.models import Asistencia, Examen, Seguimiento, Tarea
+from usuarios.models import Docente, Estudiante, Usuario
+from usuarios.serializers import CustomTokenObtainPairSerializer
+
+# Variación (en %) de p50 o de consultas a partir de la cual --comparar lo marca
+UMBRAL_COMPARACION = 10
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def endpoints_a_medir():
+    """(nombre, método, url, datos) de los endpoints principales, con ids tomados de la base"""
+    estudiante = Estudiante.objects.filter(usuario__activo=True).order_by('id').first()
+    docente = Docente.objects.order_by('id').first()
+    curso = Curso.objects.filter(activo=True, estudiantes__isnull=False).order_by('id').first()
+    materia = Materia.objects.filter(activo=True).order_by('id').first()
+    seguimiento = Seguimiento.objects.filter(tareas__isnull=False).order_by('id').first()
+    if not (estudiante and docente and curso and materia and seguimiento):
+        raise CommandError('La base no tiene datos suficientes: ejecute antes generar_escuela')
+
+    return [
+        ('seguimientos', 'get', reverse('seguimiento-list'), None),
+        ('seguimientos-detallado', 'get', reverse('seguimiento-detallado'), None),
+        ('seguimientos-por-estudiante', 'get', f"{reverse('seguimiento-por-estudiante')}?estudiante_id={estudiante.id}", None),
+        ('asistencias', 'get', reverse('asistencia-list'), None),
+        ('tareas-por-seguimiento', 'get', f"{reverse('tarea-por-seguimiento')}?seguimiento_id={seguimiento.id}", None),
+        ('examenes-proximos', 'get', reverse('examen-proximos'), None),
+        ('resumen-estudiante', 'get', reverse('resumen-estudiante', args=[estudiante.id]), None),
+        ('resumen-curso', 'get', reverse('resumen-curso', args=[curso.id]), None),
+        ('verificar-matricula', 'get', reverse('verificar-matricula', args=[estudiante.id]), None),
+        ('elegibilidad-curso', 'post', reverse('elegibilidad-lote'), {'curso_id': curso.id}),
+        ('matriculas', 'get', reverse('matricula-list'), None),
+        ('usuarios', 'get', reverse('usuario-list-create'), None),
+        ('estudiantes', 'get', reverse('estudiante-list-create'), None),
+        ('docentes', 'get', reverse('docente-list-create'), None),
+        ('padres-tutores', 'get', reverse('padretutor-list-create'), None),
+        ('docente-horarios', 'get', reverse('docente-horarios', args=[docente.id]), None),
+        ('cursos', 'get', reverse('cursos-list'), None),
+        ('horarios-por-dia', 'get', reverse('horarios-por-dia', args=['Lunes']), None),
+        ('horarios-por-materia', 'get', reverse('horarios-por-materia', args=[materia.id]), None),
+        ('auditoria-horarios', 'get', reverse('auditoria-horarios'), None),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide los endpoints principales con el cliente de pruebas de Django sobre la base actual "
+        "(por ejemplo, una generada con generar_escuela): percentiles de latencia y consultas por "
+        "endpoint. Emite un informe JSON que se puede comparar entre commits con --comparar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20, help='Mediciones por endpoint (por defecto 20)')
+        parser.add_argument(
+            '--calentamiento', type=int, default=2, help='Llamadas previas sin medir, para llenar caches (por defecto 2)'
+        )
+        parser.add_argument(
+            '--usuario', help='Email del usuario autenticado (por defecto el primer ADMINISTRADOR)'
+        )
+        parser.add_argument(
+            '--solo', action='append', help='Medir solo este endpoint (se puede repetir); ver los nombres con --listar'
+        )
+        parser.add_argument('--listar', action='store_true', help='Listar los endpoints medidos y salir')
+        parser.add_argument('--salida', help='Archivo donde guardar el informe JSON (por defecto se imprime)')
+        parser.add_argument('--comparar', help='Informe JSON anterior con el que comparar los resultados')
+
+    def handle(self, *args, **options):
+        endpoints = endpoints_a_medir()
+        if options['listar']:
+            for nombre, metodo, url, _ in endpoints:
+                self.stdout.write(f'{nombre}: {metodo.upper()} {url}')
+            return
+        if options['solo']:
+            desconocidos = set(options['solo']) - {nombre for nombre, *_ in endpoints}
+            if desconocidos:
+                raise CommandError(f'Endpoints desconocidos: {", ".join(sorted(desconocidos))}')
+            endpoints = [endpoint for endpoint in endpoints if endpoint[0] in options['solo']]
+
+        cliente = Client(HTTP_AUTHORIZATION=f'Bearer {self._token(options["usuario"])}')
+        resultados = {}
+        # El cliente de pruebas usa el host "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for nombre, metodo, url, datos in endpoints:
+                resultados[nombre] = self._medir(cliente, metodo, url, datos, options)
+                self._informar(nombre, resultados[nombre])
+
+        informe = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_actual(),
+            'base_de_datos': connection.vendor,
+            'repeticiones': options['repeticiones'],
+            'datos': {
+                'cursos': Curso.objects.count(),
+                'estudiantes': Estudiante.objects.count(),
+                'seguimientos': Seguimiento.objects.count(),
+                'asistencias': Asistencia.objects.count(),
+                'tareas': Tarea.objects.count(),
+                'examenes': Examen.objects.count(),
+            },
+            'endpoints': resultados,
+        }
+        contenido = json.dumps(informe, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(contenido)
+            self.stdout.write(self.style.SUCCESS(f'Informe guardado en {options["salida"]}'))
+        elif not options['comparar']:
+            self.stdout.write(contenido)
+
+        if options['comparar']:
+            self._comparar(informe, options['comparar'])
+
+    def _token(self, email):
+        usuarios = Usuario.objects.filter(activo=True)
+        usuario = (
+            usuarios.filter(email=email).first() if email
+            else usuarios.filter(roles__nombre='ADMINISTRADOR').order_by('id').first()
+        )
+        if usuario is None:
+            raise CommandError('No se encontró el usuario para autenticar (use --usuario)')
+        return str(CustomTokenObtainPairSerializer.get_token(usuario).access_token)
+
+    def _llamar(self, cliente, metodo, url, datos):
+        if metodo == 'post':
+            return cliente.post(url, data=datos, content_type='application/json')
+        return cliente.get(url)
+
+    def _medir(self, cliente, metodo, url, datos, options):
+        for _ in range(options['calentamiento']):
+            self._llamar(cliente, metodo, url, datos)
+
+        latencias, consultas, estados, tamanos = [], [], set(), []
+        for _ in range(max(1, options['repeticiones'])):
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                respuesta = self._llamar(cliente, metodo, url, datos)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(len(capturadas.captured_queries))
+            estados.add(respuesta.status_code)
+            tamanos.append(len(respuesta.content))
+
+        return {
+            'metodo': metodo.upper(),
+            'url': url,
+            'estados': sorted(estados),
+            'latencia_ms': {
+                'p50': round(_percentil(latencias, 50), 2),
+                'p90': round(_percentil(latencias, 90), 2),
+                'p99': round(_percentil(latencias, 99), 2),
+                'media': round(statistics.mean(latencias), 2),
+                'max': round(max(latencias), 2),
+            },
+            'consultas': {'min': min(consultas), 'max': max(consultas)},
+            'bytes': max(tamanos),
+        }
+
+    def _informar(self, nombre, resultado):
+        latencia = resultado['latencia_ms']
+        texto = (
+            f'{nombre}: p50 {latencia["p50"]:.1f} ms, p90 {latencia["p90"]:.1f} ms, p99 {latencia["p99"]:.1f} ms, '
+            f'{resultado["consultas"]["max"]} consultas, {resultado["bytes"]} bytes'
+        )
+        if any(estado >= 400 for estado in resultado['estados']):
+            self.stdout.write(self.style.WARNING(f'{texto} (HTTP {resultado["estados"]})'))
+        else:
+            self.stdout.write(texto)
+
+    def _comparar(self, informe, ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'No se pudo leer {ruta}: {e}')
+
+        self.stdout.write(f'\nComparación con {ruta} (commit {anterior.get("commit")}):')
+        if anterior.get('datos') != informe['datos']:
+            self.stdout.write(self.style.WARNING('Los datos de la base no son los mismos que en el informe anterior'))
+        for nombre, actual in informe['endpoints'].items():
+            previo = anterior.get('endpoints', {}).get(nombre)
+            if previo is None:
+                self.stdout.write(f'{nombre}: sin medición anterior')
+                continue
+            p50_antes, p50_ahora = previo['latencia_ms']['p50'], actual['latencia_ms']['p50']
+            variacion = (p50_ahora - p50_antes) / p50_antes * 100 if p50_antes else 0
+            consultas_antes, consultas_ahora = previo['consultas']['max'], actual['consultas']['max']
+            texto = (
+                f'{nombre}: p50 {p50_antes:.1f} → {p50_ahora:.1f} ms ({variacion:+.0f}%), '
+                f'consultas {consultas_antes} → {consultas_ahora}'
+            )
+            if consultas_ahora > consultas_antes or variacion > UMBRAL_COMPARACION:
+                self.stdout.write(self.style.ERROR(texto))
+            elif consultas_ahora < consultas_antes or variacion < -UMBRAL_COMPARACION:
+                self.stdout.write(self.style.SUCCESS(texto))
+            else:
+                self.stdout.write(texto)
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import queue
+import statistics
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from seguimiento.models import Seguimiento
+from seguimiento.prediccion import (
+    DatosPrediccionError, construir_datos_prediccion, obtener_trimestres_prediccion
+)
+from seguimiento.stub_prediccion import iniciar_servidor_stub
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el rendimiento del endpoint de predicción síncrono (WSGI, un hilo por "
+        "solicitud) con el async (ASGI) contra un microservicio simulado con latencia. "
+        "Usa los datos de la base configurada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=200, help='Solicitudes por modo (por defecto 200)')
+        parser.add_argument(
+            '--hilos',
+            type=int,
+            default=8,
+            help='Hilos del servidor WSGI simulado (por defecto 8)',
+        )
+        parser.add_argument(
+            '--concurrencia',
+            type=int,
+            default=200,
+            help='Solicitudes simultáneas en el modo ASGI (por defecto 200)',
+        )
+        parser.add_argument(
+            '--latencia',
+            type=float,
+            default=0.2,
+            help='Segundos que tarda el microservicio simulado en responder (por defecto 0.2)',
+        )
+        parser.add_argument('--json', action='store_true', help='Imprimir el resultado como JSON')
+
+    def handle(self, *args, **options):
+        estudiante_id, materia_curso_id = self._par_con_datos()
+        servidor, configuracion = iniciar_servidor_stub(latencia=options['latencia'])
+        url_stub = f'http://127.0.0.1:{servidor.server_port}/'
+
+        ajustes = override_settings(
+            ML_PREDICCION_URL=url_stub,
+            ML_PREDICCION_LOTE_URL='',
+            # Sin cache: cada solicitud debe llegar al microservicio
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        try:
+            with ajustes:
+                url_sync = reverse('seguimiento-predecir-nota', args=[estudiante_id, materia_curso_id])
+                url_async = reverse('predecir-nota-async', args=[estudiante_id, materia_curso_id])
+                resultados = {
+                    'wsgi': self._medir_wsgi(url_sync, options['solicitudes'], options['hilos']),
+                    'asgi': asyncio.run(
+                        self._medir_asgi(url_async, options['solicitudes'], options['concurrencia'])
+                    ),
+                }
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+
+        reporte = {
+            'estudiante_id': estudiante_id,
+            'materia_curso_id': materia_curso_id,
+            'latencia_microservicio_s': options['latencia'],
+            'solicitudes_microservicio': configuracion.solicitudes,
+            **resultados,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(reporte, indent=2))
+            return
+
+        self.stdout.write(
+            f"Microservicio simulado con {options['latencia']} s de latencia, "
+            f"{options['solicitudes']} solicitudes por modo"
+        )
+        for modo, datos in resultados.items():
+            self.stdout.write(
+                f"{modo.upper()} ({datos['concurrencia']} simultáneas): "
+                f"{datos['solicitudes_por_segundo']} sol/s, "
+                f"p50 {datos['p50_ms']} ms, p95 {datos['p95_ms']} ms, "
+                f"{datos['errores']} errores, {datos['duracion_s']} s"
+            )
+
+    def _par_con_datos(self):
+        """Un (estudiante, materia_curso) con seguimiento en los dos trimestres de entrada"""
+        try:
+            trimestres = obtener_trimestres_prediccion()
+        except DatosPrediccionError as e:
+            raise CommandError(str(e))
+        pares = list(
+            Seguimiento.objects.filter(trimestre=trimestres[1])
+            .values_list('estudiante_id', 'materia_curso_id')[:50]
+        )
+        datos = construir_datos_prediccion(
+            trimestres, {mc for _, mc in pares}, estudiante_ids={est for est, _ in pares}
+        )
+        par = next((par for par, valor in datos.items() if isinstance(valor, dict)), None)
+        if par is None:
+            raise CommandError('No hay seguimientos con datos en los dos primeros trimestres para medir')
+        return par
+
+    def _medir_wsgi(self, url, total, hilos):
+        """Un pool de hilos que atiende las solicitudes una por una, como un servidor WSGI"""
+        pendientes = queue.Queue()
+        for _ in range(total):
+            pendientes.put(None)
+        latencias = []
+        errores = []
+
+        def trabajador():
+            cliente = Client()
+            try:
+                while True:
+                    try:
+                        pendientes.get_nowait()
+                    except queue.Empty:
+                        return
+                    inicio = time.perf_counter()
+                    respuesta = cliente.post(url)
+                    latencias.append(time.perf_counter() - inicio)
+                    if respuesta.status_code != 200:
+                        errores.append(respuesta.status_code)
+            finally:
+                connection.close()
+
+        inicio = time.perf_counter()
+        trabajadores = [threading.Thread(target=trabajador) for _ in range(hilos)]
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join()
+        return self._resumen(latencias, errores, time.perf_counter() - inicio, hilos)
+
+    async def _medir_asgi(self, url, total, concurrencia):
+        """Todas las solicitudes en un solo event loop, como un worker ASGI"""
+        cliente = AsyncClient()
+        limite = asyncio.Semaphore(concurrencia)
+        latencias = []
+        errores = []
+
+        async def solicitud():
+            async with limite:
+                inicio = time.perf_counter()
+                respuesta = await cliente.post(url)
+                latencias.append(time.perf_counter() - inicio)
+                if respuesta.status_code != 200:
+                    errores.append(respuesta.status_code)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(solicitud() for _ in range(total)))
+        return self._resumen(latencias, errores, time.perf_counter() - inicio, concurrencia)
+
+    def _resumen(self, latencias, errores, duracion, concurrencia):
+        latencias_ms = sorted(latencia * 1000 for latencia in latencias)
+        return {
+            'concurrencia': concurrencia,
+            'solicitudes': len(latencias_ms),
+            'errores': len(errores),
+            'duracion_s': round(duracion, 3),
+            'solicitudes_por_segundo': round(len(latencias_ms) / duracion, 1) if duracion else 0,
+            'p50_ms': round(statistics.median(latencias_ms), 1) if latencias_ms else 0,
+            'p95_ms': round(latencias_ms[int(len(latencias_ms) * 0.95) - 1], 1) if latencias_ms else 0,
+        }
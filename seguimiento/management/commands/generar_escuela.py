@@ -0,0 +1,307 @@
+import random
+import time
+from datetime import date, time as hora, timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from cursos.models import Curso, Trimestre
+from horarios.generador import Tarea as TareaHorario, resolver
+from horarios.models import Horario
+from horarios.proyecciones import invalidar_horarios_docentes, invalidar_horarios_publicos
+from materias.models import Materia, MateriaCurso
+from matricula.models import Matricula, TipoPago
+from matricula.vigencias import actualizar_vigencias
+from seguimiento.calculos import TAMANO_LOTE, recalcular_notas
+from seguimiento.models import Asistencia, Examen, Participacion, Seguimiento, Tarea, TipoExamen
+from usuarios.models import Docente, Estudiante, PadreTutor, Rol, Usuario
+from usuarios.permisos import invalidar_permisos
+
+DIAS = [dia for dia, _ in Horario.DIAS_SEMANA[:5]]
+TURNOS = [turno for turno, _ in Curso.TURNO_CHOICES]
+NOMBRES = ['Ana', 'Luis', 'María', 'Carlos', 'Lucía', 'Jorge', 'Sofía', 'Diego', 'Valeria', 'Mateo', 'Camila', 'Pablo']
+APELLIDOS = ['López', 'García', 'Fernández', 'Rojas', 'Vargas', 'Mendoza', 'Gutiérrez', 'Flores', 'Suárez', 'Castro']
+ESPECIALIDADES = ['Matemáticas', 'Lenguaje', 'Ciencias', 'Historia', 'Inglés', 'Física', 'Química', 'Música']
+
+# Contraseña de todos los usuarios generados (se hashea una sola vez)
+CONTRASENA = 'escuela123'
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera una escuela sintética de tamaño configurable (cursos, docentes, estudiantes con "
+        "sus padres, horarios, trimestres y un año de asistencia, tareas, participaciones, "
+        "exámenes y matrículas) con inserciones masivas, para pruebas de rendimiento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cursos', type=int, default=10, help='Cursos (por defecto 10)')
+        parser.add_argument('--estudiantes', type=int, default=30, help='Estudiantes por curso (por defecto 30)')
+        parser.add_argument('--materias', type=int, default=10, help='Materias por curso (por defecto 10)')
+        parser.add_argument(
+            '--docentes', type=int, default=None, help='Docentes (por defecto uno cada 5 materias-curso)'
+        )
+        parser.add_argument('--horas', type=int, default=3, help='Horas semanales por materia (por defecto 3)')
+        parser.add_argument(
+            '--clases', type=int, default=20, help='Clases con asistencia por trimestre y materia (por defecto 20)'
+        )
+        parser.add_argument('--tareas', type=int, default=4, help='Tareas por trimestre y materia (por defecto 4)')
+        parser.add_argument(
+            '--participaciones', type=int, default=3, help='Participaciones por trimestre y materia (por defecto 3)'
+        )
+        parser.add_argument('--examenes', type=int, default=2, help='Exámenes por trimestre y materia (por defecto 2)')
+        parser.add_argument('--anio', type=int, default=date.today().year, help='Año lectivo (por defecto el actual)')
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=1,
+            help='Semilla del generador; también distingue los nombres y emails de cada escuela (por defecto 1)',
+        )
+
+    def handle(self, *args, **options):
+        self.azar = random.Random(options['semilla'])
+        self.opciones = options
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            roles = {
+                nombre: Rol.objects.get_or_create(nombre=nombre)[0]
+                for nombre in ('ADMINISTRADOR', 'DOCENTE', 'ESTUDIANTE', 'PADRE_TUTOR')
+            }
+            self.contrasena = make_password(CONTRASENA)
+            trimestres = self._trimestres()
+            franjas = self._franjas()
+            cursos = self._cursos()
+            docentes = self._usuarios_con_perfil(
+                'docente',
+                options['docentes'] or max(1, options['cursos'] * options['materias'] // 5),
+                roles['DOCENTE'],
+                lambda usuario, i: Docente(usuario=usuario, especialidad=ESPECIALIDADES[i % len(ESPECIALIDADES)]),
+            )
+            materias_curso = self._materias_curso(cursos, docentes, franjas)
+            estudiantes = self._estudiantes(cursos, roles)
+            self._usuarios_con_perfil('admin', 1, roles['ADMINISTRADOR'], None)
+            seguimientos = self._seguimientos(estudiantes, materias_curso, trimestres)
+            self._actividades(seguimientos, trimestres)
+            self._matriculas(estudiantes)
+
+        # Las inserciones masivas no disparan señales: estadísticas, notas y vigencias se calculan acá
+        ids = [seguimiento.id for seguimiento in seguimientos]
+        for i in range(0, len(ids), TAMANO_LOTE):
+            recalcular_notas(ids[i:i + TAMANO_LOTE])
+        actualizar_vigencias(estudiante.id for estudiante in estudiantes)
+        invalidar_horarios_docentes()
+        invalidar_horarios_publicos()
+        invalidar_permisos()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Escuela {options["semilla"]} generada en {time.perf_counter() - inicio:.1f} s: '
+            f'{len(cursos)} cursos, {len(docentes)} docentes, {len(estudiantes)} estudiantes, '
+            f'{len(materias_curso)} materias-curso, {len(seguimientos)} seguimientos. '
+            f'Contraseña de todos los usuarios: {CONTRASENA} '
+            f'(administrador: admin1.{options["semilla"]}@escuela.test)'
+        ))
+
+    def _trimestres(self):
+        anio = self.opciones['anio']
+        fechas = [
+            (date(anio, 2, 3), date(anio, 5, 9)),
+            (date(anio, 5, 19), date(anio, 8, 29)),
+            (date(anio, 9, 8), date(anio, 12, 12)),
+        ]
+        trimestres = []
+        for numero, (inicio, fin) in enumerate(fechas, start=1):
+            trimestre, _ = Trimestre.objects.get_or_create(
+                nombre=f'Trimestre {numero} {anio}', defaults={'fecha_inicio': inicio, 'fecha_fin': fin}
+            )
+            trimestres.append(trimestre)
+        return trimestres
+
+    def _franjas(self):
+        franjas = []
+        for dia in DIAS:
+            for bloque in range(8):
+                franja, _ = Horario.objects.get_or_create(
+                    dia_semana=dia,
+                    hora_inicio=hora(7 + bloque),
+                    hora_fin=hora(7 + bloque, 50),
+                    defaults={'nombre': f'Bloque {bloque + 1}'},
+                )
+                franjas.append(franja)
+        return franjas
+
+    def _cursos(self):
+        semilla = self.opciones['semilla']
+        return Curso.objects.bulk_create([
+            Curso(nombre=f'C{semilla}-{i + 1}', turno=TURNOS[i % len(TURNOS)])
+            for i in range(self.opciones['cursos'])
+        ])
+
+    def _usuarios_con_perfil(self, tipo, cantidad, rol, crear_perfil):
+        semilla = self.opciones['semilla']
+        usuarios = Usuario.objects.bulk_create([
+            Usuario(
+                email=f'{tipo}{i + 1}.{semilla}@escuela.test',
+                first_name=self.azar.choice(NOMBRES),
+                last_name=f'{self.azar.choice(APELLIDOS)} {self.azar.choice(APELLIDOS)}',
+                genero=self.azar.choice('MF'),
+                password=self.contrasena,
+            )
+            for i in range(cantidad)
+        ], batch_size=TAMANO_LOTE)
+        Usuario.roles.through.objects.bulk_create(
+            [Usuario.roles.through(usuario_id=usuario.id, rol_id=rol.id) for usuario in usuarios],
+            batch_size=TAMANO_LOTE,
+        )
+        if crear_perfil is None:
+            return usuarios
+        perfiles = [crear_perfil(usuario, i) for i, usuario in enumerate(usuarios)]
+        return type(perfiles[0]).objects.bulk_create(perfiles, batch_size=TAMANO_LOTE) if perfiles else []
+
+    def _materias_curso(self, cursos, docentes, franjas):
+        semilla = self.opciones['semilla']
+        materias = Materia.objects.bulk_create([
+            Materia(nombre=f'Materia {i + 1} (escuela {semilla})') for i in range(self.opciones['materias'])
+        ])
+        horas = self.opciones['horas']
+        # Cada materia-curso va al docente con menos horas asignadas (los empates, al azar)
+        carga = {docente.id: 0 for docente in docentes}
+        orden = {docente.id: self.azar.random() for docente in docentes}
+        nuevas = []
+        for curso in cursos:
+            for materia in materias:
+                docente = min(docentes, key=lambda docente: (carga[docente.id], orden[docente.id]))
+                carga[docente.id] += horas
+                nuevas.append(MateriaCurso(curso=curso, materia=materia, docente=docente, horas_semanales=horas))
+        materias_curso = MateriaCurso.objects.bulk_create(nuevas, batch_size=TAMANO_LOTE)
+
+        # Las franjas se reparten con el generador de horarios: sin choques de curso ni de docente
+        tareas = [
+            TareaHorario(materia_curso.id, materia_curso.curso_id, materia_curso.docente_id, horas, [])
+            for materia_curso in self.azar.sample(materias_curso, len(materias_curso))
+        ]
+        solucion = resolver(tareas, franjas)
+        if solucion.faltantes:
+            self.stdout.write(self.style.WARNING(
+                f'{len(solucion.faltantes)} materias-curso quedaron con horas sin asignar '
+                f'({sum(solucion.faltantes.values())} en total): faltan docentes o franjas'
+            ))
+        HorarioMateriaCurso = MateriaCurso.horarios.through
+        HorarioMateriaCurso.objects.bulk_create([
+            HorarioMateriaCurso(materiacurso_id=materia_curso_id, horario_id=horario_id)
+            for materia_curso_id, horarios_ids in solucion.asignados.items()
+            for horario_id in horarios_ids
+        ], batch_size=TAMANO_LOTE)
+        return materias_curso
+
+    def _estudiantes(self, cursos, roles):
+        por_curso = self.opciones['estudiantes']
+        total = len(cursos) * por_curso
+        # Un padre/tutor cada dos estudiantes (hermanos)
+        padres = self._usuarios_con_perfil(
+            'padre',
+            (total + 1) // 2,
+            roles['PADRE_TUTOR'],
+            lambda usuario, i: PadreTutor(
+                usuario=usuario, parentesco=self.azar.choice(['Padre', 'Madre', 'Tutor']), telefono=f'7{i:07d}'
+            ),
+        )
+        anio = self.opciones['anio']
+        return self._usuarios_con_perfil(
+            'estudiante',
+            total,
+            roles['ESTUDIANTE'],
+            lambda usuario, i: Estudiante(
+                usuario=usuario,
+                direccion=f'Calle {self.azar.randint(1, 500)}',
+                fecha_nacimiento=date(anio - 6 - (i // por_curso) % 12, self.azar.randint(1, 12), self.azar.randint(1, 28)),
+                curso=cursos[i // por_curso],
+                padre_tutor=padres[i // 2],
+            ),
+        )
+
+    def _seguimientos(self, estudiantes, materias_curso, trimestres):
+        por_curso = {}
+        for materia_curso in materias_curso:
+            por_curso.setdefault(materia_curso.curso_id, []).append(materia_curso)
+        return Seguimiento.objects.bulk_create([
+            Seguimiento(materia_curso=materia_curso, trimestre=trimestre, estudiante=estudiante)
+            for estudiante in estudiantes
+            for materia_curso in por_curso[estudiante.curso_id]
+            for trimestre in trimestres
+        ], batch_size=TAMANO_LOTE)
+
+    def _fechas(self, trimestre, cantidad):
+        """`cantidad` días hábiles distintos del trimestre, en orden"""
+        dias = [
+            trimestre.fecha_inicio + timedelta(days=i)
+            for i in range((trimestre.fecha_fin - trimestre.fecha_inicio).days + 1)
+            if (trimestre.fecha_inicio + timedelta(days=i)).weekday() < 5
+        ]
+        return sorted(self.azar.sample(dias, min(cantidad, len(dias))))
+
+    def _actividades(self, seguimientos, trimestres):
+        azar = self.azar
+        tipos_examen = [
+            TipoExamen.objects.get_or_create(nombre=nombre)[0] for nombre in ('Parcial', 'Final', 'Recuperatorio')
+        ]
+        # Las mismas fechas para todos los estudiantes de una materia-curso en un trimestre
+        fechas = {}
+        for seguimiento in seguimientos:
+            clave = (seguimiento.materia_curso_id, seguimiento.trimestre_id)
+            if clave not in fechas:
+                trimestre = next(t for t in trimestres if t.id == seguimiento.trimestre_id)
+                fechas[clave] = {
+                    tipo: self._fechas(trimestre, self.opciones[tipo])
+                    for tipo in ('clases', 'tareas', 'participaciones', 'examenes')
+                }
+
+        # Cada estudiante tiene su propio nivel, para que las notas sean variadas
+        nivel = {}
+        for modelo, crear in (
+            (Asistencia, lambda s, f: [
+                Asistencia(seguimiento_id=s.id, fecha=d, asistencia=azar.random() < 0.9) for d in f['clases']
+            ]),
+            (Tarea, lambda s, f: [
+                Tarea(seguimiento_id=s.id, fecha=d, nota_tarea=self._nota(nivel[s.estudiante_id]), titulo=f'Tarea {n + 1}')
+                for n, d in enumerate(f['tareas'])
+            ]),
+            (Participacion, lambda s, f: [
+                Participacion(seguimiento_id=s.id, fecha_participacion=d, nota_participacion=self._nota(nivel[s.estudiante_id]))
+                for d in f['participaciones']
+            ]),
+            (Examen, lambda s, f: [
+                Examen(
+                    seguimiento_id=s.id, fecha=d, nota_examen=self._nota(nivel[s.estudiante_id]),
+                    tipo_examen=tipos_examen[min(n, len(tipos_examen) - 1)],
+                )
+                for n, d in enumerate(f['examenes'])
+            ]),
+        ):
+            lote = []
+            for seguimiento in seguimientos:
+                nivel.setdefault(seguimiento.estudiante_id, azar.gauss(70, 12))
+                lote.extend(crear(seguimiento, fechas[(seguimiento.materia_curso_id, seguimiento.trimestre_id)]))
+                if len(lote) >= TAMANO_LOTE * 10:
+                    modelo.objects.bulk_create(lote, batch_size=TAMANO_LOTE)
+                    lote = []
+            modelo.objects.bulk_create(lote, batch_size=TAMANO_LOTE)
+
+    def _nota(self, nivel):
+        return round(min(100.0, max(0.0, self.azar.gauss(nivel, 10))), 1)
+
+    def _matriculas(self, estudiantes):
+        mensual, _ = TipoPago.objects.get_or_create(nombre='Mensualidad', defaults={'tipo': 'mensual'})
+        anual, _ = TipoPago.objects.get_or_create(nombre='Pago anual', defaults={'tipo': 'anual'})
+        anio = self.opciones['anio']
+        matriculas = []
+        for estudiante in estudiantes:
+            if self.azar.random() < 0.3:
+                matriculas.append(Matricula(estudiante=estudiante, tipo_pago=anual, fecha=date(anio, 2, 1), monto=3000))
+                continue
+            # Mensualidades de febrero a noviembre; algunos estudiantes dejan de pagar antes de fin de año
+            ultimo_mes = 11 if self.azar.random() < 0.8 else self.azar.randint(2, 10)
+            matriculas.extend(
+                Matricula(estudiante=estudiante, tipo_pago=mensual, fecha=date(anio, mes, 5), monto=350)
+                for mes in range(2, ultimo_mes + 1)
+            )
+        Matricula.objects.bulk_create(matriculas, batch_size=TAMANO_LOTE)
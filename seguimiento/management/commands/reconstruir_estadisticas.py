@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from seguimiento.models import Seguimiento, EstadisticaSeguimiento
+from seguimiento.calculos import (
+    CAMPOS_ESTADISTICA, TAMANO_LOTE, calcular_estadisticas, recalcular_notas
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye las estadísticas precalculadas (EstadisticaSeguimiento) y la nota "
+        "trimestral de todos los seguimientos. Con --verificar solo compara sin escribir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Comparar las estadísticas guardadas con las tablas de origen sin modificar nada',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Cantidad de seguimientos procesados por lote (por defecto {TAMANO_LOTE})',
+        )
+
+    def handle(self, *args, **options):
+        ids = list(Seguimiento.objects.order_by('id').values_list('id', flat=True))
+        lote = max(1, options['lote'])
+
+        if options['verificar']:
+            self._verificar(ids, lote)
+            return
+
+        for inicio in range(0, len(ids), lote):
+            recalcular_notas(ids[inicio:inicio + lote])
+        self.stdout.write(self.style.SUCCESS(f'Estadísticas reconstruidas para {len(ids)} seguimientos'))
+
+    def _verificar(self, ids, lote):
+        campos = [campo for campo in CAMPOS_ESTADISTICA if campo != 'actualizado_en']
+        diferencias = 0
+        for inicio in range(0, len(ids), lote):
+            bloque = ids[inicio:inicio + lote]
+            esperadas = calcular_estadisticas(bloque)
+            guardadas = EstadisticaSeguimiento.objects.in_bulk(bloque)
+            for seguimiento_id, esperada in esperadas.items():
+                # Un seguimiento sin estadísticas equivale a uno sin registros (todo en cero)
+                guardada = guardadas.get(seguimiento_id) or EstadisticaSeguimiento(seguimiento_id=seguimiento_id)
+                for campo in campos:
+                    if abs(getattr(guardada, campo) - getattr(esperada, campo)) > 1e-6:
+                        diferencias += 1
+                        self.stdout.write(
+                            f'Seguimiento {seguimiento_id}: {campo} guardado={getattr(guardada, campo)} '
+                            f'esperado={getattr(esperada, campo)}'
+                        )
+
+        if diferencias:
+            raise CommandError(
+                f'Se encontraron {diferencias} diferencias. Ejecute el comando sin --verificar para reconstruir.'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Estadísticas correctas para {len(ids)} seguimientos'))
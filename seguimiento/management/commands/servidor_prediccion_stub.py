@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from seguimiento.stub_prediccion import crear_servidor_stub
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un servidor local que imita al microservicio de predicción, con latencia "
+        "y tasa de error configurables. Útil para probar el cliente y medir rendimiento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha (por defecto 127.0.0.1)')
+        parser.add_argument('--puerto', type=int, default=8090, help='Puerto de escucha (por defecto 8090)')
+        parser.add_argument(
+            '--latencia',
+            type=float,
+            default=0.0,
+            help='Segundos que tarda cada respuesta (por defecto 0)',
+        )
+        parser.add_argument(
+            '--tasa-error',
+            type=float,
+            default=0.0,
+            help='Proporción de solicitudes que responden con error, entre 0 y 1 (por defecto 0)',
+        )
+        parser.add_argument(
+            '--estado-error',
+            type=int,
+            default=503,
+            help='Código HTTP de las respuestas con error (por defecto 503)',
+        )
+        parser.add_argument(
+            '--respuesta-invalida',
+            action='store_true',
+            help='Responder 200 con un cuerpo que no es JSON',
+        )
+
+    def handle(self, *args, **options):
+        servidor, configuracion = crear_servidor_stub(
+            host=options['host'],
+            puerto=options['puerto'],
+            latencia=options['latencia'],
+            tasa_error=options['tasa_error'],
+            estado_error=options['estado_error'],
+            respuesta_invalida=options['respuesta_invalida'],
+        )
+        url = f"http://{options['host']}:{servidor.server_port}/"
+        self.stdout.write(self.style.SUCCESS(f'Servidor de predicción simulado escuchando en {url}'))
+        self.stdout.write(
+            f'Usar ML_PREDICCION_URL={url} (y ML_PREDICCION_LOTE_URL={url} para el modo lote). Ctrl+C para detener.'
+        )
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            self.stdout.write(f'{configuracion.solicitudes} solicitudes atendidas')
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from cursos.models import Curso
+from materias.models import Materia
+from matricula.models import Matricula, VigenciaMatricula
+from seguimiento.models import Examen, Tarea
+from usuarios.models import Usuario
+
+
+# Con --sin-forzar, una tabla de hasta estas páginas (8 KB) se lee entera aunque tenga
+# índice: no se cuenta como falla
+PAGINAS_TABLA_CHICA = 10
+
+
+def _nombre_indice(modelo, campo):
+    """Nombre del índice declarado en Meta.indexes cuyo primer campo es `campo`"""
+    for indice in modelo._meta.indexes:
+        if indice.fields and indice.fields[0].lstrip('-') == campo:
+            return indice.name
+    raise LookupError(f'{modelo.__name__} no tiene un índice sobre {campo}')
+
+
+def consultas_con_indice():
+    """(descripción, índice esperado, queryset) de las consultas frecuentes que deben usar un índice"""
+    hoy = date.today()
+    # Un estudiante con matrículas, para que el plan use las estadísticas de un valor real
+    estudiante_id = Matricula.objects.filter(estado=True).values_list('estudiante_id', flat=True).first() or 1
+    seguimiento_id = Tarea.objects.values_list('seguimiento_id', flat=True).first() or 1
+    return [
+        (
+            'Exámenes próximos (ExamenViewSet.proximos)',
+            'examen_fecha_idx',
+            Examen.objects.filter(fecha__gte=hoy, fecha__lte=hoy + timedelta(days=30)).order_by('fecha'),
+        ),
+        (
+            'Tareas de un seguimiento (TareaViewSet.por_seguimiento)',
+            'tarea_seguimiento_fecha_idx',
+            Tarea.objects.filter(seguimiento_id=seguimiento_id).order_by('-fecha'),
+        ),
+        (
+            'Última matrícula activa de un estudiante (vigencia al guardar una matrícula)',
+            'matricula_activa_idx',
+            Matricula.objects.filter(estudiante_id__in=[estudiante_id], estado=True)
+            .select_related('tipo_pago')
+            .order_by('estudiante_id', '-fecha', '-id')
+            .distinct('estudiante_id'),
+        ),
+        (
+            'Vigencias que vencen en una semana (revisar_vigencias)',
+            _nombre_indice(VigenciaMatricula, 'valida_hasta'),
+            VigenciaMatricula.objects.filter(valida_hasta__gte=hoy, valida_hasta__lte=hoy + timedelta(days=7)),
+        ),
+        (
+            'Página de usuarios activos (UsuarioListCreateView)',
+            'usuario_activo_idx',
+            Usuario.objects.filter(activo=True).order_by('-id')[:50],
+        ),
+        (
+            'Cursos activos',
+            'curso_activo_idx',
+            Curso.objects.filter(activo=True, id__gt=0).order_by('id'),
+        ),
+        (
+            'Materias activas',
+            'materia_activa_idx',
+            Materia.objects.filter(activo=True, id__gt=0).order_by('id'),
+        ),
+    ]
+
+
+def _parcial_sin_filas_excluidas(modelo, nombre):
+    """True si `nombre` es un índice parcial de `modelo` cuya condición cumplen todas las filas"""
+    for indice in modelo._meta.indexes:
+        if indice.name == nombre and indice.condition is not None:
+            return not modelo.objects.exclude(indice.condition).exists()
+    return False
+
+
+def _paginas(cursor, tabla):
+    """Páginas de 8 KB que ocupa la tabla según las estadísticas (pg_class.relpages)"""
+    cursor.execute('SELECT relpages FROM pg_class WHERE oid = %s::regclass', [tabla])
+    return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica con EXPLAIN que las consultas frecuentes usan los índices declarados en los "
+        "modelos. Termina con error si alguna no lo usa. Solo PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sin-forzar',
+            action='store_true',
+            help=(
+                'No desactivar los recorridos secuenciales: con una base poblada muestra el plan que '
+                'elegiría el planificador con las estadísticas reales'
+            ),
+        )
+        parser.add_argument('--mostrar', action='store_true', help='Mostrar el plan de cada consulta')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('verificar_indices requiere PostgreSQL')
+
+        fallidas = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if not options['sin_forzar']:
+                    # Con pocas filas el planificador prefiere leer toda la tabla; así solo la
+                    # recorre si no hay ningún índice aplicable
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                else:
+                    cursor.execute('ANALYZE')
+
+            for descripcion, indice, queryset in consultas_con_indice():
+                plan = queryset.explain()
+                usa_indice = indice in plan
+                if not usa_indice and options['sin_forzar']:
+                    with connection.cursor() as cursor:
+                        paginas = _paginas(cursor, queryset.model._meta.db_table)
+                    if paginas <= PAGINAS_TABLA_CHICA:
+                        # Leer unas pocas páginas enteras es tan barato como usar el índice
+                        self.stdout.write(f'--  {descripcion} ({indice}): tabla chica ({paginas} páginas), sin índice')
+                        continue
+                if not usa_indice and _parcial_sin_filas_excluidas(queryset.model, indice):
+                    # Si ninguna fila queda fuera de la condición, el índice parcial equivale a la clave
+                    # primaria y el planificador puede elegir cualquiera de los dos
+                    self.stdout.write(f'--  {descripcion} ({indice}): ninguna fila fuera de la condición del índice')
+                    continue
+                if not usa_indice:
+                    fallidas.append(descripcion)
+                estilo = self.style.SUCCESS if usa_indice else self.style.ERROR
+                self.stdout.write(estilo(f'{"OK " if usa_indice else "NO "} {descripcion} ({indice})'))
+                if options['mostrar'] or not usa_indice:
+                    self.stdout.write(plan)
+
+        if fallidas:
+            raise CommandError(f'{len(fallidas)} consultas no usan el índice esperado')
+        self.stdout.write(self.style.SUCCESS('Todas las consultas usan su índice'))
@@ -0,0 +1,29 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .calculos import arecalculo_diferido, recalculo_diferido
+
+
+class RecalculoDiferidoMiddleware:
+    """
+    Agrupar los recálculos de nota trimestral disparados durante una petición,
+    de modo que cada seguimiento afectado se recalcule una sola vez al final.
+
+    Soporta los dos modos: con ASGI las vistas async no pasan por un hilo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with recalculo_diferido():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with arecalculo_diferido():
+            return await self.get_response(request)
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('matricula', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Asistencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('asistencia', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Asistencia',
+                'verbose_name_plural': 'Asistencias',
+            },
+        ),
+        migrations.CreateModel(
+            name='Participacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_participacion', models.DateField()),
+                ('nota_participacion', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(100.0)])),
+                ('descripcion', models.TextField(blank=True, help_text='Descripción de la participación', null=True)),
+            ],
+            options={
+                'verbose_name': 'Participación',
+                'verbose_name_plural': 'Participaciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='Seguimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nota_trimestral', models.FloatField(default=0.0, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(100.0)])),
+            ],
+            options={
+                'verbose_name': 'Seguimiento',
+                'verbose_name_plural': 'Seguimientos',
+            },
+        ),
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('nota_tarea', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(100.0)])),
+                ('titulo', models.CharField(blank=True, max_length=200, null=True)),
+                ('descripcion', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipoExamen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('descripcion', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tipo de Examen',
+                'verbose_name_plural': 'Tipos de Examen',
+            },
+        ),
+        migrations.CreateModel(
+            name='Examen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('nota_examen', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(100.0)])),
+                ('observaciones', models.TextField(blank=True, null=True)),
+                ('matricula', models.ForeignKey(blank=True, help_text='Matrícula que habilitó este examen', null=True, on_delete=django.db.models.deletion.SET_NULL, to='matricula.matricula')),
+            ],
+            options={
+                'verbose_name': 'Examen',
+                'verbose_name_plural': 'Exámenes',
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cursos', '0002_initial'),
+        ('materias', '0002_initial'),
+        ('seguimiento', '0001_initial'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seguimiento',
+            name='estudiante',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='usuarios.estudiante'),
+        ),
+        migrations.AddField(
+            model_name='seguimiento',
+            name='materia_curso',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='materias.materiacurso'),
+        ),
+        migrations.AddField(
+            model_name='seguimiento',
+            name='trimestre',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cursos.trimestre'),
+        ),
+        migrations.AddField(
+            model_name='participacion',
+            name='seguimiento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participaciones', to='seguimiento.seguimiento'),
+        ),
+        migrations.AddField(
+            model_name='examen',
+            name='seguimiento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='examenes', to='seguimiento.seguimiento'),
+        ),
+        migrations.AddField(
+            model_name='asistencia',
+            name='seguimiento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asistencias', to='seguimiento.seguimiento'),
+        ),
+        migrations.AddField(
+            model_name='tarea',
+            name='seguimiento',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tareas', to='seguimiento.seguimiento'),
+        ),
+        migrations.AddField(
+            model_name='examen',
+            name='tipo_examen',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='seguimiento.tipoexamen'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seguimiento',
+            unique_together={('materia_curso', 'trimestre', 'estudiante')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='asistencia',
+            unique_together={('seguimiento', 'fecha')},
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguimiento', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaSeguimiento',
+            fields=[
+                ('seguimiento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas', serialize=False, to='seguimiento.seguimiento')),
+                ('total_tareas', models.PositiveIntegerField(default=0)),
+                ('suma_tareas', models.FloatField(default=0.0)),
+                ('prom_tareas', models.FloatField(default=0.0)),
+                ('total_participaciones', models.PositiveIntegerField(default=0)),
+                ('suma_participaciones', models.FloatField(default=0.0)),
+                ('prom_participaciones', models.FloatField(default=0.0)),
+                ('total_examenes', models.PositiveIntegerField(default=0)),
+                ('suma_examenes', models.FloatField(default=0.0)),
+                ('prom_examenes', models.FloatField(default=0.0)),
+                ('total_asistencias', models.PositiveIntegerField(default=0)),
+                ('total_presentes', models.PositiveIntegerField(default=0)),
+                ('porcentaje_asistencia', models.FloatField(default=0.0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estadística de seguimiento',
+                'verbose_name_plural': 'Estadísticas de seguimiento',
+            },
+        ),
+    ]
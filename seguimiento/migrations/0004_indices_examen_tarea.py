@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matricula', '0004_matricula_matricula_activa_idx'),
+        ('seguimiento', '0003_estadisticaseguimiento'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tarea',
+            name='seguimiento',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tareas', to='seguimiento.seguimiento'),
+        ),
+        migrations.AddIndex(
+            model_name='examen',
+            index=models.Index(fields=['fecha'], name='examen_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['seguimiento', '-fecha'], name='tarea_seguimiento_fecha_idx'),
+        ),
+    ]
@@ -22,35 +22,10 @@ class Seguimiento(models.Model):
     
     def calcular_nota_trimestral(self):
         """Calcular la nota trimestral basada en tareas, participaciones, exámenes y asistencia"""
-        # Promedio de tareas
-        tareas = self.tareas.all()
-        prom_tareas = sum(t.nota_tarea for t in tareas) / len(tareas) if tareas else 0
-
-        # Promedio de participaciones
-        participaciones = self.participaciones.all()
-        prom_part = sum(p.nota_participacion for p in participaciones) / len(participaciones) if participaciones else 0
-
-        # Promedio de exámenes
-        examenes = self.examenes.all()
-        prom_examenes = sum(e.nota_examen for e in examenes) / len(examenes) if examenes else 0
-
-        # Porcentaje de asistencia
-        asistencias = self.asistencias.all()
-        porcentaje_asistencia = (
-            sum(1 for a in asistencias if a.asistencia) / len(asistencias) * 100
-            if asistencias else 0
-        )
-
-        # Fórmula personalizada (puedes modificar los pesos)
-        nota_final = (
-            prom_tareas * 0.25 +
-            prom_part * 0.15 +
-            prom_examenes * 0.50 +
-            (porcentaje_asistencia / 100) * 0.10
-        )
-
-        self.nota_trimestral = round(nota_final, 2)
-        self.save()
+        from .calculos import recalcular_notas
+
+        notas = recalcular_notas([self.pk])
+        self.nota_trimestral = notas.get(self.pk, self.nota_trimestral)
         return self.nota_trimestral
 
 
@@ -86,7 +61,10 @@ class Participacion(models.Model):
 
 
 class Tarea(models.Model):
-    seguimiento = models.ForeignKey('seguimiento.Seguimiento', on_delete=models.CASCADE, related_name='tareas')
+    # Sin índice propio: tarea_seguimiento_fecha_idx empieza por seguimiento y lo reemplaza
+    seguimiento = models.ForeignKey(
+        'seguimiento.Seguimiento', on_delete=models.CASCADE, related_name='tareas', db_index=False
+    )
     fecha = models.DateField()
     nota_tarea = models.FloatField(
         validators=[MinValueValidator(0.0), MaxValueValidator(100.0)]
@@ -97,6 +75,10 @@ class Tarea(models.Model):
     class Meta:
         verbose_name = "Tarea"
         verbose_name_plural = "Tareas"
+        indexes = [
+            # Tareas de un seguimiento, de la más reciente a la más antigua
+            models.Index(fields=['seguimiento', '-fecha'], name='tarea_seguimiento_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.seguimiento.estudiante} - {self.titulo or 'Tarea'} - {self.nota_tarea}"
@@ -127,6 +109,49 @@ class Examen(models.Model):
     class Meta:
         verbose_name = "Examen"
         verbose_name_plural = "Exámenes"
+        indexes = [
+            # Exámenes por rango de fechas (próximos exámenes)
+            models.Index(fields=['fecha'], name='examen_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Examen {self.tipo_examen} - {self.seguimiento.estudiante} - {self.fecha}"
+
+
+class EstadisticaSeguimiento(models.Model):
+    """Estadísticas precalculadas de un seguimiento (se mantienen al registrar notas y asistencia)"""
+    seguimiento = models.OneToOneField(
+        'seguimiento.Seguimiento',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estadisticas'
+    )
+    total_tareas = models.PositiveIntegerField(default=0)
+    suma_tareas = models.FloatField(default=0.0)
+    prom_tareas = models.FloatField(default=0.0)
+    total_participaciones = models.PositiveIntegerField(default=0)
+    suma_participaciones = models.FloatField(default=0.0)
+    prom_participaciones = models.FloatField(default=0.0)
+    total_examenes = models.PositiveIntegerField(default=0)
+    suma_examenes = models.FloatField(default=0.0)
+    prom_examenes = models.FloatField(default=0.0)
+    total_asistencias = models.PositiveIntegerField(default=0)
+    total_presentes = models.PositiveIntegerField(default=0)
+    porcentaje_asistencia = models.FloatField(default=0.0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estadística de seguimiento"
+        verbose_name_plural = "Estadísticas de seguimiento"
+
+    def __str__(self):
+        return f"Estadísticas de {self.seguimiento_id}"
+
+    def promedios(self):
+        """Promedios en el formato usado por el cálculo de nota y la predicción"""
+        return {
+            'prom_tareas': self.prom_tareas,
+            'prom_participaciones': self.prom_participaciones,
+            'prom_examenes': self.prom_examenes,
+            'porcentaje_asistencia': self.porcentaje_asistencia,
+        }
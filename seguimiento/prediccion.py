@@ -0,0 +1,294 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from cursos.models import Trimestre
+from .models import Seguimiento, EstadisticaSeguimiento
+from .calculos import obtener_estadisticas
+from .cliente_prediccion import ErrorPrediccion, obtener_cliente
+
+
+class DatosPrediccionError(Exception):
+    """No hay datos suficientes para construir la entrada del modelo ML"""
+
+
+def obtener_trimestres_prediccion():
+    """Los dos primeros trimestres (por fecha de inicio) son la entrada del modelo"""
+    return _validar_trimestres(list(Trimestre.objects.order_by('fecha_inicio')[:2]))
+
+
+async def aobtener_trimestres_prediccion():
+    """Versión async de obtener_trimestres_prediccion()"""
+    return _validar_trimestres([t async for t in Trimestre.objects.order_by('fecha_inicio')[:2]])
+
+
+def _validar_trimestres(trimestres):
+    if len(trimestres) < 2:
+        raise DatosPrediccionError('Se necesitan al menos 2 trimestres registrados para hacer predicciones')
+    return trimestres
+
+
+def _seguimientos_prediccion(trimestres, materia_curso_ids, estudiante_ids):
+    seguimientos = Seguimiento.objects.filter(
+        materia_curso_id__in=materia_curso_ids,
+        trimestre__in=trimestres,
+    )
+    if estudiante_ids is not None:
+        seguimientos = seguimientos.filter(estudiante_id__in=estudiante_ids)
+    return seguimientos.values_list('id', 'estudiante_id', 'materia_curso_id', 'trimestre_id')
+
+
+def construir_datos_prediccion(trimestres, materia_curso_ids, estudiante_ids=None):
+    """
+    Construir los datos de entrada del modelo ML para varios pares
+    (estudiante, materia_curso) con consultas agrupadas.
+
+    Retorna {(estudiante_id, materia_curso_id): datos_ml o mensaje de error}
+    para todos los pares que tienen al menos un seguimiento en los trimestres.
+    """
+    seguimientos = list(_seguimientos_prediccion(trimestres, materia_curso_ids, estudiante_ids))
+    estadisticas = obtener_estadisticas([fila[0] for fila in seguimientos])
+    return _armar_datos_prediccion(trimestres, seguimientos, estadisticas)
+
+
+async def aconstruir_datos_prediccion(trimestres, materia_curso_ids, estudiante_ids=None):
+    """Versión async de construir_datos_prediccion()"""
+    seguimientos = [
+        fila async for fila in _seguimientos_prediccion(trimestres, materia_curso_ids, estudiante_ids)
+    ]
+    ids = [fila[0] for fila in seguimientos]
+    estadisticas = await EstadisticaSeguimiento.objects.ain_bulk(ids)
+    faltantes = [i for i in ids if i not in estadisticas]
+    if faltantes:
+        # Poco frecuente (seguimientos sin estadísticas todavía): se calculan y guardan
+        estadisticas.update(await sync_to_async(obtener_estadisticas)(faltantes))
+    return _armar_datos_prediccion(trimestres, seguimientos, estadisticas)
+
+
+def _armar_datos_prediccion(trimestres, seguimientos, estadisticas):
+    trimestre_1, trimestre_2 = trimestres
+    por_par = {}
+    for seguimiento_id, estudiante_id, materia_curso_id, trimestre_id in seguimientos:
+        promedios = {
+            clave: round(valor, 2)
+            for clave, valor in estadisticas[seguimiento_id].promedios().items()
+        }
+        por_par.setdefault((estudiante_id, materia_curso_id), {})[trimestre_id] = promedios
+
+    datos = {}
+    for par, por_trimestre in por_par.items():
+        faltante = next((t for t in trimestres if t.id not in por_trimestre), None)
+        if faltante:
+            datos[par] = f'No se encontró seguimiento del estudiante en {faltante.nombre}'
+            continue
+        datos_t1 = por_trimestre[trimestre_1.id]
+        datos_t2 = por_trimestre[trimestre_2.id]
+        datos[par] = {
+            'prom_tareas_t1': datos_t1['prom_tareas'],
+            'prom_examenes_t1': datos_t1['prom_examenes'],
+            'prom_part_t1': datos_t1['prom_participaciones'],
+            'asistencia_t1': datos_t1['porcentaje_asistencia'],
+            'prom_tareas_t2': datos_t2['prom_tareas'],
+            'prom_examenes_t2': datos_t2['prom_examenes'],
+            'prom_part_t2': datos_t2['prom_participaciones'],
+            'asistencia_t2': datos_t2['porcentaje_asistencia']
+        }
+    return datos
+
+
+def _predecir_uno(datos_ml):
+    try:
+        return {'success': True, 'prediccion': obtener_cliente().predecir(datos_ml)}
+    except ErrorPrediccion as e:
+        return {'success': False, 'error': str(e)}
+
+
+def _predecir_bloque(bloque):
+    """Enviar un bloque de entradas al endpoint de lote del microservicio"""
+    try:
+        predicciones = obtener_cliente().predecir_lote(bloque)
+    except ErrorPrediccion as e:
+        return [{'success': False, 'error': str(e)}] * len(bloque)
+
+    if len(predicciones) != len(bloque):
+        return [{'success': False, 'error': 'El microservicio ML devolvió una cantidad inesperada de predicciones'}] * len(bloque)
+    return [{'success': True, 'prediccion': prediccion} for prediccion in predicciones]
+
+
+def predecir_lote(lista_datos_ml):
+    """
+    Obtener las predicciones de varias entradas, en el mismo orden.
+
+    Si ML_PREDICCION_LOTE_URL está configurada se envían bloques de
+    ML_PREDICCION_TAMANO_LOTE entradas por llamada (el microservicio recibe una
+    lista y devuelve una lista). Si no, se hacen llamadas individuales en
+    paralelo sobre el pool de conexiones del cliente compartido.
+    Cada resultado es {'success': True, 'prediccion': ...} o {'success': False, 'error': ...}.
+    """
+    if not lista_datos_ml:
+        return []
+
+    if settings.ML_PREDICCION_LOTE_URL:
+        tamano = settings.ML_PREDICCION_TAMANO_LOTE
+        bloques = [lista_datos_ml[i:i + tamano] for i in range(0, len(lista_datos_ml), tamano)]
+        funcion = _predecir_bloque
+    else:
+        bloques = lista_datos_ml
+        funcion = _predecir_uno
+
+    trabajadores = min(settings.ML_PREDICCION_CONCURRENCIA, len(bloques))
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        resultados = list(ejecutor.map(funcion, bloques))
+
+    if settings.ML_PREDICCION_LOTE_URL:
+        return [resultado for bloque in resultados for resultado in bloque]
+    return resultados
+
+
+async def _apredecir_uno(datos_ml):
+    try:
+        return {'success': True, 'prediccion': await obtener_cliente().apredecir(datos_ml)}
+    except ErrorPrediccion as e:
+        return {'success': False, 'error': str(e)}
+
+
+async def _apredecir_bloque(bloque):
+    try:
+        predicciones = await obtener_cliente().apredecir_lote(bloque)
+    except ErrorPrediccion as e:
+        return [{'success': False, 'error': str(e)}] * len(bloque)
+
+    if len(predicciones) != len(bloque):
+        return [{'success': False, 'error': 'El microservicio ML devolvió una cantidad inesperada de predicciones'}] * len(bloque)
+    return [{'success': True, 'prediccion': prediccion} for prediccion in predicciones]
+
+
+async def apredecir_lote(lista_datos_ml):
+    """Versión async de predecir_lote(): las llamadas concurrentes no ocupan hilos"""
+    if not lista_datos_ml:
+        return []
+
+    if settings.ML_PREDICCION_LOTE_URL:
+        tamano = settings.ML_PREDICCION_TAMANO_LOTE
+        bloques = [lista_datos_ml[i:i + tamano] for i in range(0, len(lista_datos_ml), tamano)]
+        funcion = _apredecir_bloque
+    else:
+        bloques = lista_datos_ml
+        funcion = _apredecir_uno
+
+    limite = asyncio.Semaphore(settings.ML_PREDICCION_CONCURRENCIA)
+
+    async def limitada(bloque):
+        async with limite:
+            return await funcion(bloque)
+
+    resultados = await asyncio.gather(*(limitada(bloque) for bloque in bloques))
+
+    if settings.ML_PREDICCION_LOTE_URL:
+        return [resultado for bloque in resultados for resultado in bloque]
+    return list(resultados)
+
+
+def _clave_prediccion(estudiante_id, materia_curso_id):
+    return f'prediccion:{estudiante_id}:{materia_curso_id}'
+
+
+def _huella(datos_ml):
+    """Huella de los datos de entrada: una predicción guardada solo sirve si coincide"""
+    return hashlib.sha256(json.dumps(datos_ml, sort_keys=True).encode()).hexdigest()
+
+
+def leer_predicciones_en_cache(datos_por_par):
+    """
+    Buscar en cache las predicciones de varios pares (estudiante_id, materia_curso_id).
+    Solo se devuelven las que fueron calculadas con los mismos datos de entrada.
+    Retorna {par: prediccion}
+    """
+    claves = {_clave_prediccion(*par): par for par in datos_por_par}
+    return _vigentes(claves, cache.get_many(list(claves)), datos_por_par)
+
+
+async def aleer_predicciones_en_cache(datos_por_par):
+    """Versión async de leer_predicciones_en_cache()"""
+    claves = {_clave_prediccion(*par): par for par in datos_por_par}
+    return _vigentes(claves, await cache.aget_many(list(claves)), datos_por_par)
+
+
+def _vigentes(claves, guardadas, datos_por_par):
+    encontradas = {}
+    for clave, guardada in guardadas.items():
+        par = claves[clave]
+        if guardada['huella'] == _huella(datos_por_par[par]):
+            encontradas[par] = guardada['prediccion']
+    return encontradas
+
+
+def _entradas_cache(predicciones_por_par, datos_por_par):
+    return {
+        _clave_prediccion(*par): {'huella': _huella(datos_por_par[par]), 'prediccion': prediccion}
+        for par, prediccion in predicciones_por_par.items()
+    }
+
+
+def guardar_predicciones_en_cache(predicciones_por_par, datos_por_par):
+    """Guardar en cache las predicciones exitosas junto con la huella de sus datos"""
+    cache.set_many(
+        _entradas_cache(predicciones_por_par, datos_por_par),
+        timeout=settings.ML_PREDICCION_CACHE_TIMEOUT
+    )
+
+
+async def aguardar_predicciones_en_cache(predicciones_por_par, datos_por_par):
+    """Versión async de guardar_predicciones_en_cache()"""
+    await cache.aset_many(
+        _entradas_cache(predicciones_por_par, datos_por_par),
+        timeout=settings.ML_PREDICCION_CACHE_TIMEOUT
+    )
+
+
+def invalidar_predicciones(pares):
+    """Descartar las predicciones guardadas de varios pares (estudiante_id, materia_curso_id)"""
+    if pares:
+        cache.delete_many([_clave_prediccion(*par) for par in pares])
+
+
+def predecir_pares(datos_por_par):
+    """
+    Obtener las predicciones de varios pares (estudiante_id, materia_curso_id).
+    Las que están en cache no llaman al microservicio; las nuevas predicciones
+    exitosas se guardan en cache.
+    Retorna {par: {'success': ..., 'prediccion' o 'error': ...}}
+    """
+    en_cache = leer_predicciones_en_cache(datos_por_par)
+    pendientes = [par for par in datos_por_par if par not in en_cache]
+    resultados, nuevas = _combinar_resultados(
+        en_cache, pendientes, predecir_lote([datos_por_par[par] for par in pendientes])
+    )
+    if nuevas:
+        guardar_predicciones_en_cache(nuevas, datos_por_par)
+    return resultados
+
+
+async def apredecir_pares(datos_por_par):
+    """Versión async de predecir_pares()"""
+    en_cache = await aleer_predicciones_en_cache(datos_por_par)
+    pendientes = [par for par in datos_por_par if par not in en_cache]
+    resultados, nuevas = _combinar_resultados(
+        en_cache, pendientes, await apredecir_lote([datos_por_par[par] for par in pendientes])
+    )
+    if nuevas:
+        await aguardar_predicciones_en_cache(nuevas, datos_por_par)
+    return resultados
+
+
+def _combinar_resultados(en_cache, pendientes, resultados_pendientes):
+    resultados = {par: {'success': True, 'prediccion': prediccion} for par, prediccion in en_cache.items()}
+    nuevas = {}
+    for par, resultado in zip(pendientes, resultados_pendientes):
+        resultados[par] = resultado
+        if resultado['success']:
+            nuevas[par] = resultado['prediccion']
+    return resultados, nuevas
@@ -0,0 +1,105 @@
+from django.db.models import Avg, Case, F, FloatField, When, Window
+from django.db.models.functions import Coalesce
+from .models import Seguimiento
+
+
+def _promedio_notas(*particion):
+    """
+    Promedio de las notas trimestrales mayores a 0 dentro de la partición,
+    calculado por la base de datos sobre las filas de la misma consulta
+    """
+    nota_registrada = Case(When(nota_trimestral__gt=0, then=F('nota_trimestral')), output_field=FloatField())
+    return Coalesce(
+        Window(Avg(nota_registrada), partition_by=[F(campo) for campo in particion]),
+        0.0,
+        output_field=FloatField(),
+    )
+
+
+def seguimientos_para_resumen(**filtros):
+    """
+    Una sola consulta con todo lo que necesita el resumen de uno o varios
+    estudiantes: materia, curso y trimestre (select_related), los totales
+    precalculados y los promedios por estudiante, trimestre y materia
+    (funciones de ventana).
+    """
+    return (
+        Seguimiento.objects.filter(**filtros)
+        .select_related('materia_curso__materia', 'materia_curso__curso', 'trimestre')
+        .annotate(
+            total_asistencias=Coalesce('estadisticas__total_asistencias', 0),
+            total_tareas=Coalesce('estadisticas__total_tareas', 0),
+            total_participaciones=Coalesce('estadisticas__total_participaciones', 0),
+            total_examenes=Coalesce('estadisticas__total_examenes', 0),
+            promedio_general=_promedio_notas('estudiante_id'),
+            promedio_trimestre=_promedio_notas('estudiante_id', 'trimestre_id'),
+            promedio_materia=_promedio_notas('estudiante_id', 'materia_curso__materia_id'),
+        )
+        .order_by('estudiante_id', 'trimestre__fecha_inicio', 'materia_curso__materia__nombre', 'id')
+    )
+
+
+def _resumen_vacio(estudiante):
+    return {
+        'estudiante': {
+            'id': estudiante.id,
+            'nombre': f"{estudiante.usuario.first_name} {estudiante.usuario.last_name}",
+            'email': estudiante.usuario.email
+        },
+        'total_materias': 0,
+        'promedio_general': 0,
+        'promedios_por_trimestre': [],
+        'promedios_por_materia': [],
+        'materias': []
+    }
+
+
+def armar_resumenes(estudiantes, seguimientos):
+    """
+    Armar el resumen de cada estudiante a partir de las filas de
+    seguimientos_para_resumen(). No hace consultas adicionales.
+    Retorna una lista en el orden de `estudiantes`.
+    """
+    resumenes = {estudiante.id: _resumen_vacio(estudiante) for estudiante in estudiantes}
+    por_trimestre = {}
+    por_materia = {}
+
+    for seguimiento in seguimientos:
+        resumen = resumenes.get(seguimiento.estudiante_id)
+        if resumen is None:
+            continue
+        materia = seguimiento.materia_curso.materia
+        resumen['materias'].append({
+            'materia': materia.nombre,
+            'curso': seguimiento.materia_curso.curso.nombre,
+            'trimestre': seguimiento.trimestre.nombre,
+            'nota_trimestral': seguimiento.nota_trimestral,
+            'total_asistencias': seguimiento.total_asistencias,
+            'total_tareas': seguimiento.total_tareas,
+            'total_participaciones': seguimiento.total_participaciones,
+            'total_examenes': seguimiento.total_examenes
+        })
+        resumen['total_materias'] += 1
+        resumen['promedio_general'] = round(seguimiento.promedio_general, 2)
+
+        clave = (seguimiento.estudiante_id, seguimiento.trimestre_id)
+        if clave not in por_trimestre:
+            por_trimestre[clave] = {
+                'trimestre_id': seguimiento.trimestre_id,
+                'trimestre': seguimiento.trimestre.nombre,
+                'promedio': round(seguimiento.promedio_trimestre, 2)
+            }
+            resumen['promedios_por_trimestre'].append(por_trimestre[clave])
+
+        clave = (seguimiento.estudiante_id, materia.id)
+        if clave not in por_materia:
+            por_materia[clave] = {
+                'materia_id': materia.id,
+                'materia': materia.nombre,
+                'promedio': round(seguimiento.promedio_materia, 2)
+            }
+            resumen['promedios_por_materia'].append(por_materia[clave])
+
+    for resumen in resumenes.values():
+        resumen['promedios_por_materia'].sort(key=lambda item: item['materia'])
+    return list(resumenes.values())
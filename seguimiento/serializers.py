@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Seguimiento, Asistencia, Participacion, Tarea, Examen, TipoExamen
-from matricula.models import Matricula
+from .models import Seguimiento, EstadisticaSeguimiento, Asistencia, Participacion, Tarea, Examen, TipoExamen
+from .calculos import programar_recalculo, recalculo_diferido
+from matricula.elegibilidad import evaluar_elegibilidad
 
 class SeguimientoSerializer(serializers.ModelSerializer):
     resumen_nota = serializers.SerializerMethodField()
@@ -17,17 +18,32 @@ class SeguimientoSerializer(serializers.ModelSerializer):
     def get_resumen_nota(self, obj):
         return f"{obj.nota_trimestral} / 100"
     
+    def _estadisticas(self, obj):
+        """Estadísticas precalculadas del seguimiento (None si aún no tiene registros)"""
+        try:
+            return obj.estadisticas
+        except EstadisticaSeguimiento.DoesNotExist:
+            return None
+
+    def _total(self, obj, campo):
+        # Usar el total anotado por la vista cuando está disponible
+        total = getattr(obj, campo, None)
+        if total is not None:
+            return total
+        estadisticas = self._estadisticas(obj)
+        return getattr(estadisticas, campo) if estadisticas else 0
+
     def get_total_asistencias(self, obj):
-        return obj.asistencias.count()
+        return self._total(obj, 'total_asistencias')
     
     def get_total_tareas(self, obj):
-        return obj.tareas.count()
+        return self._total(obj, 'total_tareas')
     
     def get_total_participaciones(self, obj):
-        return obj.participaciones.count()
+        return self._total(obj, 'total_participaciones')
     
     def get_total_examenes(self, obj):
-        return obj.examenes.count()
+        return self._total(obj, 'total_examenes')
 
 class SeguimientoDetalladoSerializer(serializers.ModelSerializer):
     """Serializer expandido con información detallada"""
@@ -58,6 +74,95 @@ class AsistenciaSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("No se puede registrar asistencia para fechas futuras")
         return value
 
+class RegistroMasivoAsistenciaSerializer(serializers.Serializer):
+    """Serializer para registrar la asistencia de varios seguimientos en una fecha"""
+    seguimientos = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        help_text="Lista de IDs de seguimientos"
+    )
+    fecha = serializers.DateField()
+    asistencias = serializers.ListField(
+        child=serializers.BooleanField(),
+        help_text="Lista de asistencias (true = presente), en el mismo orden que los seguimientos"
+    )
+
+    def validate_fecha(self, value):
+        """Validar que la fecha no sea futura"""
+        from datetime import date
+        if value > date.today():
+            raise serializers.ValidationError("No se puede registrar asistencia para fechas futuras")
+        return value
+
+    def validate(self, data):
+        seguimientos_ids = data['seguimientos']
+        if len(seguimientos_ids) != len(data['asistencias']):
+            raise serializers.ValidationError(
+                "La cantidad de seguimientos debe coincidir con las asistencias"
+            )
+        if len(seguimientos_ids) != len(set(seguimientos_ids)):
+            raise serializers.ValidationError("Hay seguimientos repetidos en la lista")
+
+        # Validar todos los seguimientos con una sola consulta
+        existentes = set(
+            Seguimiento.objects.filter(id__in=seguimientos_ids).values_list('id', flat=True)
+        )
+        faltantes = [i for i in seguimientos_ids if i not in existentes]
+        if faltantes:
+            raise serializers.ValidationError(
+                f"No existen los seguimientos con ID: {', '.join(map(str, faltantes))}"
+            )
+        return data
+
+    def create(self, validated_data):
+        """
+        Insertar o actualizar todas las asistencias con un único bulk_create (upsert).
+        Retorna la lista de resultados por fila indicando si se creó o actualizó.
+        """
+        seguimientos_ids = validated_data['seguimientos']
+        fecha = validated_data['fecha']
+        asistencias = validated_data['asistencias']
+
+        ya_registrados = set(
+            Asistencia.objects.filter(fecha=fecha, seguimiento_id__in=seguimientos_ids)
+            .values_list('seguimiento_id', flat=True)
+        )
+        Asistencia.objects.bulk_create(
+            [
+                Asistencia(seguimiento_id=seguimiento_id, fecha=fecha, asistencia=presente)
+                for seguimiento_id, presente in zip(seguimientos_ids, asistencias)
+            ],
+            update_conflicts=True,
+            unique_fields=['seguimiento', 'fecha'],
+            update_fields=['asistencia'],
+            batch_size=500,
+        )
+
+        # bulk_create no dispara señales: las notas se recalculan una vez para todo el lote
+        with recalculo_diferido():
+            for seguimiento_id in seguimientos_ids:
+                programar_recalculo(seguimiento_id)
+
+        return [
+            {
+                'seguimiento_id': seguimiento_id,
+                'presente': presente,
+                'creado': seguimiento_id not in ya_registrados,
+                'estado': 'actualizado' if seguimiento_id in ya_registrados else 'creado'
+            }
+            for seguimiento_id, presente in zip(seguimientos_ids, asistencias)
+        ]
+
+class PrediccionLoteSerializer(serializers.Serializer):
+    """Serializer para pedir las predicciones de una materia-curso o de un curso completo"""
+    materia_curso_id = serializers.IntegerField(required=False, help_text="ID de la materia-curso")
+    curso_id = serializers.IntegerField(required=False, help_text="ID del curso (todas sus materias activas)")
+
+    def validate(self, data):
+        if bool(data.get('materia_curso_id')) == bool(data.get('curso_id')):
+            raise serializers.ValidationError("Debe indicar materia_curso_id o curso_id (solo uno de los dos)")
+        return data
+
 class ParticipacionSerializer(serializers.ModelSerializer):
     estudiante_nombre = serializers.CharField(source='seguimiento.estudiante.usuario.first_name', read_only=True)
     
@@ -77,7 +182,43 @@ class TipoExamenSerializer(serializers.ModelSerializer):
         model = TipoExamen
         fields = ['id', 'nombre', 'descripcion']
 
+class ExamenListSerializer(serializers.ListSerializer):
+    """Evalúa la matrícula de todos los exámenes del lote de una vez (una consulta por fecha)"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.elegibilidad_precargada = self._precargar_elegibilidad(data)
+        return super().to_internal_value(data)
+
+    def _precargar_elegibilidad(self, data):
+        campo_fecha = serializers.DateField()
+        pares = []
+        for item in data:
+            if not isinstance(item, dict) or not item.get('seguimiento') or not item.get('fecha'):
+                continue
+            try:
+                pares.append((int(item['seguimiento']), campo_fecha.to_internal_value(item['fecha'])))
+            except (TypeError, ValueError, serializers.ValidationError):
+                # Los datos inválidos los informa la validación de cada examen
+                continue
+
+        estudiantes = dict(
+            Seguimiento.objects.filter(id__in={seguimiento_id for seguimiento_id, _ in pares})
+            .values_list('id', 'estudiante_id')
+        )
+        por_fecha = {}
+        for seguimiento_id, fecha in pares:
+            if seguimiento_id in estudiantes:
+                por_fecha.setdefault(fecha, set()).add(estudiantes[seguimiento_id])
+        return {
+            (estudiante_id, fecha): elegibilidad
+            for fecha, estudiantes_ids in por_fecha.items()
+            for estudiante_id, elegibilidad in evaluar_elegibilidad(estudiantes_ids, fecha).items()
+        }
+
+
 class ExamenSerializer(serializers.ModelSerializer):
+    elegibilidad_precargada = None
     estudiante_nombre = serializers.CharField(source='seguimiento.estudiante.usuario.first_name', read_only=True)
     tipo_examen_nombre = serializers.CharField(source='tipo_examen.nombre', read_only=True)
     
@@ -86,6 +227,7 @@ class ExamenSerializer(serializers.ModelSerializer):
         fields = ['id', 'seguimiento', 'tipo_examen', 'tipo_examen_nombre', 'fecha', 'nota_examen', 
                  'matricula', 'observaciones', 'estudiante_nombre']
         read_only_fields = ('matricula',)  # La matrícula se asigna automáticamente
+        list_serializer_class = ExamenListSerializer
 
     def validate(self, data):
         """
@@ -95,14 +237,16 @@ class ExamenSerializer(serializers.ModelSerializer):
         fecha_examen = data.get('fecha')
         
         if seguimiento and fecha_examen:
-            estudiante = seguimiento.estudiante
-            puede_rendir, resultado = Matricula.estudiante_puede_rendir_examen(estudiante, fecha_examen)
-            
-            if not puede_rendir:
-                raise serializers.ValidationError(f"El estudiante no puede rendir el examen: {resultado}")
-                
+            clave = (seguimiento.estudiante_id, fecha_examen)
+            if self.elegibilidad_precargada and clave in self.elegibilidad_precargada:
+                elegibilidad = self.elegibilidad_precargada[clave]
+            else:
+                elegibilidad = evaluar_elegibilidad([seguimiento.estudiante_id], fecha_examen)[seguimiento.estudiante_id]
+
+            if not elegibilidad.puede_rendir:
+                raise serializers.ValidationError(f"El estudiante no puede rendir el examen: {elegibilidad.mensaje}")
+
             # Si puede rendir, guardamos la matrícula que lo habilitó
-            if isinstance(resultado, Matricula):
-                data['matricula'] = resultado
-                
+            data['matricula'] = elegibilidad.matricula
+
         return data 
\ No newline at end of file
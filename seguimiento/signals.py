@@ -2,10 +2,11 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .models import Tarea, Participacion, Asistencia, Examen, Seguimiento
+from .calculos import programar_recalculo
 
-def actualizar_nota(seguimiento):
-    if seguimiento:
-        seguimiento.calcular_nota_trimestral()
+def actualizar_nota(seguimiento_id):
+    if seguimiento_id:
+        programar_recalculo(seguimiento_id)
 
 @receiver(post_save, sender=Tarea)
 @receiver(post_delete, sender=Tarea)
@@ -15,5 +16,9 @@ def actualizar_nota(seguimiento):
 @receiver(post_delete, sender=Asistencia)
 @receiver(post_save, sender=Examen)
 @receiver(post_delete, sender=Examen)
-def recalcular_nota(sender, instance, **kwargs):
-    actualizar_nota(instance.seguimiento)
+def recalcular_nota(sender, instance, origin=None, **kwargs):
+    # Un borrado en cascada (desde el seguimiento o un modelo superior) elimina
+    # también el seguimiento y sus estadísticas: no hay nada que recalcular
+    if origin is not None and getattr(origin, 'model', type(origin)) is not sender:
+        return
+    actualizar_nota(instance.seguimiento_id)
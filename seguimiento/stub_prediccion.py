@@ -0,0 +1,111 @@
+"""
+Servidor HTTP local que imita al microservicio de predicción.
+
+Sirve para probar el cliente (pool de conexiones, timeouts, circuit breaker)
+y para medir rendimiento sin depender del servicio real. Acepta una entrada
+(dict) o una lista de entradas, igual que los endpoints de predicción y de lote.
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ConfiguracionStub:
+    """Comportamiento del servidor; se puede cambiar mientras está corriendo"""
+
+    def __init__(self, latencia=0.0, tasa_error=0.0, estado_error=503, respuesta_invalida=False):
+        self.latencia = latencia
+        self.tasa_error = tasa_error
+        self.estado_error = estado_error
+        # Responder 200 con un cuerpo que no es JSON
+        self.respuesta_invalida = respuesta_invalida
+        self.solicitudes = 0
+        self._lock = threading.Lock()
+
+    def contar(self):
+        with self._lock:
+            self.solicitudes += 1
+
+
+def _prediccion(datos_ml):
+    """Predicción simple y determinista a partir de los promedios del segundo trimestre"""
+    nota = (
+        datos_ml.get('prom_tareas_t2', 0) * 0.25 +
+        datos_ml.get('prom_part_t2', 0) * 0.15 +
+        datos_ml.get('prom_examenes_t2', 0) * 0.50 +
+        datos_ml.get('asistencia_t2', 0) * 0.10
+    )
+    return {'nota_predicha_t3': round(nota, 2)}
+
+
+class _ManejadorStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    configuracion = None
+
+    def do_POST(self):
+        configuracion = self.configuracion
+        configuracion.contar()
+        largo = int(self.headers.get('Content-Length', 0))
+        cuerpo = json.loads(self.rfile.read(largo) or b'{}')
+
+        if configuracion.latencia:
+            time.sleep(configuracion.latencia)
+
+        if random.random() < configuracion.tasa_error:
+            self._responder(configuracion.estado_error, {'detail': 'Error simulado'})
+            return
+
+        if configuracion.respuesta_invalida:
+            self._responder_texto(200, '<html>Bad Gateway</html>')
+        elif isinstance(cuerpo, list):
+            self._responder(200, [_prediccion(datos) for datos in cuerpo])
+        else:
+            self._responder(200, _prediccion(cuerpo))
+
+    def _responder(self, estado, contenido):
+        self._enviar(estado, json.dumps(contenido).encode(), 'application/json')
+
+    def _responder_texto(self, estado, texto):
+        self._enviar(estado, texto.encode(), 'text/html')
+
+    def _enviar(self, estado, datos, tipo):
+        self.send_response(estado)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+class _ServidorStub(ThreadingHTTPServer):
+    daemon_threads = True
+    # La cola por defecto (5) rechaza conexiones cuando llegan cientos a la vez
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # El cliente cerró la conexión antes de la respuesta (por ejemplo, por timeout)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def crear_servidor_stub(host='127.0.0.1', puerto=0, **opciones):
+    """
+    Crear el servidor (puerto 0 = uno libre). Retorna (servidor, configuracion);
+    la URL base es f'http://{host}:{servidor.server_port}/'.
+    """
+    configuracion = ConfiguracionStub(**opciones)
+    manejador = type('ManejadorStub', (_ManejadorStub,), {'configuracion': configuracion})
+    servidor = _ServidorStub((host, puerto), manejador)
+    return servidor, configuracion
+
+
+def iniciar_servidor_stub(**opciones):
+    """Levantar el servidor en un hilo en segundo plano. Retorna (servidor, configuracion)"""
+    servidor, configuracion = crear_servidor_stub(**opciones)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, configuracion
@@ -1,3 +1,728 @@
-from django.test import TestCase
+import asyncio
+import io
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from cursos.models import Curso, Trimestre
+from materias.models import Materia, MateriaCurso
+from usuarios.models import Docente, Estudiante, Usuario
+from . import prediccion
+from .calculos import programar_recalculo, recalcular_notas, recalculo_diferido
+from .cliente_prediccion import (
+    ClientePrediccion, Circuito, RespuestaPrediccionError, ServicioNoDisponibleError, TimeoutPrediccionError
+)
+from .middleware import RecalculoDiferidoMiddleware
+from .models import Asistencia, EstadisticaSeguimiento, Examen, Participacion, Seguimiento, Tarea
+from .prediccion import construir_datos_prediccion
+from .stub_prediccion import iniciar_servidor_stub
 
-# Create your tests here.
+
+class IndicesTests(TestCase):
+    """Las consultas frecuentes usan sus índices sobre una escuela generada (EXPLAIN)"""
+
+    def test_consultas_usan_sus_indices(self):
+        call_command('generar_escuela', cursos=2, estudiantes=5, materias=3, clases=4, stdout=io.StringIO())
+        # Usuarios dados de baja: sin ellos el índice parcial equivale a la clave primaria
+        Usuario.objects.filter(id__in=Usuario.objects.order_by('id').values('id')[:5]).update(activo=False)
+        salida = io.StringIO()
+        call_command('verificar_indices', stdout=salida)
+        self.assertIn('Todas las consultas usan su índice', salida.getvalue())
+        usados = [linea for linea in salida.getvalue().splitlines() if linea.startswith('OK ')]
+        for indice in (
+            'examen_fecha_idx', 'tarea_seguimiento_fecha_idx', 'matricula_activa_idx',
+            'usuario_activo_idx', 'curso_activo_idx', 'materia_activa_idx',
+        ):
+            self.assertTrue(any(f'({indice})' in linea for linea in usados), indice)
+
+
+class GenerarEscuelaTests(TestCase):
+
+    def test_horarios_sin_choques(self):
+        # Pocos docentes para muchas materias-curso: cada uno da clases en varios cursos
+        call_command(
+            'generar_escuela', cursos=4, materias=5, docentes=2, estudiantes=1, clases=1, stdout=io.StringIO()
+        )
+        call_command('auditar_horarios', estricto=True, stdout=io.StringIO())
+
+
+class SeguimientosTestMixin:
+    """Una materia de un curso en un trimestre, a la que se agregan estudiantes con su seguimiento"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.curso = Curso.objects.create(nombre='5to A')
+        cls.trimestre = Trimestre.objects.create(
+            nombre='Primer Trimestre', fecha_inicio=date(2025, 2, 3), fecha_fin=date(2025, 5, 9)
+        )
+        docente = Docente.objects.create(usuario=Usuario.objects.create(email='docente@escuela.test'))
+        materia = Materia.objects.create(nombre='Matemáticas')
+        cls.materia_curso = MateriaCurso.objects.create(curso=cls.curso, materia=materia, docente=docente)
+        cls.cantidad = 0
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def agregar_seguimientos(self, cantidad):
+        """Seguimientos de estudiantes nuevos, cada uno con tareas, exámenes y asistencia"""
+        for _ in range(cantidad):
+            self.cantidad += 1
+            usuario = Usuario.objects.create(email=f'estudiante{self.cantidad}@escuela.test', first_name='Ana')
+            estudiante = Estudiante.objects.create(
+                usuario=usuario, direccion='Calle 1', fecha_nacimiento=date(2010, 1, 1), curso=self.curso
+            )
+            seguimiento = Seguimiento.objects.create(
+                materia_curso=self.materia_curso, trimestre=self.trimestre, estudiante=estudiante
+            )
+            Tarea.objects.create(seguimiento=seguimiento, fecha=date(2025, 3, 1), nota_tarea=80)
+            Examen.objects.create(seguimiento=seguimiento, fecha=date(2025, 4, 1), nota_examen=70)
+            Asistencia.objects.create(seguimiento=seguimiento, fecha=date(2025, 3, 3), asistencia=True)
+        return estudiante
+
+
+class ConsultasSeguimientoTests(SeguimientosTestMixin, TestCase):
+    """La cantidad de consultas de los listados de seguimientos no depende de la cantidad de filas"""
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as capturadas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(capturadas)
+
+    def assertConsultasConstantes(self, url):
+        self.agregar_seguimientos(2)
+        con_pocos = self.consultas(url)
+        self.agregar_seguimientos(10)
+        with self.assertNumQueries(con_pocos):
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta
+
+    def test_listado(self):
+        respuesta = self.assertConsultasConstantes('/api/seguimiento/seguimientos/')
+        self.assertEqual(len(respuesta.data['results']), 12)
+        self.assertEqual(respuesta.data['results'][0]['total_tareas'], 1)
+
+    def test_detallado(self):
+        respuesta = self.assertConsultasConstantes('/api/seguimiento/seguimientos/detallado/')
+        self.assertEqual(len(respuesta.data['results']), 12)
+        self.assertEqual(respuesta.data['results'][0]['materia_nombre'], 'Matemáticas')
+
+    def test_por_estudiante(self):
+        # Un mismo estudiante con cada vez más seguimientos (uno por trimestre)
+        estudiante = self.agregar_seguimientos(1)
+        url = f'/api/seguimiento/seguimientos/por_estudiante/?estudiante_id={estudiante.id}'
+
+        def agregar_trimestres(cantidad):
+            for _ in range(cantidad):
+                trimestre = Trimestre.objects.create(
+                    nombre='Otro trimestre', fecha_inicio=date(2025, 5, 19), fecha_fin=date(2025, 8, 29)
+                )
+                seguimiento = Seguimiento.objects.create(
+                    materia_curso=self.materia_curso, trimestre=trimestre, estudiante=estudiante
+                )
+                Tarea.objects.create(seguimiento=seguimiento, fecha=date(2025, 6, 1), nota_tarea=90)
+
+        con_pocos = self.consultas(url)
+        agregar_trimestres(8)
+        with self.assertNumQueries(con_pocos):
+            respuesta = self.client.get(url)
+        self.assertEqual(len(respuesta.data), 9)
+
+    def test_resumen_curso(self):
+        respuesta = self.assertConsultasConstantes(f'/api/seguimiento/resumen-curso/{self.curso.id}/')
+        self.assertEqual(respuesta.data['total_estudiantes'], 12)
+        resumen = respuesta.data['estudiantes'][0]
+        self.assertEqual(resumen['total_materias'], 1)
+        self.assertEqual(resumen['materias'][0]['total_examenes'], 1)
+
+    def test_resumen_estudiante(self):
+        estudiante = self.agregar_seguimientos(1)
+        Seguimiento.objects.filter(estudiante=estudiante).update(nota_trimestral=80)
+        # Las notas en 0 (trimestres sin calificar) no cuentan en los promedios
+        segundo = Trimestre.objects.create(
+            nombre='Segundo Trimestre', fecha_inicio=date(2025, 5, 19), fecha_fin=date(2025, 8, 29)
+        )
+        Seguimiento.objects.create(
+            materia_curso=self.materia_curso, trimestre=segundo, estudiante=estudiante, nota_trimestral=0
+        )
+
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(f'/api/seguimiento/resumen-estudiante/{estudiante.id}/')
+        self.assertEqual(respuesta.data['total_materias'], 2)
+        self.assertEqual(respuesta.data['promedio_general'], 80)
+        self.assertEqual(
+            [(fila['trimestre'], fila['promedio']) for fila in respuesta.data['promedios_por_trimestre']],
+            [('Primer Trimestre', 80), ('Segundo Trimestre', 0)],
+        )
+        self.assertEqual(respuesta.data['promedios_por_materia'][0]['promedio'], 80)
+        self.assertEqual(respuesta.data['materias'][0]['total_tareas'], 1)
+
+        self.assertEqual(self.client.get('/api/seguimiento/resumen-estudiante/999999/').status_code, 404)
+
+
+def nota_por_filas(seguimiento):
+    """La fórmula original, fila por fila, con la que debe coincidir el cálculo agregado"""
+    tareas = [t.nota_tarea for t in seguimiento.tareas.all()]
+    participaciones = [p.nota_participacion for p in seguimiento.participaciones.all()]
+    examenes = [e.nota_examen for e in seguimiento.examenes.all()]
+    asistencias = [a.asistencia for a in seguimiento.asistencias.all()]
+    prom_tareas = sum(tareas) / len(tareas) if tareas else 0
+    prom_part = sum(participaciones) / len(participaciones) if participaciones else 0
+    prom_examenes = sum(examenes) / len(examenes) if examenes else 0
+    porcentaje_asistencia = sum(asistencias) / len(asistencias) * 100 if asistencias else 0
+    return round(
+        prom_tareas * 0.25 + prom_part * 0.15 + prom_examenes * 0.50 + (porcentaje_asistencia / 100) * 0.10, 2
+    )
+
+
+class RecalculoNotasTests(SeguimientosTestMixin, TestCase):
+    """Nota trimestral calculada con consultas agregadas por lote"""
+
+    def seguimientos(self):
+        return list(Seguimiento.objects.order_by('id'))
+
+    def updates_de_seguimientos(self, capturadas):
+        return [q['sql'] for q in capturadas if q['sql'].startswith('UPDATE "seguimiento_seguimiento"')]
+
+    def test_misma_nota_que_la_formula_por_filas(self):
+        self.agregar_seguimientos(3)
+        primero, segundo, tercero = self.seguimientos()
+        for nota in (55.5, 91, 67.25):
+            Tarea.objects.create(seguimiento=primero, fecha=date(2025, 3, 2), nota_tarea=nota)
+        Participacion.objects.create(seguimiento=primero, fecha_participacion=date(2025, 3, 4), nota_participacion=88)
+        Participacion.objects.create(seguimiento=segundo, fecha_participacion=date(2025, 3, 4), nota_participacion=41.5)
+        Examen.objects.create(seguimiento=segundo, fecha=date(2025, 4, 8), nota_examen=93)
+        for dia in (4, 5, 6):
+            Asistencia.objects.create(seguimiento=segundo, fecha=date(2025, 3, dia), asistencia=dia != 5)
+        # Sin tareas, exámenes ni asistencia
+        Tarea.objects.filter(seguimiento=tercero).delete()
+        Examen.objects.filter(seguimiento=tercero).delete()
+        Asistencia.objects.filter(seguimiento=tercero).delete()
+
+        notas = recalcular_notas([s.id for s in self.seguimientos()])
+        for seguimiento in self.seguimientos():
+            esperada = nota_por_filas(seguimiento)
+            self.assertEqual(notas[seguimiento.id], esperada)
+            self.assertEqual(seguimiento.nota_trimestral, esperada)
+        self.assertEqual(notas[tercero.id], 0)
+
+    def test_solo_escribe_las_notas_que_cambiaron(self):
+        self.agregar_seguimientos(3)
+        primero, segundo, _ = self.seguimientos()
+        ids = [s.id for s in self.seguimientos()]
+
+        with CaptureQueriesContext(connection) as capturadas:
+            recalcular_notas(ids)
+        self.assertEqual(self.updates_de_seguimientos(capturadas), [])
+
+        # Sin señales: solo cambia la tarea de un seguimiento
+        Tarea.objects.filter(seguimiento=primero).update(nota_tarea=100)
+        with CaptureQueriesContext(connection) as capturadas:
+            notas = recalcular_notas(ids)
+        self.assertEqual(len(self.updates_de_seguimientos(capturadas)), 1)
+        self.assertEqual(Seguimiento.objects.get(id=primero.id).nota_trimestral, notas[primero.id])
+        self.assertEqual(Seguimiento.objects.get(id=segundo.id).nota_trimestral, segundo.nota_trimestral)
+
+    def test_consultas_constantes(self):
+        def consultas_del_recalculo():
+            # Todas las notas cambian: se miden también el upsert y el bulk_update
+            Seguimiento.objects.update(nota_trimestral=0)
+            with CaptureQueriesContext(connection) as capturadas:
+                recalcular_notas(Seguimiento.objects.values_list('id', flat=True))
+            return len(capturadas)
+
+        self.agregar_seguimientos(2)
+        con_pocos = consultas_del_recalculo()
+        self.agregar_seguimientos(10)
+        self.assertEqual(consultas_del_recalculo(), con_pocos)
+        self.assertEqual(
+            set(Seguimiento.objects.values_list('nota_trimestral', flat=True)),
+            {nota_por_filas(Seguimiento.objects.first())},
+        )
+
+
+class RecalculoDiferidoTests(SeguimientosTestMixin, TestCase):
+    """Las escrituras de una petición o transacción recalculan cada nota una sola vez, al confirmar"""
+
+    def setUp(self):
+        super().setUp()
+        self.agregar_seguimientos(2)
+        self.ids = list(Seguimiento.objects.order_by('id').values_list('id', flat=True))
+        espia = mock.patch('seguimiento.calculos.recalcular_notas', wraps=recalcular_notas)
+        self.recalculo = espia.start()
+        self.addCleanup(espia.stop)
+
+    def agregar_tareas(self):
+        for seguimiento_id in self.ids * 3:
+            Tarea.objects.create(seguimiento_id=seguimiento_id, fecha=date(2025, 3, 10), nota_tarea=100)
+
+    def test_un_recalculo_al_confirmar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic(), recalculo_diferido():
+                self.agregar_tareas()
+                Examen.objects.filter(seguimiento_id=self.ids[0]).delete()
+            self.recalculo.assert_not_called()
+        self.recalculo.assert_called_once_with(set(self.ids))
+        # La nota refleja todas las escrituras
+        for seguimiento in Seguimiento.objects.all():
+            self.assertEqual(seguimiento.nota_trimestral, nota_por_filas(seguimiento))
+
+    def test_sin_recalculo_si_se_revierte(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError):
+                with transaction.atomic(), recalculo_diferido():
+                    self.agregar_tareas()
+                    raise ValueError
+        self.assertEqual(callbacks, [])
+        self.recalculo.assert_not_called()
+
+    def test_bloques_anidados(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with recalculo_diferido():
+                with recalculo_diferido():
+                    self.agregar_tareas()
+                self.recalculo.assert_not_called()
+        self.recalculo.assert_called_once_with(set(self.ids))
+
+    def test_middleware(self):
+        def vista(request):
+            self.agregar_tareas()
+            return HttpResponse()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RecalculoDiferidoMiddleware(vista)(RequestFactory().post('/'))
+        self.recalculo.assert_called_once_with(set(self.ids))
+
+    def test_middleware_async(self):
+        async def vista(request):
+            for seguimiento_id in self.ids * 3:
+                programar_recalculo(seguimiento_id)
+            return HttpResponse()
+
+        # El recálculo final corre en un hilo de sync_to_async, fuera de la transacción del test:
+        # sin conexión propia, on_commit lo ejecuta en el momento (como en autocommit)
+        with mock.patch('seguimiento.calculos.recalcular_notas') as recalculo, \
+                mock.patch('seguimiento.calculos.transaction.on_commit', side_effect=lambda funcion: funcion()):
+            asyncio.run(RecalculoDiferidoMiddleware(vista)(RequestFactory().post('/')))
+        recalculo.assert_called_once_with(set(self.ids))
+
+
+class RegistroMasivoAsistenciaTests(SeguimientosTestMixin, TestCase):
+    """Registro de asistencia de muchos seguimientos con un upsert"""
+
+    url = '/api/seguimiento/asistencias/registro_masivo/'
+
+    def registrar(self, seguimientos, asistencias, fecha=date(2025, 3, 4)):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                self.url, {'seguimientos': seguimientos, 'fecha': fecha, 'asistencias': asistencias}, format='json'
+            )
+
+    def ids(self):
+        return list(Seguimiento.objects.order_by('id').values_list('id', flat=True))
+
+    def test_creados_y_actualizados(self):
+        self.agregar_seguimientos(3)
+        primero, segundo, tercero = self.ids()
+        Asistencia.objects.create(seguimiento_id=primero, fecha=date(2025, 3, 4), asistencia=True)
+
+        respuesta = self.registrar([primero, segundo, tercero], [False, True, False])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.data['creados'], respuesta.data['actualizados']), (2, 1))
+        self.assertEqual(
+            [(fila['seguimiento_id'], fila['estado']) for fila in respuesta.data['resultados']],
+            [(primero, 'actualizado'), (segundo, 'creado'), (tercero, 'creado')],
+        )
+        self.assertEqual(
+            dict(Asistencia.objects.filter(fecha=date(2025, 3, 4)).values_list('seguimiento_id', 'asistencia')),
+            {primero: False, segundo: True, tercero: False},
+        )
+
+    def test_seguimientos_repetidos(self):
+        self.agregar_seguimientos(2)
+        primero, segundo = self.ids()
+        respuesta = self.registrar([primero, segundo, primero], [True, True, False])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(Asistencia.objects.filter(fecha=date(2025, 3, 4)).exists())
+
+    def test_consultas_constantes(self):
+        def consultas(fecha):
+            ids = self.ids()
+            with CaptureQueriesContext(connection) as capturadas:
+                respuesta = self.registrar(ids, [True] * len(ids), fecha=fecha)
+            self.assertEqual(respuesta.status_code, 200)
+            return len(capturadas)
+
+        self.agregar_seguimientos(2)
+        con_pocos = consultas(date(2025, 3, 4))
+        self.agregar_seguimientos(10)
+        self.assertEqual(consultas(date(2025, 3, 5)), con_pocos)
+
+    def test_recalcula_las_notas(self):
+        self.agregar_seguimientos(2)
+        ids = self.ids()
+        antes = dict(Seguimiento.objects.values_list('id', 'nota_trimestral'))
+        self.registrar(ids, [False, True])
+        for seguimiento in Seguimiento.objects.all():
+            self.assertEqual(seguimiento.nota_trimestral, nota_por_filas(seguimiento))
+        # Media asistencia en lugar de asistencia completa
+        self.assertLess(Seguimiento.objects.get(id=ids[0]).nota_trimestral, antes[ids[0]])
+
+
+class EstadisticasSeguimientoTests(SeguimientosTestMixin, TestCase):
+    """Las estadísticas precalculadas siguen a las tareas, exámenes y asistencias"""
+
+    def estadistica(self, seguimiento):
+        return EstadisticaSeguimiento.objects.filter(seguimiento=seguimiento).first()
+
+    def verificar(self):
+        salida = io.StringIO()
+        call_command('reconstruir_estadisticas', verificar=True, stdout=salida)
+        return salida.getvalue()
+
+    def test_insercion_modificacion_y_borrado(self):
+        self.agregar_seguimientos(1)
+        seguimiento = Seguimiento.objects.get()
+        estadistica = self.estadistica(seguimiento)
+        self.assertEqual((estadistica.total_tareas, estadistica.prom_tareas), (1, 80))
+        self.assertEqual((estadistica.total_asistencias, estadistica.porcentaje_asistencia), (1, 100))
+
+        tarea = Tarea.objects.create(seguimiento=seguimiento, fecha=date(2025, 3, 8), nota_tarea=60)
+        Asistencia.objects.create(seguimiento=seguimiento, fecha=date(2025, 3, 4), asistencia=False)
+        estadistica = self.estadistica(seguimiento)
+        self.assertEqual((estadistica.total_tareas, estadistica.suma_tareas, estadistica.prom_tareas), (2, 140, 70))
+        self.assertEqual(estadistica.porcentaje_asistencia, 50)
+
+        tarea.nota_tarea = 100
+        tarea.save()
+        self.assertEqual(self.estadistica(seguimiento).prom_tareas, 90)
+
+        tarea.delete()
+        Examen.objects.filter(seguimiento=seguimiento).delete()
+        estadistica = self.estadistica(seguimiento)
+        self.assertEqual((estadistica.total_tareas, estadistica.prom_tareas), (1, 80))
+        self.assertEqual((estadistica.total_examenes, estadistica.prom_examenes), (0, 0))
+        self.assertEqual(Seguimiento.objects.get().nota_trimestral, nota_por_filas(seguimiento))
+        self.verificar()
+
+    def test_borrado_en_cascada(self):
+        estudiante = self.agregar_seguimientos(2)
+        self.assertEqual(EstadisticaSeguimiento.objects.count(), 2)
+
+        # Se borran el seguimiento, sus filas y sus estadísticas, sin recalcular nada
+        with mock.patch('seguimiento.calculos.recalcular_notas') as recalculo:
+            estudiante.usuario.delete()
+        recalculo.assert_not_called()
+        self.assertEqual(EstadisticaSeguimiento.objects.count(), 1)
+
+        self.materia_curso.delete()
+        self.assertFalse(EstadisticaSeguimiento.objects.exists())
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_verificar_y_reconstruir(self):
+        self.agregar_seguimientos(2)
+        self.assertIn('Estadísticas correctas para 2 seguimientos', self.verificar())
+
+        # Cambios que no pasan por las señales dejan las estadísticas desactualizadas
+        seguimiento = Seguimiento.objects.order_by('id').first()
+        Tarea.objects.filter(seguimiento=seguimiento).update(nota_tarea=40)
+        EstadisticaSeguimiento.objects.exclude(seguimiento=seguimiento).delete()
+        Asistencia.objects.exclude(seguimiento=seguimiento).update(asistencia=False)
+        with self.assertRaisesMessage(CommandError, 'Se encontraron'):
+            self.verificar()
+
+        call_command('reconstruir_estadisticas', stdout=io.StringIO())
+        self.verificar()
+        self.assertEqual(self.estadistica(seguimiento).prom_tareas, 40)
+        self.assertEqual(Seguimiento.objects.get(id=seguimiento.id).nota_trimestral, nota_por_filas(seguimiento))
+
+
+class PrediccionTestMixin(SeguimientosTestMixin):
+    """
+    Tres estudiantes con exámenes en dos materias y dos trimestres, contra el
+    microservicio de predicción simulado (con endpoint de lote)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.segundo = Trimestre.objects.create(
+            nombre='Segundo Trimestre', fecha_inicio=date(2025, 5, 19), fecha_fin=date(2025, 8, 29)
+        )
+        cls.otra_materia = MateriaCurso.objects.create(curso=cls.curso, materia=Materia.objects.create(nombre='Historia'))
+        cls.estudiantes = [
+            Estudiante.objects.create(
+                usuario=Usuario.objects.create(email=f'alumno{i}@escuela.test', first_name='Alumno', last_name=str(i)),
+                direccion='Calle 1', fecha_nacimiento=date(2010, 1, 1), curso=cls.curso,
+            )
+            for i in range(3)
+        ]
+        # Una nota de examen distinta por par: identifica a qué par corresponde cada predicción
+        cls.notas_t2 = {}
+        for i, estudiante in enumerate(cls.estudiantes):
+            for j, materia_curso in enumerate([cls.materia_curso, cls.otra_materia]):
+                cls.notas_t2[(estudiante.id, materia_curso.id)] = 50 + 10 * i + j
+                for trimestre, nota in ((cls.trimestre, 60), (cls.segundo, 50 + 10 * i + j)):
+                    seguimiento = Seguimiento.objects.create(
+                        materia_curso=materia_curso, trimestre=trimestre, estudiante=estudiante
+                    )
+                    Examen.objects.create(seguimiento=seguimiento, fecha=trimestre.fecha_inicio, nota_examen=nota)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.servidor, self.stub = iniciar_servidor_stub()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        url = f'http://127.0.0.1:{self.servidor.server_port}/'
+        configuracion = override_settings(ML_PREDICCION_URL=url, ML_PREDICCION_LOTE_URL=url)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        cliente = ClientePrediccion()
+        for modulo in ('seguimiento.prediccion', 'seguimiento.views'):
+            parche = mock.patch(f'{modulo}.obtener_cliente', return_value=cliente)
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def predecir_curso(self):
+        respuesta = self.client.post(
+            '/api/seguimiento/seguimientos/predecir-notas-lote/', {'curso_id': self.curso.id}, format='json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data
+
+    def assertPrediccionesDeCadaPar(self, predicciones):
+        self.assertEqual(len(predicciones), len(self.notas_t2))
+        for item in predicciones:
+            nota_t2 = self.notas_t2[(item['estudiante_id'], item['materia_curso_id'])]
+            self.assertTrue(item['success'])
+            self.assertEqual(item['datos_utilizados']['prom_examenes_t2'], nota_t2)
+            self.assertEqual(item['prediccion'], self.prediccion_esperada(nota_t2))
+
+    def prediccion_esperada(self, nota_t2):
+        # El servidor simulado pondera los promedios del segundo trimestre; aquí solo hay exámenes
+        return {'nota_predicha_t3': round(nota_t2 * 0.5, 2)}
+
+
+class PrediccionLoteTests(PrediccionTestMixin, TestCase):
+    """Predicciones de muchos pares (estudiante, materia_curso) con el endpoint de lote"""
+
+    def test_una_llamada_por_lote(self):
+        datos = self.predecir_curso()
+        self.assertEqual(datos['total_exitosas'], 6)
+        self.assertPrediccionesDeCadaPar(datos['predicciones'])
+        self.assertEqual(self.stub.solicitudes, 1)
+
+    def test_bloques(self):
+        with override_settings(ML_PREDICCION_TAMANO_LOTE=4):
+            self.assertPrediccionesDeCadaPar(self.predecir_curso()['predicciones'])
+        self.assertEqual(self.stub.solicitudes, 2)
+
+    def test_sin_endpoint_de_lote(self):
+        # Sin ML_PREDICCION_LOTE_URL: una llamada por par, con el mismo resultado
+        with override_settings(ML_PREDICCION_LOTE_URL=''):
+            self.assertPrediccionesDeCadaPar(self.predecir_curso()['predicciones'])
+        self.assertEqual(self.stub.solicitudes, 6)
+
+    def test_pares_async(self):
+        trimestres = [self.trimestre, self.segundo]
+        datos = construir_datos_prediccion(trimestres, [self.materia_curso.id, self.otra_materia.id])
+        resultados = asyncio.run(prediccion.apredecir_pares(datos))
+        self.assertEqual(self.stub.solicitudes, 1)
+        for par, resultado in resultados.items():
+            self.assertEqual(datos[par]['prom_examenes_t2'], self.notas_t2[par])
+            self.assertEqual(resultado['prediccion'], self.prediccion_esperada(self.notas_t2[par]))
+
+
+class PrediccionCacheTests(PrediccionTestMixin, TestCase):
+    """Predicciones guardadas por par, válidas mientras la huella de los datos no cambie"""
+
+    def test_misma_huella_usa_la_cache(self):
+        primera = self.predecir_curso()
+        with mock.patch('seguimiento.prediccion.predecir_lote', wraps=prediccion.predecir_lote) as lote:
+            segunda = self.predecir_curso()
+        lote.assert_called_once_with([])
+        self.assertEqual(self.stub.solicitudes, 1)
+        self.assertEqual(segunda['predicciones'], primera['predicciones'])
+
+    def test_cambio_de_nota_invalida_solo_ese_par(self):
+        self.predecir_curso()
+        estudiante = self.estudiantes[1]
+        seguimiento = Seguimiento.objects.get(estudiante=estudiante, materia_curso=self.materia_curso, trimestre=self.segundo)
+        # La señal recalcula la nota y recalcular_notas descarta la predicción del par
+        Examen.objects.create(seguimiento=seguimiento, fecha=date(2025, 6, 2), nota_examen=100)
+        self.assertIsNone(cache.get(prediccion._clave_prediccion(estudiante.id, self.materia_curso.id)))
+        self.assertIsNotNone(cache.get(prediccion._clave_prediccion(estudiante.id, self.otra_materia.id)))
+
+        with mock.patch('seguimiento.prediccion.predecir_lote', wraps=prediccion.predecir_lote) as lote:
+            datos = self.predecir_curso()
+        [(entradas,), _] = lote.call_args
+        self.assertEqual(len(entradas), 1)
+        self.assertEqual(self.stub.solicitudes, 2)
+        item = next(
+            item for item in datos['predicciones']
+            if (item['estudiante_id'], item['materia_curso_id']) == (estudiante.id, self.materia_curso.id)
+        )
+        nota_t2 = (self.notas_t2[(estudiante.id, self.materia_curso.id)] + 100) / 2
+        self.assertEqual(item['prediccion'], self.prediccion_esperada(nota_t2))
+
+    def test_huella_distinta_no_usa_la_cache(self):
+        par = (self.estudiantes[0].id, self.materia_curso.id)
+        datos_ml = {'prom_examenes_t2': 70}
+        prediccion.guardar_predicciones_en_cache({par: {'nota_predicha_t3': 35}}, {par: datos_ml})
+        self.assertEqual(prediccion.leer_predicciones_en_cache({par: datos_ml}), {par: {'nota_predicha_t3': 35}})
+        # Datos distintos sin pasar por la invalidación: la predicción guardada no sirve
+        self.assertEqual(prediccion.leer_predicciones_en_cache({par: {'prom_examenes_t2': 71}}), {})
+
+    def test_prediccion_individual(self):
+        estudiante = self.estudiantes[2]
+        url = f'/api/seguimiento/seguimientos/predecir-nota/{estudiante.id}/{self.otra_materia.id}/'
+        for _ in range(2):
+            respuesta = self.client.post(url)
+            self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.stub.solicitudes, 1)
+        self.assertEqual(
+            respuesta.data['prediccion'], self.prediccion_esperada(self.notas_t2[(estudiante.id, self.otra_materia.id)])
+        )
+
+
+class PaginacionCursorTests(SeguimientosTestMixin, TestCase):
+    """Las páginas por cursor no repiten ni saltean filas aunque se inserten otras entre páginas"""
+
+    def recorrer(self, url):
+        ids = []
+        siguiente = f'{url}?page_size=3'
+        while siguiente:
+            respuesta = self.client.get(siguiente)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertLessEqual(len(respuesta.data['results']), 3)
+            ids.extend(fila['id'] for fila in respuesta.data['results'])
+            # El mismo cursor devuelve la misma página
+            self.assertEqual(self.client.get(siguiente).data['results'], respuesta.data['results'])
+            # Filas nuevas entre una página y la siguiente
+            self.agregar_seguimientos(1)
+            siguiente = respuesta.data['next']
+        return ids
+
+    def assertRecorridoCompleto(self, url):
+        self.agregar_seguimientos(7)
+        existentes = list(Seguimiento.objects.order_by('-id').values_list('id', flat=True))
+        ids = self.recorrer(url)
+        # Las insertadas durante el recorrido quedan antes de la primera página; se ven al volver a empezar
+        self.assertEqual(ids, existentes)
+        self.assertEqual(self.client.get(url).data['results'][0]['id'], Seguimiento.objects.latest('id').id)
+
+    def test_listado(self):
+        self.assertRecorridoCompleto('/api/seguimiento/seguimientos/')
+
+    def test_detallado(self):
+        self.assertRecorridoCompleto('/api/seguimiento/seguimientos/detallado/')
+
+
+@override_settings(
+    ML_PREDICCION_TIMEOUT=0.2,
+    ML_PREDICCION_FALLOS_APERTURA=2,
+    ML_PREDICCION_ESPERA_CIRCUITO=60,
+    ML_PREDICCION_PROPORCION_REINTENTOS=0,
+    ML_PREDICCION_LOTE_URL='',
+)
+class ClientePrediccionTests(SimpleTestCase):
+    """Cliente del microservicio de predicción contra el servidor simulado local"""
+
+    def setUp(self):
+        self.servidor, self.stub = iniciar_servidor_stub()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        self.url = f'http://127.0.0.1:{self.servidor.server_port}/'
+        configuracion = override_settings(ML_PREDICCION_URL=self.url)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.cliente = ClientePrediccion()
+        # Sin reintentos: cada llamada es una sola solicitud al servidor
+        self.cliente.presupuesto._fichas = 0
+
+    def test_prediccion(self):
+        respuesta = self.cliente.predecir({'prom_examenes_t2': 80})
+        self.assertEqual(respuesta, {'nota_predicha_t3': 40.0})
+        self.assertEqual(self.cliente.metricas.resumen()['exitos'], 1)
+
+    def test_timeout(self):
+        self.stub.latencia = 0.5
+        with self.assertRaises(TimeoutPrediccionError):
+            self.cliente.predecir({})
+        self.assertEqual(self.cliente.metricas.resumen()['errores'], {'timeout': 1})
+
+    def test_circuito_abierto(self):
+        self.stub.tasa_error = 1.0
+        for _ in range(2):
+            with self.assertRaises(RespuestaPrediccionError):
+                self.cliente.predecir({})
+        self.assertEqual(self.cliente.circuito.estado, Circuito.ABIERTO)
+
+        # Con el circuito abierto no se llama al servidor
+        with self.assertRaises(ServicioNoDisponibleError):
+            self.cliente.predecir({})
+        self.assertEqual(self.stub.solicitudes, 2)
+        self.assertEqual(self.cliente.metricas.resumen()['errores'], {'http_503': 2, 'circuito_abierto': 1})
+
+    def abrir_circuito(self):
+        self.stub.tasa_error = 1.0
+        for _ in range(2):
+            with self.assertRaises(RespuestaPrediccionError):
+                self.cliente.predecir({})
+        self.stub.tasa_error = 0.0
+        # Pasada la espera queda semiabierto
+        self.cliente.circuito._abierto_desde -= 60
+        self.assertEqual(self.cliente.circuito.estado, Circuito.SEMIABIERTO)
+
+    def test_prueba_cancelada_libera_el_circuito(self):
+        self.abrir_circuito()
+        self.stub.latencia = 0.1
+
+        async def cancelar_prueba():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(self.cliente.apredecir({}), timeout=0.02)
+
+        asyncio.run(cancelar_prueba())
+        # La prueba cancelada no cuenta como falla ni deja el circuito tomado
+        self.assertEqual(self.cliente.circuito.estado, Circuito.SEMIABIERTO)
+        self.stub.latencia = 0
+        self.assertEqual(self.cliente.predecir({'prom_examenes_t2': 80}), {'nota_predicha_t3': 40.0})
+        self.assertEqual(self.cliente.circuito.estado, Circuito.CERRADO)
+
+    def test_prueba_con_error_inesperado_libera_el_circuito(self):
+        self.abrir_circuito()
+        with mock.patch.object(self.cliente, '_intentar', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.cliente.predecir({})
+        self.assertTrue(self.cliente.circuito.permitir())
+
+    def test_respuesta_invalida(self):
+        self.stub.respuesta_invalida = True
+        with self.assertRaises(RespuestaPrediccionError):
+            self.cliente.predecir({})
+        with self.assertRaises(RespuestaPrediccionError):
+            asyncio.run(self.cliente.apredecir({}))
+        # Cuenta como falla del servicio: con dos seguidas se abre el circuito
+        self.assertEqual(self.cliente.metricas.resumen()['errores'], {'respuesta_invalida': 2})
+        self.assertEqual(self.cliente.circuito.estado, Circuito.ABIERTO)
+
+    def test_lote_con_respuesta_invalida(self):
+        # Una respuesta inválida no interrumpe el lote: esas entradas quedan con error
+        self.stub.respuesta_invalida = True
+        with mock.patch('seguimiento.prediccion.obtener_cliente', return_value=self.cliente):
+            resultados = prediccion.predecir_lote([{}, {}])
+            resultados_async = asyncio.run(prediccion.apredecir_lote([{}]))
+        self.assertEqual([resultado['success'] for resultado in resultados + resultados_async], [False] * 3)
+
+    def test_lote_con_formato_inesperado(self):
+        # El endpoint de lote debe devolver una lista
+        with override_settings(ML_PREDICCION_LOTE_URL=self.url):
+            with self.assertRaises(RespuestaPrediccionError):
+                self.cliente.predecir_lote({'prom_examenes_t2': 80})
@@ -3,8 +3,9 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     SeguimientoViewSet, AsistenciaViewSet, ParticipacionViewSet,
     TareaViewSet, ExamenViewSet, TipoExamenViewSet, VerificarMatriculaExamenView,
-    ResumenEstudianteView
+    ResumenEstudianteView, ResumenCursoView, MetricasPrediccionView
 )
+from . import viewsAsync
 
 router = DefaultRouter()
 router.register(r'seguimientos', SeguimientoViewSet)
@@ -17,5 +18,10 @@ router.register(r'tipoexamen', TipoExamenViewSet)
 urlpatterns = [
     path('verificar-matricula/<int:estudiante_id>/', VerificarMatriculaExamenView.as_view(), name='verificar-matricula'),
     path('resumen-estudiante/<int:estudiante_id>/', ResumenEstudianteView.as_view(), name='resumen-estudiante'),
+    path('resumen-curso/<int:curso_id>/', ResumenCursoView.as_view(), name='resumen-curso'),
+    # Versión async (ASGI) de los endpoints de predicción
+    path('async/seguimientos/predecir-nota/<int:estudiante_id>/<int:materia_curso_id>/', viewsAsync.predecir_nota, name='predecir-nota-async'),
+    path('async/seguimientos/predecir-notas-lote/', viewsAsync.predecir_notas_lote, name='predecir-notas-lote-async'),
+    path('prediccion/metricas/', MetricasPrediccionView.as_view(), name='metricas-prediccion'),
     path('', include(router.urls)),
 ] 
\ No newline at end of file
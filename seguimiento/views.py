@@ -1,4 +1,6 @@
 from django.shortcuts import render
+from django.db import transaction
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -8,17 +10,47 @@ from drf_yasg import openapi
 from .models import Seguimiento, Asistencia, Participacion, Tarea, Examen, TipoExamen
 from .serializers import (
     SeguimientoSerializer, SeguimientoDetalladoSerializer, AsistenciaSerializer, 
-    ParticipacionSerializer, TareaSerializer, ExamenSerializer, TipoExamenSerializer
+    ParticipacionSerializer, TareaSerializer, ExamenSerializer, TipoExamenSerializer,
+    RegistroMasivoAsistenciaSerializer, PrediccionLoteSerializer
 )
-from matricula.models import Matricula
+from .prediccion import (
+    DatosPrediccionError, construir_datos_prediccion, obtener_trimestres_prediccion,
+    guardar_predicciones_en_cache, leer_predicciones_en_cache, predecir_pares
+)
+from .cliente_prediccion import ErrorPrediccion, obtener_cliente
+from .resumenes import armar_resumenes, seguimientos_para_resumen
+from .calculos import recalculo_diferido
+from backend.paginacion import PaginacionCursor
+from matricula.elegibilidad import evaluar_elegibilidad
 from datetime import date
-import requests
 
 # Create your views here.
 
 class SeguimientoViewSet(viewsets.ModelViewSet):
     queryset = Seguimiento.objects.all()
     serializer_class = SeguimientoSerializer
+    pagination_class = PaginacionCursor
+
+    def get_queryset(self):
+        """
+        Seguimientos con los totales precalculados anotados y, para las vistas
+        detalladas, las relaciones que usa el serializer en la misma consulta
+        """
+        queryset = Seguimiento.objects.annotate(
+            total_asistencias=Coalesce('estadisticas__total_asistencias', 0),
+            total_tareas=Coalesce('estadisticas__total_tareas', 0),
+            total_participaciones=Coalesce('estadisticas__total_participaciones', 0),
+            total_examenes=Coalesce('estadisticas__total_examenes', 0),
+        ).order_by('id')
+        if self.action in ('detallado', 'por_estudiante'):
+            queryset = queryset.select_related(
+                'estudiante__usuario',
+                'materia_curso__materia',
+                'materia_curso__curso',
+                'materia_curso__docente__usuario',
+                'trimestre',
+            )
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'detallado':
@@ -46,7 +78,11 @@ class SeguimientoViewSet(viewsets.ModelViewSet):
             seguimientos = seguimientos.filter(materia_curso__curso_id=curso_id)
         if estudiante_id:
             seguimientos = seguimientos.filter(estudiante_id=estudiante_id)
-            
+
+        page = self.paginate_queryset(seguimientos)
+        if page is not None:
+            serializer = SeguimientoDetalladoSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = SeguimientoDetalladoSerializer(seguimientos, many=True)
         return Response(serializer.data)
     
@@ -73,7 +109,7 @@ class SeguimientoViewSet(viewsets.ModelViewSet):
         if not estudiante_id:
             return Response({'error': 'Se requiere estudiante_id'}, status=400)
         
-        seguimientos = Seguimiento.objects.filter(estudiante_id=estudiante_id)
+        seguimientos = self.get_queryset().filter(estudiante_id=estudiante_id)
         serializer = SeguimientoDetalladoSerializer(seguimientos, many=True)
         return Response(serializer.data)
     
@@ -144,46 +180,38 @@ class SeguimientoViewSet(viewsets.ModelViewSet):
                     'error': datos_prediccion['error']
                 }, status=status.HTTP_400_BAD_REQUEST)
             
+            # Reutilizar la predicción guardada si los datos no cambiaron
+            par = (int(estudiante_id), int(materia_curso_id))
+            datos_por_par = {par: datos_prediccion['datos_ml']}
+            en_cache = leer_predicciones_en_cache(datos_por_par)
+            if par in en_cache:
+                return Response({
+                    'success': True,
+                    'estudiante_id': int(estudiante_id),
+                    'materia_curso_id': int(materia_curso_id),
+                    'prediccion': en_cache[par],
+                    'datos_utilizados': datos_prediccion['datos_ml'],
+                    'trimestres_utilizados': datos_prediccion['trimestres_nombres']
+                }, status=status.HTTP_200_OK)
+            
             # Llamar al microservicio de predicción
             try:
-                ml_response = requests.post(
-                    'http://localhost:8000/api/v1/predecir/',
-                    json=datos_prediccion['datos_ml'],
-                    timeout=10
-                )
-                
-                if ml_response.status_code == 200:
-                    prediccion = ml_response.json()
-                    
-                    return Response({
-                        'success': True,
-                        'estudiante_id': int(estudiante_id),
-                        'materia_curso_id': int(materia_curso_id),
-                        'prediccion': prediccion,
-                        'datos_utilizados': datos_prediccion['datos_ml'],
-                        'trimestres_utilizados': datos_prediccion['trimestres_nombres']
-                    }, status=status.HTTP_200_OK)
-                else:
-                    return Response({
-                        'success': False,
-                        'error': f'Error del microservicio ML: {ml_response.text}'
-                    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-                    
-            except requests.exceptions.ConnectionError:
-                return Response({
-                    'success': False,
-                    'error': 'No se puede conectar al microservicio de predicción. Verifique que esté ejecutándose en http://localhost:8000'
-                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-            except requests.exceptions.Timeout:
+                prediccion = obtener_cliente().predecir(datos_prediccion['datos_ml'])
+            except ErrorPrediccion as e:
                 return Response({
                     'success': False,
-                    'error': 'Timeout al conectar con el microservicio de predicción'
-                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-            except Exception as e:
-                return Response({
-                    'success': False,
-                    'error': f'Error inesperado al llamar al microservicio: {str(e)}'
+                    'error': str(e)
                 }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            
+            guardar_predicciones_en_cache({par: prediccion}, datos_por_par)
+            return Response({
+                'success': True,
+                'estudiante_id': int(estudiante_id),
+                'materia_curso_id': int(materia_curso_id),
+                'prediccion': prediccion,
+                'datos_utilizados': datos_prediccion['datos_ml'],
+                'trimestres_utilizados': datos_prediccion['trimestres_nombres']
+            }, status=status.HTTP_200_OK)
         
         except Exception as e:
             return Response({
@@ -198,139 +226,143 @@ class SeguimientoViewSet(viewsets.ModelViewSet):
         try:
             from usuarios.models import Estudiante
             from materias.models import MateriaCurso
-            from cursos.models import Trimestre
             
             # Validar que existen el estudiante y materia_curso
-            try:
-                estudiante = Estudiante.objects.get(id=estudiante_id)
-                materia_curso = MateriaCurso.objects.get(id=materia_curso_id)
-            except Estudiante.DoesNotExist:
+            if not Estudiante.objects.filter(id=estudiante_id).exists():
                 return {'error': f'No se encontró el estudiante con ID {estudiante_id}'}
-            except MateriaCurso.DoesNotExist:
+            if not MateriaCurso.objects.filter(id=materia_curso_id).exists():
                 return {'error': f'No se encontró la materia-curso con ID {materia_curso_id}'}
             
-            # Obtener trimestres ordenados por fecha de inicio
-            trimestres = Trimestre.objects.all().order_by('fecha_inicio')
-            
-            if trimestres.count() < 2:
-                return {'error': 'Se necesitan al menos 2 trimestres registrados para hacer predicciones'}
-            
-            trimestre_1 = trimestres[0]  # Primer trimestre
-            trimestre_2 = trimestres[1]  # Segundo trimestre
-            
-            # Obtener seguimientos para ambos trimestres
-            try:
-                seguimiento_t1 = Seguimiento.objects.get(
-                    estudiante=estudiante,
-                    materia_curso=materia_curso,
-                    trimestre=trimestre_1
-                )
-            except Seguimiento.DoesNotExist:
-                return {'error': f'No se encontró seguimiento del estudiante en {trimestre_1.nombre}'}
-            
-            try:
-                seguimiento_t2 = Seguimiento.objects.get(
-                    estudiante=estudiante,
-                    materia_curso=materia_curso,
-                    trimestre=trimestre_2
-                )
-            except Seguimiento.DoesNotExist:
-                return {'error': f'No se encontró seguimiento del estudiante en {trimestre_2.nombre}'}
+            # Primer y segundo trimestre (por fecha de inicio)
+            trimestres = obtener_trimestres_prediccion()
             
-            # Calcular promedios para trimestre 1
-            datos_t1 = self._calcular_promedios_seguimiento(seguimiento_t1)
-            
-            # Calcular promedios para trimestre 2
-            datos_t2 = self._calcular_promedios_seguimiento(seguimiento_t2)
-            
-            # Formatear datos para el modelo ML
-            datos_ml = {
-                'prom_tareas_t1': datos_t1['prom_tareas'],
-                'prom_examenes_t1': datos_t1['prom_examenes'],
-                'prom_part_t1': datos_t1['prom_participaciones'],
-                'asistencia_t1': datos_t1['porcentaje_asistencia'],
-                'prom_tareas_t2': datos_t2['prom_tareas'],
-                'prom_examenes_t2': datos_t2['prom_examenes'],
-                'prom_part_t2': datos_t2['prom_participaciones'],
-                'asistencia_t2': datos_t2['porcentaje_asistencia']
-            }
+            datos = construir_datos_prediccion(
+                trimestres, [materia_curso_id], estudiante_ids=[estudiante_id]
+            ).get(
+                (int(estudiante_id), int(materia_curso_id)),
+                f'No se encontró seguimiento del estudiante en {trimestres[0].nombre}'
+            )
+            if isinstance(datos, str):
+                return {'error': datos}
             
             return {
-                'datos_ml': datos_ml,
-                'trimestres_nombres': [trimestre_1.nombre, trimestre_2.nombre]
+                'datos_ml': datos,
+                'trimestres_nombres': [trimestre.nombre for trimestre in trimestres]
             }
             
+        except DatosPrediccionError as e:
+            return {'error': str(e)}
         except Exception as e:
             return {'error': f'Error al procesar datos: {str(e)}'}
-    
-    def _calcular_promedios_seguimiento(self, seguimiento):
+
+    @swagger_auto_schema(
+        request_body=PrediccionLoteSerializer,
+        responses={
+            200: openapi.Response(description="Predicciones de todos los estudiantes"),
+            400: openapi.Response(description="Error en los datos de entrada"),
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='predecir-notas-lote')
+    def predecir_notas_lote(self, request):
         """
-        Calcular promedios específicos de un seguimiento (similar al método del modelo pero retornando datos separados)
+        Predecir la nota del tercer trimestre de todos los estudiantes de una
+        materia-curso (materia_curso_id) o de todas las materias de un curso (curso_id)
+        
+        Los datos de entrada se construyen con consultas agrupadas y se envían al
+        microservicio en lotes, reutilizando las conexiones.
         """
-        # Promedio de tareas
-        tareas = seguimiento.tareas.all()
-        prom_tareas = sum(t.nota_tarea for t in tareas) / len(tareas) if tareas else 0
-
-        # Promedio de participaciones
-        participaciones = seguimiento.participaciones.all()
-        prom_participaciones = sum(p.nota_participacion for p in participaciones) / len(participaciones) if participaciones else 0
-
-        # Promedio de exámenes
-        examenes = seguimiento.examenes.all()
-        prom_examenes = sum(e.nota_examen for e in examenes) / len(examenes) if examenes else 0
-
-        # Porcentaje de asistencia
-        asistencias = seguimiento.asistencias.all()
-        porcentaje_asistencia = (
-            sum(1 for a in asistencias if a.asistencia) / len(asistencias) * 100
-            if asistencias else 0
+        from usuarios.models import Estudiante
+        from materias.models import MateriaCurso
+        
+        serializer = PrediccionLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        materia_curso_id = serializer.validated_data.get('materia_curso_id')
+        curso_id = serializer.validated_data.get('curso_id')
+        
+        materias_curso = MateriaCurso.objects.select_related('materia')
+        if materia_curso_id:
+            materias_curso = materias_curso.filter(id=materia_curso_id)
+        else:
+            materias_curso = materias_curso.filter(curso_id=curso_id, activo=True)
+        materias_curso = list(materias_curso)
+        if not materias_curso:
+            return Response({
+                'success': False,
+                'error': 'No se encontraron materias para predecir'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            trimestres = obtener_trimestres_prediccion()
+        except DatosPrediccionError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        curso_id = curso_id or materias_curso[0].curso_id
+        estudiantes = list(
+            Estudiante.objects.filter(curso_id=curso_id, usuario__activo=True)
+            .select_related('usuario').order_by('usuario__last_name', 'usuario__first_name')
+        )
+        datos = construir_datos_prediccion(
+            trimestres, [mc.id for mc in materias_curso], estudiante_ids=[e.id for e in estudiantes]
         )
         
-        return {
-            'prom_tareas': round(prom_tareas, 2),
-            'prom_participaciones': round(prom_participaciones, 2),
-            'prom_examenes': round(prom_examenes, 2),
-            'porcentaje_asistencia': round(porcentaje_asistencia, 2)
-        }
+        predicciones = []
+        pendientes = []
+        for materia_curso in materias_curso:
+            for estudiante in estudiantes:
+                datos_ml = datos.get(
+                    (estudiante.id, materia_curso.id),
+                    f'No se encontró seguimiento del estudiante en {trimestres[0].nombre}'
+                )
+                item = {
+                    'estudiante_id': estudiante.id,
+                    'estudiante_nombre': f"{estudiante.usuario.first_name} {estudiante.usuario.last_name}",
+                    'materia_curso_id': materia_curso.id,
+                    'materia': materia_curso.materia.nombre,
+                }
+                if isinstance(datos_ml, str):
+                    item.update({'success': False, 'error': datos_ml})
+                else:
+                    item['datos_utilizados'] = datos_ml
+                    pendientes.append(item)
+                predicciones.append(item)
+        
+        resultados = predecir_pares({
+            (item['estudiante_id'], item['materia_curso_id']): item['datos_utilizados']
+            for item in pendientes
+        })
+        for item in pendientes:
+            item.update(resultados[(item['estudiante_id'], item['materia_curso_id'])])
+        
+        return Response({
+            'success': True,
+            'trimestres_utilizados': [trimestre.nombre for trimestre in trimestres],
+            'total': len(predicciones),
+            'total_exitosas': sum(1 for item in predicciones if item['success']),
+            'predicciones': predicciones
+        }, status=status.HTTP_200_OK)
 
 
 class AsistenciaViewSet(viewsets.ModelViewSet):
     queryset = Asistencia.objects.all()
     serializer_class = AsistenciaSerializer
+    pagination_class = PaginacionCursor
     
+    @swagger_auto_schema(request_body=RegistroMasivoAsistenciaSerializer)
     @action(detail=False, methods=['post'])
     def registro_masivo(self, request):
         """Registrar asistencia para múltiples estudiantes"""
-        data = request.data
-        seguimientos_ids = data.get('seguimientos', [])
-        fecha = data.get('fecha')
-        asistencias = data.get('asistencias', [])  # Lista de booleans
-        
-        if len(seguimientos_ids) != len(asistencias):
-            return Response(
-                {'error': 'La cantidad de seguimientos debe coincidir con las asistencias'}, 
-                status=400
-            )
-        
-        resultados = []
-        for seguimiento_id, presente in zip(seguimientos_ids, asistencias):
-            asistencia, created = Asistencia.objects.get_or_create(
-                seguimiento_id=seguimiento_id,
-                fecha=fecha,
-                defaults={'asistencia': presente}
-            )
-            if not created:
-                asistencia.asistencia = presente
-                asistencia.save()
-            
-            resultados.append({
-                'seguimiento_id': seguimiento_id,
-                'presente': presente,
-                'creado': created
-            })
-        
+        serializer = RegistroMasivoAsistenciaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Todo el lote se inserta/actualiza en una transacción y las notas se recalculan al confirmar
+        with transaction.atomic():
+            resultados = serializer.save()
+
+        creados = sum(1 for resultado in resultados if resultado['creado'])
         return Response({
             'message': f'Asistencia registrada para {len(resultados)} estudiantes',
+            'creados': creados,
+            'actualizados': len(resultados) - creados,
             'resultados': resultados
         })
 
@@ -338,11 +370,13 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
 class ParticipacionViewSet(viewsets.ModelViewSet):
     queryset = Participacion.objects.all()
     serializer_class = ParticipacionSerializer
+    pagination_class = PaginacionCursor
 
 
 class TareaViewSet(viewsets.ModelViewSet):
     queryset = Tarea.objects.all()
     serializer_class = TareaSerializer
+    pagination_class = PaginacionCursor
     
     @swagger_auto_schema(
         manual_parameters=[
@@ -364,6 +398,19 @@ class TareaViewSet(viewsets.ModelViewSet):
 class ExamenViewSet(viewsets.ModelViewSet):
     queryset = Examen.objects.all()
     serializer_class = ExamenSerializer
+    pagination_class = PaginacionCursor
+
+    @swagger_auto_schema(request_body=ExamenSerializer(many=True))
+    @action(detail=False, methods=['post'])
+    def crear_lote(self, request):
+        """Crear varios exámenes; la matrícula de todos se verifica de una vez"""
+        serializer = ExamenSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        # Todos o ninguno, y cada nota se recalcula una sola vez al confirmar
+        with transaction.atomic(), recalculo_diferido():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=False, methods=['get'])
     def proximos(self, request):
@@ -388,32 +435,35 @@ class TipoExamenViewSet(viewsets.ModelViewSet):
 class VerificarMatriculaExamenView(APIView):
     """
     Endpoint para verificar si un estudiante puede rendir exámenes
+    (hoy, o en la fecha indicada con ?fecha=AAAA-MM-DD)
     """
     def get(self, request, estudiante_id):
         try:
             from usuarios.models import Estudiante
-            estudiante = Estudiante.objects.get(id=estudiante_id)
-            fecha_hoy = date.today()
-            
-            puede_rendir, resultado = Matricula.estudiante_puede_rendir_examen(estudiante, fecha_hoy)
-            
+            estudiante = Estudiante.objects.select_related('usuario').get(id=estudiante_id)
+            fecha_consulta = date.fromisoformat(request.query_params['fecha']) if 'fecha' in request.query_params else date.today()
+
+            # Vigencia precalculada del estudiante: una consulta por clave
+            elegibilidad = evaluar_elegibilidad([estudiante.id], fecha_consulta)[estudiante.id]
+
             response_data = {
-                'puede_rendir': puede_rendir,
-                'mensaje': resultado if isinstance(resultado, str) else 'Matrícula vigente',
+                'puede_rendir': elegibilidad.puede_rendir,
+                'mensaje': elegibilidad.mensaje,
                 'estudiante': str(estudiante),
-                'fecha_consulta': fecha_hoy
+                'fecha_consulta': fecha_consulta
             }
-            
-            if isinstance(resultado, Matricula):
+
+            if elegibilidad.puede_rendir:
+                matricula = elegibilidad.matricula
                 response_data['matricula'] = {
-                    'id': resultado.id,
-                    'tipo_pago': resultado.tipo_pago.get_tipo_display() if resultado.tipo_pago else 'Sin tipo',
-                    'fecha_pago': resultado.fecha,
-                    'monto': resultado.monto
+                    'id': matricula.id,
+                    'tipo_pago': matricula.tipo_pago.get_tipo_display() if matricula.tipo_pago else 'Sin tipo',
+                    'fecha_pago': matricula.fecha,
+                    'monto': matricula.monto
                 }
-            
+
             return Response(response_data, status=status.HTTP_200_OK)
-            
+
         except Exception as e:
             return Response(
                 {'error': f'Error al verificar matrícula: {str(e)}'}, 
@@ -427,49 +477,69 @@ class ResumenEstudianteView(APIView):
     def get(self, request, estudiante_id):
         try:
             from usuarios.models import Estudiante
-            estudiante = Estudiante.objects.get(id=estudiante_id)
+            estudiante = Estudiante.objects.select_related('usuario').get(id=estudiante_id)
             
-            # Obtener todos los seguimientos del estudiante
-            seguimientos = Seguimiento.objects.filter(estudiante=estudiante)
+            # Todos los seguimientos, totales y promedios en una sola consulta
+            seguimientos = seguimientos_para_resumen(estudiante_id=estudiante.id)
+            resumen, = armar_resumenes([estudiante], seguimientos)
             
-            resumen = {
-                'estudiante': {
-                    'id': estudiante.id,
-                    'nombre': f"{estudiante.usuario.first_name} {estudiante.usuario.last_name}",
-                    'email': estudiante.usuario.email
-                },
-                'total_materias': seguimientos.count(),
-                'promedio_general': 0,
-                'materias': []
-            }
-            
-            total_notas = 0
-            count_notas = 0
+            return Response(resumen)
             
-            for seguimiento in seguimientos:
-                materia_info = {
-                    'materia': seguimiento.materia_curso.materia.nombre,
-                    'curso': seguimiento.materia_curso.curso.nombre,
-                    'trimestre': seguimiento.trimestre.nombre,
-                    'nota_trimestral': seguimiento.nota_trimestral,
-                    'total_asistencias': seguimiento.asistencias.count(),
-                    'total_tareas': seguimiento.tareas.count(),
-                    'total_participaciones': seguimiento.participaciones.count(),
-                    'total_examenes': seguimiento.examenes.count()
-                }
-                resumen['materias'].append(materia_info)
-                
-                if seguimiento.nota_trimestral > 0:
-                    total_notas += seguimiento.nota_trimestral
-                    count_notas += 1
+        except Estudiante.DoesNotExist:
+            return Response(
+                {'error': f'No se encontró el estudiante con ID {estudiante_id}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Error al obtener resumen: {str(e)}'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+class ResumenCursoView(APIView):
+    """Resúmenes de todos los estudiantes de un curso (para generar boletines)"""
+    
+    def get(self, request, curso_id):
+        try:
+            from usuarios.models import Estudiante
+            from cursos.models import Curso
+            curso = Curso.objects.get(id=curso_id)
             
-            if count_notas > 0:
-                resumen['promedio_general'] = round(total_notas / count_notas, 2)
+            estudiantes = list(
+                Estudiante.objects.filter(curso=curso, usuario__activo=True)
+                .select_related('usuario').order_by('usuario__last_name', 'usuario__first_name')
+            )
+            seguimientos = seguimientos_para_resumen(estudiante__curso=curso, estudiante__usuario__activo=True)
             
-            return Response(resumen)
+            return Response({
+                'curso': {'id': curso.id, 'nombre': curso.nombre, 'turno': curso.turno},
+                'total_estudiantes': len(estudiantes),
+                'estudiantes': armar_resumenes(estudiantes, seguimientos)
+            })
             
+        except Curso.DoesNotExist:
+            return Response(
+                {'error': f'No se encontró el curso con ID {curso_id}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             return Response(
-                {'error': f'Error al obtener resumen: {str(e)}'}, 
+                {'error': f'Error al obtener resumen del curso: {str(e)}'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class MetricasPrediccionView(APIView):
+    """Métricas del cliente del microservicio de predicción (latencia, errores, circuito)"""
+
+    @swagger_auto_schema(
+        operation_description="Métricas de las llamadas al microservicio de predicción en este proceso",
+        responses={200: openapi.Response(description="Contadores, histograma de latencia y estado del circuito")}
+    )
+    def get(self, request):
+        cliente = obtener_cliente()
+        return Response({
+            **cliente.metricas.resumen(),
+            'circuito': cliente.circuito.estado,
+        })
@@ -0,0 +1,150 @@
+"""
+Vistas async (ASGI) de predicción.
+
+Hacen lo mismo que las acciones predecir_nota y predecir_notas_lote de
+SeguimientoViewSet, pero mientras esperan al microservicio no ocupan un hilo:
+un worker ASGI puede tener cientos de predicciones en curso a la vez.
+"""
+from django.http import JsonResponse
+from backend.vistas_async import api_async
+from .serializers import PrediccionLoteSerializer
+from .prediccion import (
+    DatosPrediccionError, aconstruir_datos_prediccion, aguardar_predicciones_en_cache,
+    aleer_predicciones_en_cache, aobtener_trimestres_prediccion, apredecir_pares
+)
+from .cliente_prediccion import ErrorPrediccion, obtener_cliente
+
+
+async def _obtener_datos_para_prediccion(estudiante_id, materia_curso_id):
+    from usuarios.models import Estudiante
+    from materias.models import MateriaCurso
+
+    if not await Estudiante.objects.filter(id=estudiante_id).aexists():
+        return {'error': f'No se encontró el estudiante con ID {estudiante_id}'}
+    if not await MateriaCurso.objects.filter(id=materia_curso_id).aexists():
+        return {'error': f'No se encontró la materia-curso con ID {materia_curso_id}'}
+
+    try:
+        trimestres = await aobtener_trimestres_prediccion()
+    except DatosPrediccionError as e:
+        return {'error': str(e)}
+
+    datos = (
+        await aconstruir_datos_prediccion(trimestres, [materia_curso_id], estudiante_ids=[estudiante_id])
+    ).get(
+        (estudiante_id, materia_curso_id),
+        f'No se encontró seguimiento del estudiante en {trimestres[0].nombre}'
+    )
+    if isinstance(datos, str):
+        return {'error': datos}
+
+    return {
+        'datos_ml': datos,
+        'trimestres_nombres': [trimestre.nombre for trimestre in trimestres]
+    }
+
+
+@api_async(metodos=('POST',))
+async def predecir_nota(request, estudiante_id, materia_curso_id):
+    """Predecir la nota del tercer trimestre de un estudiante en una materia-curso"""
+    datos_prediccion = await _obtener_datos_para_prediccion(estudiante_id, materia_curso_id)
+    if 'error' in datos_prediccion:
+        return JsonResponse({'success': False, 'error': datos_prediccion['error']}, status=400)
+
+    par = (estudiante_id, materia_curso_id)
+    datos_por_par = {par: datos_prediccion['datos_ml']}
+    prediccion = (await aleer_predicciones_en_cache(datos_por_par)).get(par)
+    if prediccion is None:
+        try:
+            prediccion = await obtener_cliente().apredecir(datos_prediccion['datos_ml'])
+        except ErrorPrediccion as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=503)
+        await aguardar_predicciones_en_cache({par: prediccion}, datos_por_par)
+
+    return JsonResponse({
+        'success': True,
+        'estudiante_id': estudiante_id,
+        'materia_curso_id': materia_curso_id,
+        'prediccion': prediccion,
+        'datos_utilizados': datos_prediccion['datos_ml'],
+        'trimestres_utilizados': datos_prediccion['trimestres_nombres']
+    })
+
+
+@api_async(metodos=('POST',))
+async def predecir_notas_lote(request):
+    """
+    Predecir la nota del tercer trimestre de todos los estudiantes de una
+    materia-curso (materia_curso_id) o de todas las materias de un curso (curso_id)
+    """
+    from usuarios.models import Estudiante
+    from materias.models import MateriaCurso
+
+    serializer = PrediccionLoteSerializer(data=request.datos)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    materia_curso_id = serializer.validated_data.get('materia_curso_id')
+    curso_id = serializer.validated_data.get('curso_id')
+
+    materias_curso = MateriaCurso.objects.select_related('materia')
+    if materia_curso_id:
+        materias_curso = materias_curso.filter(id=materia_curso_id)
+    else:
+        materias_curso = materias_curso.filter(curso_id=curso_id, activo=True)
+    materias_curso = [materia_curso async for materia_curso in materias_curso]
+    if not materias_curso:
+        return JsonResponse({
+            'success': False,
+            'error': 'No se encontraron materias para predecir'
+        }, status=400)
+
+    try:
+        trimestres = await aobtener_trimestres_prediccion()
+    except DatosPrediccionError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    curso_id = curso_id or materias_curso[0].curso_id
+    estudiantes = [
+        estudiante async for estudiante in
+        Estudiante.objects.filter(curso_id=curso_id, usuario__activo=True)
+        .select_related('usuario').order_by('usuario__last_name', 'usuario__first_name')
+    ]
+    datos = await aconstruir_datos_prediccion(
+        trimestres, [mc.id for mc in materias_curso], estudiante_ids=[e.id for e in estudiantes]
+    )
+
+    predicciones = []
+    pendientes = []
+    for materia_curso in materias_curso:
+        for estudiante in estudiantes:
+            datos_ml = datos.get(
+                (estudiante.id, materia_curso.id),
+                f'No se encontró seguimiento del estudiante en {trimestres[0].nombre}'
+            )
+            item = {
+                'estudiante_id': estudiante.id,
+                'estudiante_nombre': f"{estudiante.usuario.first_name} {estudiante.usuario.last_name}",
+                'materia_curso_id': materia_curso.id,
+                'materia': materia_curso.materia.nombre,
+            }
+            if isinstance(datos_ml, str):
+                item.update({'success': False, 'error': datos_ml})
+            else:
+                item['datos_utilizados'] = datos_ml
+                pendientes.append(item)
+            predicciones.append(item)
+
+    resultados = await apredecir_pares({
+        (item['estudiante_id'], item['materia_curso_id']): item['datos_utilizados']
+        for item in pendientes
+    })
+    for item in pendientes:
+        item.update(resultados[(item['estudiante_id'], item['materia_curso_id'])])
+
+    return JsonResponse({
+        'success': True,
+        'trimestres_utilizados': [trimestre.nombre for trimestre in trimestres],
+        'total': len(predicciones),
+        'total_exitosas': sum(1 for item in predicciones if item['success']),
+        'predicciones': predicciones
+    })
@@ -0,0 +1,209 @@
+"""
+Alta masiva de estudiantes, docentes y padres/tutores.
+
+Crear usuarios de a uno tarda sobre todo por el hash de la contraseña
+(PBKDF2 es lento a propósito) y por las consultas de cada alta. Acá:
+
+- las contraseñas se hashean en paralelo en un pool de procesos (el hash es
+  CPU puro, así que los hilos no ayudan por el GIL);
+- los cursos, padres/tutores y roles referenciados se validan con una
+  consulta por tabla para todo el lote;
+- usuarios, roles y perfiles se insertan con bulk_create en una sola
+  transacción: si una fila tiene errores no se crea nada.
+
+Los estudiantes pueden referenciar a su padre/tutor por `padre_tutor_id` o
+por `padre_tutor_email`, que puede ser de un padre/tutor de la misma alta.
+"""
+import csv
+import io
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from cursos.models import Curso
+from .hash_contrasenas import hashear_bloque, inicializar_proceso
+from .models import Docente, Estudiante, PadreTutor, Rol, Usuario
+from .permisos import invalidar_permisos_usuario
+
+TAMANO_LOTE = 1000
+
+ROL_POR_TIPO = {
+    "estudiante": "ESTUDIANTE",
+    "docente": "DOCENTE",
+    "padre_tutor": "PADRE_TUTOR",
+}
+
+CAMPOS_USUARIO = ("email", "first_name", "last_name", "genero", "activo")
+
+
+def leer_archivo(contenido, nombre=""):
+    """
+    Filas de un archivo CSV (con encabezado) o JSON (una lista, o un objeto con
+    la clave "usuarios"). Las celdas vacías del CSV se omiten.
+    """
+    if isinstance(contenido, bytes):
+        contenido = contenido.decode("utf-8-sig")
+    if nombre.lower().endswith(".json") or contenido.lstrip()[:1] in ("[", "{"):
+        datos = json.loads(contenido)
+        return datos.get("usuarios", []) if isinstance(datos, dict) else datos
+    return [
+        {campo.strip(): valor.strip() for campo, valor in fila.items() if campo and valor and valor.strip()}
+        for fila in csv.DictReader(io.StringIO(contenido))
+    ]
+
+
+def hashear_contrasenas(contrasenas, procesos=None):
+    """Hashes de las contraseñas, en el mismo orden, repartidos en un pool de procesos"""
+    procesos = min(procesos or settings.ALTAS_PROCESOS or os.cpu_count() or 1, len(contrasenas))
+    if procesos <= 1 or len(contrasenas) < settings.ALTAS_MINIMO_PARALELO:
+        return hashear_bloque(contrasenas)
+
+    # Varios bloques por proceso para repartir bien la carga sin pasar de a una contraseña
+    tamano = math.ceil(len(contrasenas) / (procesos * 4))
+    bloques = [contrasenas[i:i + tamano] for i in range(0, len(contrasenas), tamano)]
+    # "spawn" y no "fork": un proceso copiado heredaría las conexiones abiertas a la base.
+    # Las funciones del pool están en hash_contrasenas, que se puede importar sin Django configurado
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto, initializer=inicializar_proceso) as ejecutor:
+        return [hash_ for bloque in ejecutor.map(hashear_bloque, bloques) for hash_ in bloque]
+
+
+def validar_referencias(filas):
+    """
+    Validar lo que depende de la base o de otras filas (emails repetidos,
+    cursos, padres/tutores y roles), con una consulta por tabla.
+    Retorna (errores por índice de fila, roles por nombre, ids de padres/tutores por email).
+    """
+    errores = {}
+
+    def error(indice, campo, mensaje):
+        errores.setdefault(indice, {})[campo] = mensaje
+
+    vistos = {}
+    for indice, fila in enumerate(filas):
+        email = fila["email"].lower()
+        if email in vistos:
+            error(indice, "email", f"Email repetido en la fila {vistos[email]}.")
+        vistos.setdefault(email, indice)
+
+    existentes = set(
+        Usuario.objects.filter(email__in=[fila["email"] for fila in filas]).values_list("email", flat=True)
+    )
+    cursos_ids = {fila["curso_id"] for fila in filas if fila.get("curso_id")}
+    cursos = set(Curso.objects.filter(id__in=cursos_ids).values_list("id", flat=True))
+    padres_ids = {fila["padre_tutor_id"] for fila in filas if fila.get("padre_tutor_id")}
+    padres = set(PadreTutor.objects.filter(id__in=padres_ids).values_list("id", flat=True))
+    emails_padres = {fila["padre_tutor_email"] for fila in filas if fila.get("padre_tutor_email")}
+    padres_por_email = dict(
+        PadreTutor.objects.filter(usuario__email__in=emails_padres).values_list("usuario__email", "id")
+    )
+    padres_nuevos = {fila["email"] for fila in filas if fila["tipo"] == "padre_tutor"}
+
+    for indice, fila in enumerate(filas):
+        if fila["email"] in existentes:
+            error(indice, "email", "Ya existe un usuario con este email.")
+        if fila.get("curso_id") and fila["curso_id"] not in cursos:
+            error(indice, "curso_id", f"El curso con ID {fila['curso_id']} no existe")
+        if fila.get("padre_tutor_id") and fila["padre_tutor_id"] not in padres:
+            error(indice, "padre_tutor_id", f"El padre/tutor con ID {fila['padre_tutor_id']} no existe")
+        email_padre = fila.get("padre_tutor_email")
+        if email_padre and email_padre not in padres_por_email and email_padre not in padres_nuevos:
+            error(indice, "padre_tutor_email", f"No hay un padre/tutor con email {email_padre}")
+
+    nombres_roles = {ROL_POR_TIPO[fila["tipo"]] for fila in filas}
+    roles = {rol.nombre: rol for rol in Rol.objects.filter(nombre__in=nombres_roles)}
+    faltantes = sorted(nombres_roles - set(roles))
+    if faltantes:
+        raise serializers.ValidationError({"roles": f"No existen los roles: {', '.join(faltantes)}"})
+    return errores, roles, padres_por_email
+
+
+def crear_usuarios(filas, procesos=None, guardar=True):
+    """
+    Dar de alta las filas ya validadas por FilaAltaSerializer. Lanza
+    ValidationError con los errores por fila si alguna no es válida; si no,
+    crea todo en una transacción (o nada, con guardar=False) y retorna
+    {"creados": cantidad por tipo, "usuarios": [{email, tipo, usuario_id, perfil_id}]}.
+    """
+    errores, roles, padres_por_email = validar_referencias(filas)
+    if errores:
+        raise serializers.ValidationError({"usuarios": {indice: errores[indice] for indice in sorted(errores)}})
+
+    creados = {tipo: sum(1 for fila in filas if fila["tipo"] == tipo) for tipo in ROL_POR_TIPO}
+    if not guardar:
+        return {"creados": creados, "usuarios": []}
+
+    hashes = hashear_contrasenas([fila["password"] for fila in filas], procesos=procesos)
+
+    with transaction.atomic():
+        usuarios = Usuario.objects.bulk_create(
+            [
+                Usuario(password=hash_, **{campo: fila[campo] for campo in CAMPOS_USUARIO if campo in fila})
+                for fila, hash_ in zip(filas, hashes)
+            ],
+            batch_size=TAMANO_LOTE,
+        )
+        Usuario.roles.through.objects.bulk_create(
+            [
+                Usuario.roles.through(usuario_id=usuario.id, rol_id=roles[ROL_POR_TIPO[fila["tipo"]]].id)
+                for fila, usuario in zip(filas, usuarios)
+            ],
+            batch_size=TAMANO_LOTE,
+        )
+
+        # Primero los padres/tutores, para poder asignarlos a los estudiantes de la misma alta
+        perfiles = {}
+        padres = [(indice, usuario) for indice, (fila, usuario) in enumerate(zip(filas, usuarios))
+                  if fila["tipo"] == "padre_tutor"]
+        nuevos = PadreTutor.objects.bulk_create(
+            [PadreTutor(usuario=usuario, parentesco=filas[indice]["parentesco"], telefono=filas[indice]["telefono"])
+             for indice, usuario in padres],
+            batch_size=TAMANO_LOTE,
+        )
+        for (indice, usuario), padre in zip(padres, nuevos):
+            perfiles[indice] = padre.id
+            padres_por_email[usuario.email] = padre.id
+
+        docentes = [(indice, usuario) for indice, (fila, usuario) in enumerate(zip(filas, usuarios))
+                    if fila["tipo"] == "docente"]
+        nuevos = Docente.objects.bulk_create(
+            [Docente(usuario=usuario, especialidad=filas[indice]["especialidad"]) for indice, usuario in docentes],
+            batch_size=TAMANO_LOTE,
+        )
+        perfiles.update((indice, docente.id) for (indice, _), docente in zip(docentes, nuevos))
+
+        estudiantes = [(indice, usuario) for indice, (fila, usuario) in enumerate(zip(filas, usuarios))
+                       if fila["tipo"] == "estudiante"]
+        nuevos = Estudiante.objects.bulk_create(
+            [
+                Estudiante(
+                    usuario=usuario,
+                    direccion=filas[indice]["direccion"],
+                    fecha_nacimiento=filas[indice]["fecha_nacimiento"],
+                    curso_id=filas[indice].get("curso_id") or None,
+                    padre_tutor_id=(
+                        filas[indice].get("padre_tutor_id")
+                        or padres_por_email.get(filas[indice].get("padre_tutor_email"))
+                    ),
+                )
+                for indice, usuario in estudiantes
+            ],
+            batch_size=TAMANO_LOTE,
+        )
+        perfiles.update((indice, estudiante.id) for (indice, _), estudiante in zip(estudiantes, nuevos))
+
+        # bulk_create no dispara m2m_changed: se descartan a mano los roles que pudiera haber en cache
+        usuarios_ids = [usuario.id for usuario in usuarios]
+        transaction.on_commit(lambda: invalidar_permisos_usuario(*usuarios_ids))
+
+    return {
+        "creados": creados,
+        "usuarios": [
+            {"email": usuario.email, "tipo": fila["tipo"], "usuario_id": usuario.id, "perfil_id": perfiles[indice]}
+            for indice, (fila, usuario) in enumerate(zip(filas, usuarios))
+        ],
+    }
@@ -0,0 +1,105 @@
+"""
+Autenticación JWT sin consultar la base en cada request (opcional, se
+activa con JWT_SIN_CONSULTA=True).
+
+`JWTAuthentication` carga el Usuario de la base en cada llamada. Acá el
+usuario se arma con los datos del token (id, email, roles) y solo se
+verifica que la versión de sesión del token siga vigente: la versión y el
+estado del usuario se guardan en cache y se vuelven a leer de la base cuando
+cambian (cambio de contraseña, email o desactivación, o revocación manual).
+Por eso requiere una cache compartida entre procesos (REDIS_URL): con la
+memoria local de cada proceso el descarte no llegaría a los demás.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from .models import Usuario
+
+# Nombre del claim con la versión de sesión del usuario
+CLAIM_VERSION = 'version'
+
+
+def _clave_sesion(usuario_id):
+    return f'sesion_usuario:{usuario_id}'
+
+
+def estado_de_sesion(usuario_id):
+    """
+    (version_sesion, is_active) del usuario desde la cache, o None si no
+    existe. Solo consulta la base cuando no está guardado.
+    """
+    clave = _clave_sesion(usuario_id)
+    estado = cache.get(clave)
+    if estado is None:
+        fila = Usuario.objects.filter(pk=usuario_id).values_list('version_sesion', 'is_active').first()
+        # Los usuarios inexistentes también se guardan, como una lista vacía
+        estado = list(fila) if fila else []
+        cache.set(clave, estado, timeout=settings.JWT_SIN_CONSULTA_CACHE_TIMEOUT)
+    return estado or None
+
+
+def invalidar_sesion(usuario_id):
+    cache.delete(_clave_sesion(usuario_id))
+
+
+def revocar_sesiones(usuario_id):
+    """Invalidar todos los tokens emitidos hasta ahora para el usuario"""
+    Usuario.objects.filter(pk=usuario_id).update(version_sesion=F('version_sesion') + 1)
+    transaction.on_commit(lambda: invalidar_sesion(usuario_id))
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuario liviano armado con los claims del token. No tiene los campos ni
+    las relaciones del modelo: las vistas que los necesiten deben usar
+    `obtener_usuario()`.
+    """
+
+    def __str__(self):
+        return self.email
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def roles(self):
+        return self.token.get('roles', [])
+
+    def obtener_usuario(self):
+        """El Usuario completo (una consulta)"""
+        return Usuario.objects.get(pk=self.id)
+
+
+class JWTSinConsulta(JWTAuthentication):
+    """
+    Igual que JWTAuthentication, pero devuelve un UsuarioToken y solo consulta
+    la base cuando la versión de sesión del usuario no está en cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("El token no identifica a ningún usuario")
+
+        estado = estado_de_sesion(usuario_id)
+        if estado is None:
+            raise AuthenticationFailed("Usuario no encontrado", code="user_not_found")
+
+        version, activo = estado
+        if not activo:
+            raise AuthenticationFailed("El usuario está inactivo", code="user_inactive")
+        # Los tokens emitidos antes de existir el claim cuentan como versión 0
+        if validated_token.get(CLAIM_VERSION, 0) != version:
+            raise AuthenticationFailed(
+                "La sesión ya no es válida, vuelva a iniciar sesión", code="token_revoked"
+            )
+
+        return UsuarioToken(validated_token)
@@ -0,0 +1,19 @@
+"""
+Hash de contraseñas en los procesos del pool del alta masiva (ver altas.py).
+
+Los procesos se crean con "spawn": cada uno importa este módulo para
+encontrar las funciones que ejecuta, antes de que Django esté configurado.
+Por eso acá no se importa ningún modelo ni nada que los cargue; solo
+django.setup() y make_password.
+"""
+import django
+from django.contrib.auth.hashers import make_password
+
+
+def inicializar_proceso():
+    # El proceso nuevo hereda DJANGO_SETTINGS_MODULE, pero no la configuración cargada
+    django.setup()
+
+
+def hashear_bloque(contrasenas):
+    return [make_password(contrasena) for contrasena in contrasenas]
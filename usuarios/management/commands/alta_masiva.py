@@ -0,0 +1,55 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+from usuarios.altas import crear_usuarios, leer_archivo
+from usuarios.serializers import AltaMasivaSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Da de alta estudiantes, docentes y padres/tutores desde un archivo CSV o JSON, "
+        "hasheando las contraseñas en paralelo y creando todo en una sola transacción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Archivo .csv (con encabezado) o .json')
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=None,
+            help='Procesos para hashear las contraseñas (por defecto ALTAS_PROCESOS o uno por CPU)',
+        )
+        parser.add_argument('--simular', action='store_true', help='Solo validar el archivo, sin crear nada')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                filas = leer_archivo(archivo.read(), options['archivo'])
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+
+        serializer = AltaMasivaSerializer(data={'usuarios': filas})
+        inicio = time.perf_counter()
+        try:
+            serializer.is_valid(raise_exception=True)
+            resultado = crear_usuarios(
+                serializer.validated_data['usuarios'], procesos=options['procesos'], guardar=not options['simular']
+            )
+        except serializers.ValidationError as e:
+            errores = e.detail.get('usuarios', e.detail) if isinstance(e.detail, dict) else e.detail
+            if isinstance(errores, dict):
+                for indice, error in errores.items():
+                    self.stderr.write(f'Fila {indice}: {error}')
+            elif isinstance(errores, list):
+                for indice, error in enumerate(errores):
+                    if error:
+                        self.stderr.write(f'Fila {indice}: {error}')
+            else:
+                self.stderr.write(str(errores))
+            raise CommandError('El archivo tiene errores; no se creó ningún usuario')
+
+        creados = ', '.join(f'{cantidad} {tipo}' for tipo, cantidad in resultado['creados'].items())
+        accion = 'validados' if options['simular'] else 'creados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{accion.capitalize()}: {creados} (en {time.perf_counter() - inicio:.1f} s)'
+        ))
@@ -0,0 +1,127 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from usuarios.revocacion import FiltroRevocacion, purgar_tokens_vencidos
+
+# Tamaño aproximado de un refresh token firmado
+TOKEN_DE_EJEMPLO = 'x' * 300
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la verificación de tokens revocados (consulta a la base vs filtro en memoria) y "
+        "la purga de tokens vencidos sobre un año de tokens sintéticos. Todo se deshace al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=365, help='Días de tokens a generar (por defecto 365)')
+        parser.add_argument('--por-dia', type=int, default=1000, help='Tokens emitidos por día (por defecto 1000)')
+        parser.add_argument(
+            '--revocados',
+            type=float,
+            default=0.3,
+            help='Proporción de tokens revocados por logout (por defecto 0.3)',
+        )
+        parser.add_argument('--consultas', type=int, default=5000, help='Refresh simulados (por defecto 5000)')
+        parser.add_argument('--lote', type=int, default=5000, help='Tamaño de lote de la purga (por defecto 5000)')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._medir(options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _generar(self, options):
+        azar = random.Random(1)
+        ahora = timezone.now()
+        total = options['dias'] * options['por_dia']
+        tokens = []
+        for indice in range(total):
+            creado = ahora - timedelta(days=options['dias']) + timedelta(seconds=indice * 86400 / options['por_dia'])
+            tokens.append(OutstandingToken(
+                jti=uuid.uuid4().hex, token=TOKEN_DE_EJEMPLO, created_at=creado, expires_at=creado + timedelta(days=1),
+            ))
+        # Solo se usan los tokens generados acá, no los que ya había en la base
+        ultimo_id = OutstandingToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        OutstandingToken.objects.bulk_create(tokens, batch_size=5000)
+        tokens = list(OutstandingToken.objects.filter(id__gt=ultimo_id).values_list('id', 'jti', 'expires_at'))
+        revocados = [token for token in tokens if azar.random() < options['revocados']]
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id, _, _ in revocados], batch_size=5000
+        )
+
+        # Los refresh usan tokens vigentes: la mayoría válidos y algunos revocados
+        ids_revocados = {token_id for token_id, _, _ in revocados}
+        vigentes = [token for token in tokens if token[2] > ahora]
+        validos = [jti for token_id, jti, _ in vigentes if token_id not in ids_revocados]
+        de_baja = [jti for token_id, jti, _ in vigentes if token_id in ids_revocados]
+        muestra = [
+            azar.choice(de_baja) if de_baja and azar.random() < 0.05 else azar.choice(validos or de_baja)
+            for _ in range(options['consultas'])
+        ]
+        return total, len(revocados), muestra, set(de_baja)
+
+    def _verificar_en_base(self, muestra):
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as consultas:
+            revocados = {jti for jti in muestra if BlacklistedToken.objects.filter(token__jti=jti).exists()}
+        return revocados, time.perf_counter() - inicio, len(consultas.captured_queries)
+
+    def _verificar_con_filtro(self, muestra):
+        filtro = FiltroRevocacion()
+        inicio = time.perf_counter()
+        filtro.puede_estar_revocado('')
+        construccion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as consultas:
+            revocados = {
+                jti for jti in muestra
+                if filtro.puede_estar_revocado(jti) and BlacklistedToken.objects.filter(token__jti=jti).exists()
+            }
+        return revocados, time.perf_counter() - inicio, len(consultas.captured_queries), construccion
+
+    def _informar(self, titulo, cantidad, duracion, consultas):
+        self.stdout.write(
+            f'{titulo}: {duracion / cantidad * 1e6:.0f} µs por refresh, {consultas} consultas '
+            f'para {cantidad} refresh'
+        )
+
+    def _medir(self, options):
+        inicio = time.perf_counter()
+        total, revocados, muestra, esperados = self._generar(options)
+        self.stdout.write(
+            f'{total} tokens emitidos en {options["dias"]} días, {revocados} revocados '
+            f'(generados en {time.perf_counter() - inicio:.1f} s)'
+        )
+
+        en_base, duracion, consultas = self._verificar_en_base(muestra)
+        self._informar('Lista negra en la base', len(muestra), duracion, consultas)
+
+        con_filtro, duracion, consultas, construccion = self._verificar_con_filtro(muestra)
+        self._informar('Filtro en memoria', len(muestra), duracion, consultas)
+        self.stdout.write(f'Construcción del filtro: {construccion * 1000:.0f} ms')
+        if not (en_base == con_filtro == (esperados & set(muestra))):
+            self.stdout.write(self.style.ERROR('Los métodos no coinciden'))
+
+        inicio = time.perf_counter()
+        borrados, borrados_revocados = purgar_tokens_vencidos(lote=options['lote'])
+        self.stdout.write(
+            f'Purga: {borrados} tokens vencidos ({borrados_revocados} revocados) en '
+            f'{time.perf_counter() - inicio:.1f} s, quedan {OutstandingToken.objects.count()}'
+        )
+
+        _, duracion, consultas = self._verificar_en_base(muestra)
+        self._informar('Lista negra en la base después de purgar', len(muestra), duracion, consultas)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from usuarios.revocacion import TAMANO_LOTE_PURGA, purgar_tokens_vencidos
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra por lotes los tokens JWT vencidos de la lista de emitidos y de la lista negra. "
+        "Pensado para ejecutarse periódicamente (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE_PURGA,
+            help=f'Tokens borrados por transacción (por defecto {TAMANO_LOTE_PURGA})',
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0,
+            help='Segundos de espera entre lotes, para no cargar la base (por defecto 0)',
+        )
+        parser.add_argument('--simular', action='store_true', help='Solo contar los tokens vencidos')
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+        if options['simular']:
+            vencidos = OutstandingToken.objects.filter(expires_at__lte=ahora)
+            revocados = BlacklistedToken.objects.filter(token__expires_at__lte=ahora)
+            self.stdout.write(
+                f'{vencidos.count()} tokens vencidos, {revocados.count()} de ellos revocados '
+                f'(de {OutstandingToken.objects.count()} emitidos)'
+            )
+            return
+
+        tokens, revocados = purgar_tokens_vencidos(lote=max(1, options['lote']), pausa=options['pausa'], hasta=ahora)
+        self.stdout.write(self.style.SUCCESS(
+            f'Se borraron {tokens} tokens vencidos ({revocados} de ellos revocados)'
+        ))
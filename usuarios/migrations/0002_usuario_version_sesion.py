@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='version_sesion',
+            field=models.PositiveIntegerField(default=0, help_text='Se incrementa para invalidar los tokens emitidos (cambio de contraseña, desactivación...)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0002_usuario_version_sesion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['-id'], name='usuario_activo_idx'),
+        ),
+    ]
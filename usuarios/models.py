@@ -31,10 +31,20 @@ class Usuario(AbstractUser):
     )
     activo = models.BooleanField(default=True)
     roles = models.ManyToManyField(Rol, blank=True)
+    version_sesion = models.PositiveIntegerField(
+        default=0,
+        help_text="Se incrementa para invalidar los tokens emitidos (cambio de contraseña, desactivación...)"
+    )
 
     USERNAME_FIELD = "email"  # Usamos email como campo principal
     REQUIRED_FIELDS = []  # No necesitamos campos adicionales requeridos
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Listados paginados de usuarios activos (ORDER BY id DESC) y joins usuario__activo=True
+            models.Index(fields=['-id'], condition=models.Q(activo=True), name='usuario_activo_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -0,0 +1,126 @@
+"""
+Roles y permisos efectivos de cada usuario, guardados en cache.
+
+Se cargan con una sola consulta (usuario → roles → permisos) para uno o
+varios usuarios a la vez y se descartan cuando cambian los roles de un
+usuario, los permisos de un rol, o se modifica un rol o un permiso (ver
+usuarios/signals.py). El descarte solo llega a todos los procesos si la cache
+es compartida; con memoria local, settings limita PERMISOS_CACHE_TIMEOUT.
+"""
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import permissions
+from .models import Usuario
+
+# Versión global: cambiarla descarta los permisos guardados de todos los usuarios
+# (se usa cuando cambian los permisos de un rol, o un rol o un permiso)
+CLAVE_VERSION = 'permisos_usuario:version'
+
+UsuarioRol = Usuario.roles.through
+
+
+def _version():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(CLAVE_VERSION, version, timeout=None)
+        version = cache.get(CLAVE_VERSION, version)
+    return version
+
+
+def _clave_usuario(usuario_id, version=None):
+    return f'permisos_usuario:{version or _version()}:{usuario_id}'
+
+
+def cargar_roles(usuarios_ids):
+    """
+    Roles (con sus permisos) de varios usuarios con una sola consulta sobre la
+    tabla intermedia Usuario.roles. Retorna {usuario_id: [rol, ...]}.
+    """
+    roles = {usuario_id: {} for usuario_id in usuarios_ids}
+    filas = (
+        UsuarioRol.objects.filter(usuario_id__in=list(usuarios_ids))
+        .order_by('rol_id', 'rol__permisos__id')
+        .values_list('usuario_id', 'rol_id', 'rol__nombre', 'rol__permisos__nombre')
+    )
+    for usuario_id, rol_id, rol_nombre, permiso in filas:
+        rol = roles[usuario_id].setdefault(rol_id, {"id": rol_id, "nombre": rol_nombre, "permisos": []})
+        if permiso is not None:
+            rol["permisos"].append(permiso)
+    return {usuario_id: list(por_rol.values()) for usuario_id, por_rol in roles.items()}
+
+
+def roles_de_usuarios(usuarios_ids):
+    """Roles de varios usuarios desde la cache; los que faltan se cargan con una consulta"""
+    usuarios_ids = set(usuarios_ids)
+    if not usuarios_ids:
+        return {}
+    version = _version()
+    claves = {_clave_usuario(usuario_id, version): usuario_id for usuario_id in usuarios_ids}
+    guardados = cache.get_many(list(claves))
+    roles = {claves[clave]: valor for clave, valor in guardados.items()}
+
+    faltantes = usuarios_ids - roles.keys()
+    if faltantes:
+        cargados = cargar_roles(faltantes)
+        cache.set_many(
+            {_clave_usuario(usuario_id, version): valor for usuario_id, valor in cargados.items()},
+            timeout=settings.PERMISOS_CACHE_TIMEOUT,
+        )
+        roles.update(cargados)
+    return roles
+
+
+def roles_de_usuario(usuario_id):
+    """Roles (con sus permisos) de un usuario"""
+    return roles_de_usuarios([usuario_id])[usuario_id]
+
+
+def nombres_de_roles(usuario_id):
+    return [rol["nombre"] for rol in roles_de_usuario(usuario_id)]
+
+
+def permisos_de_usuario(usuario_id):
+    """Nombres de todos los permisos del usuario (la unión de los de sus roles)"""
+    return {permiso for rol in roles_de_usuario(usuario_id) for permiso in rol["permisos"]}
+
+
+def invalidar_permisos_usuario(*usuarios_ids):
+    """Descartar los permisos guardados de uno o varios usuarios"""
+    usuarios_ids = [usuario_id for usuario_id in usuarios_ids if usuario_id]
+    if usuarios_ids:
+        version = _version()
+        cache.delete_many([_clave_usuario(usuario_id, version) for usuario_id in usuarios_ids])
+
+
+def invalidar_permisos():
+    """Descartar los permisos guardados de todos los usuarios"""
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+
+
+class TieneRolOPermiso(permissions.BasePermission):
+    """
+    Permite el acceso a usuarios autenticados que tengan alguno de los
+    `roles_permitidos` de la vista y todos sus `permisos_requeridos`
+    (si la vista no define uno de los dos, esa condición no se exige).
+
+        class MiVista(APIView):
+            permission_classes = [TieneRolOPermiso]
+            roles_permitidos = ('ADMINISTRADOR',)
+    """
+    message = "No tiene los roles o permisos necesarios para esta acción."
+
+    def has_permission(self, request, view):
+        usuario = request.user
+        if not (usuario and usuario.is_authenticated):
+            return False
+
+        roles = roles_de_usuario(usuario.id)
+        roles_permitidos = getattr(view, 'roles_permitidos', ())
+        if roles_permitidos and not any(rol["nombre"] in roles_permitidos for rol in roles):
+            return False
+
+        permisos_requeridos = getattr(view, 'permisos_requeridos', ())
+        permisos = {permiso for rol in roles for permiso in rol["permisos"]}
+        return all(permiso in permisos for permiso in permisos_requeridos)
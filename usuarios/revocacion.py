@@ -0,0 +1,191 @@
+"""
+Consulta rápida de tokens revocados (lista negra de simplejwt).
+
+Cada refresh verifica que el token no esté en BlacklistedToken, lo que es una
+consulta por llamada sobre una tabla que crece con cada logout. Acá cada
+proceso mantiene un filtro de Bloom con los `jti` revocados y vigentes:
+
+- si el `jti` no está en el filtro, el token seguro no está revocado y no se
+  consulta la base (el caso de casi todos los refresh);
+- si está (revocado o falso positivo, ~1%), se consulta la base como siempre.
+
+El filtro se construye desde la base y se actualiza con las revocaciones
+nuevas: en el mismo proceso al instante, y las de otros procesos cuando
+cambia la versión guardada en cache o cada REVOCACION_INTERVALO segundos.
+Cada REVOCACION_RECONSTRUCCION segundos se reconstruye para olvidar los
+tokens vencidos.
+
+El aviso entre procesos depende de la cache: sin cache compartida
+(CACHE_COMPARTIDA) un token revocado en un proceso podría renovarse en otro
+hasta su próxima actualización, así que el filtro no se usa y cada refresh
+consulta la lista negra.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Cambia con cada revocación, para que los demás procesos actualicen su filtro
+CLAVE_VERSION = 'revocacion:version'
+
+TAMANO_LOTE_PURGA = 5000
+
+# Margen al pedir las revocaciones nuevas, por las transacciones que
+# confirman después de haber registrado la fecha
+SOLAPAMIENTO = timedelta(minutes=1)
+
+
+class FiltroBloom:
+    """Conjunto aproximado: puede dar falsos positivos, nunca falsos negativos"""
+
+    def __init__(self, capacidad, falsos_positivos=0.01):
+        self.capacidad = max(capacidad, 1)
+        self.bits = max(64, int(-self.capacidad * math.log(falsos_positivos) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacidad * math.log(2)))
+        self.elementos = 0
+        self._datos = bytearray((self.bits + 7) // 8)
+
+    def _posiciones(self, valor):
+        # Doble hash: k posiciones a partir de un solo digest
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], 'little')
+        b = int.from_bytes(digest[8:], 'little') | 1
+        return [(a + i * b) % self.bits for i in range(self.hashes)]
+
+    def agregar(self, valor):
+        for posicion in self._posiciones(valor):
+            self._datos[posicion >> 3] |= 1 << (posicion & 7)
+        self.elementos += 1
+
+    def __contains__(self, valor):
+        return all(self._datos[posicion >> 3] & (1 << (posicion & 7)) for posicion in self._posiciones(valor))
+
+
+class FiltroRevocacion:
+    """Filtro de Bloom de los tokens revocados de este proceso, con su actualización"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._filtro = None
+        self._desde = None
+        self._version = None
+        self._construido_en = 0
+        self._revisado_en = 0
+        self.consultas_evitadas = 0
+        self.consultas_base = 0
+
+    def _reconstruir(self):
+        ahora = timezone.now()
+        jtis = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=ahora)
+            .values_list('token__jti', flat=True)
+            .iterator(chunk_size=10000)
+        )
+        # Con el doble de capacidad hay lugar para las revocaciones hasta la próxima reconstrucción
+        filtro = FiltroBloom(
+            max(2 * len(jtis), settings.REVOCACION_CAPACIDAD_MINIMA), settings.REVOCACION_FALSOS_POSITIVOS
+        )
+        for jti in jtis:
+            filtro.agregar(jti)
+        self._filtro = filtro
+        self._desde = ahora
+        self._construido_en = time.monotonic()
+
+    def _actualizar(self):
+        ahora = timezone.now()
+        nuevos = BlacklistedToken.objects.filter(
+            blacklisted_at__gte=self._desde - SOLAPAMIENTO
+        ).values_list('token__jti', flat=True)
+        for jti in nuevos:
+            self._filtro.agregar(jti)
+        self._desde = ahora
+        if self._filtro.elementos > self._filtro.capacidad:
+            self._reconstruir()
+
+    def _asegurar_vigente(self):
+        ahora = time.monotonic()
+        version = cache.get(CLAVE_VERSION)
+        if self._filtro is None or ahora - self._construido_en > settings.REVOCACION_RECONSTRUCCION:
+            self._reconstruir()
+        elif version != self._version or ahora - self._revisado_en > settings.REVOCACION_INTERVALO:
+            self._actualizar()
+        else:
+            return
+        self._version = version
+        self._revisado_en = ahora
+
+    def puede_estar_revocado(self, jti):
+        """False si el token seguro no está revocado; True si hay que consultar la base"""
+        with self._lock:
+            self._asegurar_vigente()
+            if jti in self._filtro:
+                self.consultas_base += 1
+                return True
+            self.consultas_evitadas += 1
+            return False
+
+    def agregar(self, jti):
+        """Registrar una revocación hecha en este proceso"""
+        with self._lock:
+            if self._filtro is not None:
+                self._filtro.agregar(jti)
+
+
+filtro_revocacion = FiltroRevocacion()
+
+
+def registrar_revocacion(jti):
+    """Agregar el token al filtro local y avisar a los demás procesos"""
+    filtro_revocacion.agregar(jti)
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+
+
+class RefreshTokenConFiltro(RefreshToken):
+    """RefreshToken que solo consulta la lista negra si el filtro no descarta el token"""
+
+    def check_blacklist(self):
+        if not settings.CACHE_COMPARTIDA or filtro_revocacion.puede_estar_revocado(
+            self.payload[api_settings.JTI_CLAIM]
+        ):
+            super().check_blacklist()
+
+
+def purgar_tokens_vencidos(lote=TAMANO_LOTE_PURGA, pausa=0, hasta=None):
+    """
+    Borrar por lotes los tokens vencidos (OutstandingToken) y su revocación
+    (BlacklistedToken), cada lote en su propia transacción para no bloquear
+    las tablas. Retorna (tokens borrados, cuántos de ellos estaban revocados).
+    """
+    hasta = hasta or timezone.now()
+    total_tokens = total_revocados = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=hasta)
+            .order_by('id')
+            .values_list('id', flat=True)[:lote]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            revocados, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            # only('id'): no traer el texto de cada token solo para borrarlo
+            tokens, _ = OutstandingToken.objects.filter(id__in=ids).only('id').delete()
+        total_tokens += tokens
+        total_revocados += revocados
+        if len(ids) < lote:
+            break
+        if pausa:
+            time.sleep(pausa)
+    return total_tokens, total_revocados
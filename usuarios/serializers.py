@@ -1,10 +1,40 @@
+from django.db import models
 from rest_framework import serializers
 from .models import Usuario, Estudiante, Docente, PadreTutor, Rol, Permiso
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .autenticacion import CLAIM_VERSION
+from .permisos import nombres_de_roles, roles_de_usuario, roles_de_usuarios
+from .revocacion import RefreshTokenConFiltro
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from cursos.serializers import CursoSerializer
 
 
-class UsuarioSerializer(serializers.ModelSerializer):
+class RolesListSerializer(serializers.ListSerializer):
+    """Obtiene los roles de todos los usuarios del listado de una vez (cache + una consulta)"""
+
+    def to_representation(self, data):
+        elementos = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.roles_precargados = roles_de_usuarios(self.child.usuario_id(obj) for obj in elementos)
+        return super().to_representation(elementos)
+
+
+class ConRolesMixin:
+    """Roles del usuario desde usuarios.permisos, sin recorrer roles y permisos por objeto"""
+    roles_precargados = None
+
+    def usuario_id(self, obj):
+        return obj.id if isinstance(obj, Usuario) else obj.usuario_id
+
+    def roles_de(self, obj):
+        usuario_id = self.usuario_id(obj)
+        if self.roles_precargados and usuario_id in self.roles_precargados:
+            return self.roles_precargados[usuario_id]
+        return roles_de_usuario(usuario_id)
+
+    def get_roles(self, obj):
+        return [rol["nombre"] for rol in self.roles_de(obj)]
+
+
+class UsuarioSerializer(ConRolesMixin, serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
 
     class Meta:
@@ -20,6 +50,7 @@ class UsuarioSerializer(serializers.ModelSerializer):
             "password",
         ]
         extra_kwargs = {"password": {"write_only": True}}
+        list_serializer_class = RolesListSerializer
 
     def create(self, validated_data):
         roles = validated_data.pop("roles", [])
@@ -33,14 +64,7 @@ class UsuarioSerializer(serializers.ModelSerializer):
         return user
 
     def get_roles(self, obj):
-        return [
-            {
-                "id": rol.id,
-                "nombre": rol.nombre,
-                "permisos": [permiso.nombre for permiso in rol.permisos.all()]
-            }
-            for rol in obj.roles.all()
-        ]
+        return self.roles_de(obj)
 
 class EstudianteCreateSerializer(serializers.ModelSerializer):
     """Serializer para CREAR estudiantes - solo campos necesarios"""
@@ -173,7 +197,7 @@ class EstudianteUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class EstudianteSerializer(serializers.ModelSerializer):
+class EstudianteSerializer(ConRolesMixin, serializers.ModelSerializer):
     """Serializer para LEER estudiantes - incluye todos los datos"""
     email = serializers.EmailField(source='usuario.email', read_only=True)
     first_name = serializers.CharField(source='usuario.first_name', read_only=True)
@@ -200,9 +224,7 @@ class EstudianteSerializer(serializers.ModelSerializer):
             "curso",
         ]
         read_only_fields = ["id"]
-
-    def get_roles(self, obj):
-        return [rol.nombre for rol in obj.usuario.roles.all()]
+        list_serializer_class = RolesListSerializer
 
     def get_padre_tutor(self, obj):
         if obj.padre_tutor:
@@ -235,7 +257,7 @@ class EstudianteSimpleSerializer(serializers.ModelSerializer):
         return None
 
 
-class DocenteSerializer(serializers.ModelSerializer):
+class DocenteSerializer(ConRolesMixin, serializers.ModelSerializer):
     email = serializers.EmailField(write_only=True, required=False)
     first_name = serializers.CharField(write_only=True, required=False)
     last_name = serializers.CharField(write_only=True, required=False)
@@ -259,9 +281,7 @@ class DocenteSerializer(serializers.ModelSerializer):
             "especialidad",
         ]
         read_only_fields = ["id", "roles"]
-
-    def get_roles(self, obj):
-        return [rol.nombre for rol in obj.usuario.roles.all()]
+        list_serializer_class = RolesListSerializer
 
     def create(self, validated_data):
         especialidad = validated_data.pop("especialidad")
@@ -292,12 +312,12 @@ class DocenteSerializer(serializers.ModelSerializer):
         data["last_name"] = docente.usuario.last_name
         data["genero"] = docente.usuario.genero
         data["activo"] = docente.usuario.activo
-        data["roles"] = [rol.nombre for rol in docente.usuario.roles.all()]
+        data["roles"] = self.get_roles(docente)
         data["especialidad"] = docente.especialidad
         return data
 
 
-class PadreTutorSerializer(serializers.ModelSerializer):
+class PadreTutorSerializer(ConRolesMixin, serializers.ModelSerializer):
     email = serializers.EmailField(write_only=True, required=False)
     first_name = serializers.CharField(write_only=True, required=False)
     last_name = serializers.CharField(write_only=True, required=False)
@@ -325,9 +345,7 @@ class PadreTutorSerializer(serializers.ModelSerializer):
             "password",
         ]
         read_only_fields = ["id", "roles", "estudiantes"]
-
-    def get_roles(self, obj):
-        return [rol.nombre for rol in obj.usuario.roles.all()]
+        list_serializer_class = RolesListSerializer
 
     def get_estudiantes(self, obj):
         estudiantes = obj.estudiantes.all()
@@ -365,18 +383,66 @@ class PadreTutorSerializer(serializers.ModelSerializer):
         data["last_name"] = padre_tutor.usuario.last_name
         data["genero"] = padre_tutor.usuario.genero
         data["activo"] = padre_tutor.usuario.activo
-        data["roles"] = [rol.nombre for rol in padre_tutor.usuario.roles.all()]
+        data["roles"] = self.get_roles(padre_tutor)
         data["parentesco"] = padre_tutor.parentesco
         data["telefono"] = padre_tutor.telefono
         return data
 
 
+class FilaAltaSerializer(serializers.Serializer):
+    """Una fila del alta masiva: un estudiante, docente o padre/tutor con su usuario"""
+    tipo = serializers.ChoiceField(choices=["estudiante", "docente", "padre_tutor"])
+    email = serializers.EmailField()
+    first_name = serializers.CharField(required=False, allow_blank=True, default="")
+    last_name = serializers.CharField(required=False, allow_blank=True, default="")
+    genero = serializers.ChoiceField(choices=Usuario.GENERO_CHOICES, required=False, allow_null=True)
+    activo = serializers.BooleanField(required=False, default=True)
+    password = serializers.CharField(write_only=True)
+    # Estudiante
+    direccion = serializers.CharField(required=False)
+    fecha_nacimiento = serializers.DateField(required=False)
+    curso_id = serializers.IntegerField(required=False, allow_null=True)
+    padre_tutor_id = serializers.IntegerField(required=False, allow_null=True)
+    padre_tutor_email = serializers.EmailField(
+        required=False,
+        allow_null=True,
+        help_text="Email del padre/tutor, ya existente o incluido en la misma alta",
+    )
+    # Docente
+    especialidad = serializers.CharField(required=False)
+    # Padre/tutor
+    parentesco = serializers.CharField(required=False)
+    telefono = serializers.CharField(required=False)
+
+    CAMPOS_POR_TIPO = {
+        "estudiante": ("direccion", "fecha_nacimiento"),
+        "docente": ("especialidad",),
+        "padre_tutor": ("parentesco", "telefono"),
+    }
+
+    def validate(self, attrs):
+        faltantes = {
+            campo: "Este campo es requerido." for campo in self.CAMPOS_POR_TIPO[attrs["tipo"]] if campo not in attrs
+        }
+        if faltantes:
+            raise serializers.ValidationError(faltantes)
+        if attrs.get("padre_tutor_id") and attrs.get("padre_tutor_email"):
+            raise serializers.ValidationError("Indique padre_tutor_id o padre_tutor_email, no ambos.")
+        return attrs
+
+
+class AltaMasivaSerializer(serializers.Serializer):
+    usuarios = FilaAltaSerializer(many=True, allow_empty=False)
+    simular = serializers.BooleanField(required=False, default=False)
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token["email"] = user.email
-        token["roles"] = [rol.nombre for rol in user.roles.all()]
+        token["roles"] = nombres_de_roles(user.id)
+        token[CLAIM_VERSION] = user.version_sesion
         return token
 
     def validate(self, attrs):
@@ -387,6 +453,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class TokenRefreshConFiltroSerializer(TokenRefreshSerializer):
+    """Refresh que consulta la lista negra solo si el filtro de revocados no descarta el token"""
+    token_class = RefreshTokenConFiltro
+
+
 class PermisoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Permiso
@@ -0,0 +1,86 @@
+# usuarios/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .models import Permiso, Rol, Usuario
+from .autenticacion import invalidar_sesion
+from .permisos import invalidar_permisos, invalidar_permisos_usuario
+from .revocacion import registrar_revocacion
+
+# Los permisos guardados se descartan al confirmar la transacción, para que
+# una lectura concurrente no vuelva a guardar los roles anteriores
+
+
+@receiver(m2m_changed, sender=Usuario.roles.through)
+def roles_de_usuario_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        usuario_id = instance.pk
+        transaction.on_commit(lambda: invalidar_permisos_usuario(usuario_id))
+    elif pk_set:
+        # Se modificaron los usuarios de un rol
+        usuarios_ids = list(pk_set)
+        transaction.on_commit(lambda: invalidar_permisos_usuario(*usuarios_ids))
+    else:
+        # post_clear desde el rol no informa qué usuarios tenía
+        transaction.on_commit(invalidar_permisos)
+
+
+@receiver(m2m_changed, sender=Rol.permisos.through)
+def permisos_de_rol_modificados(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidar_permisos)
+
+
+@receiver(post_save, sender=Rol)
+@receiver(post_delete, sender=Rol)
+@receiver(post_save, sender=Permiso)
+@receiver(post_delete, sender=Permiso)
+def rol_o_permiso_modificado(sender, **kwargs):
+    transaction.on_commit(invalidar_permisos)
+
+
+# Cambios del usuario que invalidan los tokens ya emitidos
+CAMPOS_DE_SESION = ('password', 'email', 'is_active', 'activo')
+
+
+@receiver(pre_save, sender=Usuario)
+def recordar_datos_de_sesion(sender, instance, update_fields=None, **kwargs):
+    instance._revocar_sesiones = False
+    if not instance.pk:
+        return
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_DE_SESION):
+        # Ej: el login solo actualiza last_login
+        return
+    anteriores = Usuario.objects.filter(pk=instance.pk).values_list('version_sesion', *CAMPOS_DE_SESION).first()
+    if anteriores is None:
+        return
+    version, anteriores = anteriores[0], anteriores[1:]
+    instance._revocar_sesiones = anteriores != tuple(getattr(instance, campo) for campo in CAMPOS_DE_SESION)
+    # Se parte de la versión guardada, para que una instancia vieja no deshaga una revocación
+    instance.version_sesion = version + 1 if instance._revocar_sesiones else version
+
+
+@receiver(post_save, sender=Usuario)
+def usuario_modificado(sender, instance, update_fields=None, **kwargs):
+    if not getattr(instance, '_revocar_sesiones', False):
+        return
+    if update_fields is not None and 'version_sesion' not in update_fields:
+        Usuario.objects.filter(pk=instance.pk).update(version_sesion=instance.version_sesion)
+    usuario_id = instance.pk
+    transaction.on_commit(lambda: invalidar_sesion(usuario_id))
+
+
+@receiver(post_delete, sender=Usuario)
+def usuario_eliminado(sender, instance, **kwargs):
+    usuario_id = instance.pk
+    transaction.on_commit(lambda: invalidar_sesion(usuario_id))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_revocado(sender, instance, created, **kwargs):
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: registrar_revocacion(jti))
@@ -1,3 +1,266 @@
-from django.test import TestCase
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from .altas import hashear_contrasenas
+from .autenticacion import JWTSinConsulta, revocar_sesiones
+from .models import Docente, Estudiante, PadreTutor, Permiso, Rol, Usuario
+from .permisos import TieneRolOPermiso, permisos_de_usuario, roles_de_usuarios
+from .revocacion import CLAVE_VERSION, FiltroBloom, filtro_revocacion
+from .serializers import CustomTokenObtainPairSerializer, TokenRefreshConFiltroSerializer
 
-# Create your tests here.
+
+class PermisosCacheTests(TestCase):
+    """Roles y permisos guardados en cache, descartados cuando cambian"""
+
+    def setUp(self):
+        cache.clear()
+        self.docente = Rol.objects.create(nombre='DOCENTE')
+        self.docente.permisos.add(Permiso.objects.create(nombre='ver_notas'))
+        self.usuarios = [Usuario.objects.create(email=f'usuario{i}@escuela.test') for i in range(3)]
+        for usuario in self.usuarios:
+            usuario.roles.add(self.docente)
+
+    def test_una_consulta_para_varios_usuarios(self):
+        ids = [usuario.id for usuario in self.usuarios]
+        with self.assertNumQueries(1):
+            roles = roles_de_usuarios(ids)
+        self.assertEqual(roles[ids[0]], [{'id': self.docente.id, 'nombre': 'DOCENTE', 'permisos': ['ver_notas']}])
+        with self.assertNumQueries(0):
+            roles_de_usuarios(ids)
+
+    def test_cambio_de_roles_del_usuario(self):
+        usuario = self.usuarios[0]
+        permisos_de_usuario(usuario.id)
+        admin = Rol.objects.create(nombre='ADMINISTRADOR')
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.permisos.add(Permiso.objects.create(nombre='editar_notas'))
+            usuario.roles.add(admin)
+        self.assertEqual(permisos_de_usuario(usuario.id), {'ver_notas', 'editar_notas'})
+
+    def test_cambio_de_permisos_del_rol(self):
+        for usuario in self.usuarios:
+            permisos_de_usuario(usuario.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.docente.permisos.clear()
+        for usuario in self.usuarios:
+            self.assertEqual(permisos_de_usuario(usuario.id), set())
+
+    def test_permiso_de_la_vista(self):
+        vista = mock.Mock(roles_permitidos=('DOCENTE',), permisos_requeridos=('ver_notas',))
+        request = mock.Mock(user=self.usuarios[0])
+        self.assertTrue(TieneRolOPermiso().has_permission(request, vista))
+        vista.permisos_requeridos = ('editar_notas',)
+        self.assertFalse(TieneRolOPermiso().has_permission(request, vista))
+
+
+class JWTSinConsultaTests(TestCase):
+    """Autenticación con los datos del token y la versión de sesión en cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create(email='ana@escuela.test')
+        self.usuario.roles.add(Rol.objects.create(nombre='DOCENTE'))
+
+    def token(self):
+        return CustomTokenObtainPairSerializer.get_token(self.usuario).access_token
+
+    def autenticar(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        usuario, _ = JWTSinConsulta().authenticate(request)
+        return usuario
+
+    def test_sin_consultas_con_la_sesion_en_cache(self):
+        token = self.token()
+        with self.assertNumQueries(1):
+            usuario = self.autenticar(token)
+        self.assertEqual((usuario.id, usuario.email, usuario.roles), (self.usuario.id, 'ana@escuela.test', ['DOCENTE']))
+        with self.assertNumQueries(0):
+            self.autenticar(token)
+
+    def test_token_sin_version(self):
+        # Los tokens emitidos antes de la versión de sesión siguen valiendo
+        token = RefreshToken.for_user(self.usuario).access_token
+        self.assertEqual(self.autenticar(token).id, self.usuario.id)
+
+    def test_cambio_de_contrasena_revoca_los_tokens(self):
+        token = self.token()
+        self.autenticar(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.set_password('Otra-clave-segura')
+            self.usuario.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+        # Un token nuevo tiene la versión actual
+        self.assertEqual(self.autenticar(self.token()).id, self.usuario.id)
+
+    def test_usuario_desactivado(self):
+        token = self.token()
+        self.autenticar(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.is_active = False
+            self.usuario.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+
+    def test_revocar_sesiones(self):
+        token = self.token()
+        self.autenticar(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            revocar_sesiones(self.usuario.id)
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar(token)
+
+    def test_requiere_cache_compartida(self):
+        entorno = {**os.environ, 'JWT_SIN_CONSULTA': 'True'}
+        entorno.pop('REDIS_URL', None)
+        resultado = subprocess.run(
+            [sys.executable, '-c', 'import backend.settings'], env=entorno, capture_output=True, text=True
+        )
+        self.assertNotEqual(resultado.returncode, 0)
+        self.assertIn('requiere una cache compartida', resultado.stderr)
+
+
+class FiltroRevocacionTests(TestCase):
+    """Un token revocado en otro proceso no se puede renovar"""
+
+    def setUp(self):
+        cache.clear()
+        filtro_revocacion.reiniciar()
+        self.addCleanup(filtro_revocacion.reiniciar)
+        self.refresh = RefreshToken.for_user(Usuario.objects.create(email='ana@escuela.test'))
+
+    def revocar_en_otro_proceso(self):
+        # El filtro de este proceso ya está construido y no recibe la señal de la revocación
+        filtro_revocacion.puede_estar_revocado(uuid.uuid4().hex)
+        token = OutstandingToken.objects.get(jti=self.refresh['jti'])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token)])
+
+    def renovar(self):
+        serializer = TokenRefreshConFiltroSerializer(data={'refresh': str(self.refresh)})
+        return serializer.is_valid(raise_exception=True)
+
+    def test_renovacion(self):
+        self.assertTrue(self.renovar())
+
+    @override_settings(CACHE_COMPARTIDA=False)
+    def test_sin_cache_compartida_consulta_la_lista_negra(self):
+        self.revocar_en_otro_proceso()
+        with self.assertRaises(TokenError):
+            self.renovar()
+
+    @override_settings(CACHE_COMPARTIDA=True)
+    def test_con_cache_compartida_el_aviso_actualiza_el_filtro(self):
+        self.revocar_en_otro_proceso()
+        # registrar_revocacion() del otro proceso cambia la versión en la cache compartida
+        cache.set(CLAVE_VERSION, uuid.uuid4().hex, timeout=None)
+        with self.assertRaises(TokenError):
+            self.renovar()
+
+    def test_revocacion_local(self):
+        # El logout de este proceso se ve enseguida, sin esperar la actualización del filtro
+        filtro_revocacion.puede_estar_revocado(uuid.uuid4().hex)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.refresh.blacklist()
+        self.assertTrue(filtro_revocacion.puede_estar_revocado(self.refresh['jti']))
+        with self.assertRaises(TokenError):
+            self.renovar()
+
+    def test_filtro_bloom_sin_falsos_negativos(self):
+        filtro = FiltroBloom(1000)
+        valores = [uuid.uuid4().hex for _ in range(1000)]
+        for valor in valores:
+            filtro.agregar(valor)
+        self.assertTrue(all(valor in filtro for valor in valores))
+        falsos_positivos = sum(uuid.uuid4().hex in filtro for _ in range(10000))
+        self.assertLess(falsos_positivos, 300)
+
+
+class PurgarTokensTests(TestCase):
+
+    def test_borra_solo_los_vencidos(self):
+        usuario = Usuario.objects.create(email='ana@escuela.test')
+        # Tres vencidos y dos vigentes
+        vencimientos = [timezone.now() + timedelta(days=dias) for dias in (-3, -2, -1, 1, 2)]
+        tokens = [
+            OutstandingToken.objects.create(user=usuario, jti=uuid.uuid4().hex, token='-', expires_at=vencimiento)
+            for vencimiento in vencimientos
+        ]
+        BlacklistedToken.objects.create(token=tokens[0])
+        BlacklistedToken.objects.create(token=tokens[4])
+
+        salida = io.StringIO()
+        call_command('purgar_tokens', lote=2, stdout=salida)
+        self.assertIn('Se borraron 3 tokens vencidos (1 de ellos revocados)', salida.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.order_by('id')), tokens[3:])
+        self.assertEqual(BlacklistedToken.objects.get().token, tokens[4])
+
+
+class HashContrasenasTests(SimpleTestCase):
+
+    @override_settings(ALTAS_MINIMO_PARALELO=2)
+    def test_hash_en_pool_de_procesos(self):
+        # Los procesos "spawn" importan las funciones del pool antes de django.setup()
+        contrasenas = [f'Clave-segura-{i}' for i in range(4)]
+        hashes = hashear_contrasenas(contrasenas, procesos=2)
+        self.assertEqual(len(hashes), 4)
+        for contrasena, hash_ in zip(contrasenas, hashes):
+            self.assertTrue(check_password(contrasena, hash_))
+
+
+class AltaMasivaTests(TestCase):
+    """Alta masiva desde un CSV: todo en una transacción, o nada si alguna fila tiene errores"""
+
+    CSV = (
+        'tipo,email,first_name,password,parentesco,telefono,direccion,fecha_nacimiento,padre_tutor_email,especialidad\n'
+        'padre_tutor,padre@escuela.test,Luis,Clave-segura-1,Padre,555-0101,,,,\n'
+        'estudiante,hija@escuela.test,Ana,Clave-segura-2,,,Calle 1,2012-04-01,padre@escuela.test,\n'
+        'docente,docente@escuela.test,Sofía,Clave-segura-3,,,,,,Música\n'
+    )
+
+    def setUp(self):
+        for nombre in ('ESTUDIANTE', 'DOCENTE', 'PADRE_TUTOR'):
+            Rol.objects.create(nombre=nombre)
+
+    def alta(self, contenido, *argumentos):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as archivo:
+            archivo.write(contenido)
+            archivo.flush()
+            salida = io.StringIO()
+            call_command('alta_masiva', archivo.name, *argumentos, stdout=salida, stderr=salida)
+        return salida.getvalue()
+
+    def test_alta(self):
+        self.alta(self.CSV)
+        estudiante = Estudiante.objects.select_related('usuario', 'padre_tutor__usuario').get()
+        self.assertEqual(estudiante.padre_tutor.usuario.email, 'padre@escuela.test')
+        self.assertTrue(estudiante.usuario.check_password('Clave-segura-2'))
+        self.assertEqual(Docente.objects.get().especialidad, 'Música')
+        self.assertEqual(
+            dict(Usuario.objects.values_list('email', 'roles__nombre')),
+            {'padre@escuela.test': 'PADRE_TUTOR', 'hija@escuela.test': 'ESTUDIANTE', 'docente@escuela.test': 'DOCENTE'},
+        )
+
+    def test_simular(self):
+        self.assertIn('Validados: 1 estudiante, 1 docente, 1 padre_tutor', self.alta(self.CSV, '--simular'))
+        self.assertFalse(Usuario.objects.exists())
+
+    def test_una_fila_con_errores_no_crea_nada(self):
+        Usuario.objects.create(email='docente@escuela.test')
+        with self.assertRaises(CommandError):
+            self.alta(self.CSV)
+        self.assertEqual(Usuario.objects.count(), 1)
+        self.assertFalse(PadreTutor.objects.exists())
@@ -7,12 +7,13 @@ from .views import (
     EstudianteListCreateView, EstudianteDetailView,
     DocenteListCreateView, DocenteDetailView,
     PadreTutorListCreateView, PadreTutorDetailView,
-    CrearAdminView, DocenteHorariosView
+    CrearAdminView, DocenteHorariosView, AltaMasivaView
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
     path('usuarios/', UsuarioListCreateView.as_view(), name='usuario-list-create'),
+    path('usuarios/alta-masiva/', AltaMasivaView.as_view(), name='usuario-alta-masiva'),
     path('usuarios/<int:pk>/', UsuarioDetailView.as_view(), name='usuario-detail'),
     path('login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -1,16 +1,20 @@
+from django.db.models import Prefetch
 from django.shortcuts import render
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from .revocacion import RefreshTokenConFiltro
 from .models import Usuario, Estudiante, Docente, PadreTutor, Rol, Permiso
-from .serializers import UsuarioSerializer, CustomTokenObtainPairSerializer, RolSerializer, PermisoSerializer, EstudianteSerializer, EstudianteCreateSerializer, EstudianteUpdateSerializer, DocenteSerializer, PadreTutorSerializer, CrearAdminSerializer
+from .serializers import UsuarioSerializer, CustomTokenObtainPairSerializer, RolSerializer, PermisoSerializer, EstudianteSerializer, EstudianteCreateSerializer, EstudianteUpdateSerializer, DocenteSerializer, PadreTutorSerializer, CrearAdminSerializer, AltaMasivaSerializer
 from rest_framework import serializers
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import action
-from horarios.models import Horario
-from materias.models import MateriaCurso
+from horarios.proyecciones import obtener_horario_docente
+from backend.paginacion import PaginacionCursor
+from .altas import crear_usuarios, leer_archivo
+from .permisos import TieneRolOPermiso
 
 # Create your views here.
 
@@ -18,6 +22,7 @@ class UsuarioListCreateView(generics.ListCreateAPIView):
     queryset = Usuario.objects.filter(activo=True)
     serializer_class = UsuarioSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacionCursor
 
 class UsuarioDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Usuario.objects.filter(activo=True)
@@ -37,7 +42,7 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = RefreshTokenConFiltro(refresh_token)
             token.blacklist()
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
@@ -66,16 +71,17 @@ class PermisoDetailView(generics.RetrieveUpdateDestroyAPIView):
 class DocenteListCreateView(generics.ListCreateAPIView):
     serializer_class = DocenteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacionCursor
 
     def get_queryset(self):
-        return Docente.objects.filter(usuario__activo=True)
+        return Docente.objects.filter(usuario__activo=True).select_related('usuario')
 
 class DocenteDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = DocenteSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Docente.objects.filter(usuario__activo=True)
+        return Docente.objects.filter(usuario__activo=True).select_related('usuario')
 
     def perform_destroy(self, instance):
         # Realizar eliminación lógica del usuario asociado
@@ -85,9 +91,10 @@ class DocenteDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 class EstudianteListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacionCursor
 
     def get_queryset(self):
-        return Estudiante.objects.filter(usuario__activo=True)
+        return Estudiante.objects.filter(usuario__activo=True).select_related('usuario', 'curso', 'padre_tutor__usuario')
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -108,7 +115,7 @@ class EstudianteDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Estudiante.objects.filter(usuario__activo=True)
+        return Estudiante.objects.filter(usuario__activo=True).select_related('usuario', 'curso', 'padre_tutor__usuario')
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -137,16 +144,27 @@ class EstudianteDetailView(generics.RetrieveUpdateDestroyAPIView):
 class PadreTutorListCreateView(generics.ListCreateAPIView):
     serializer_class = PadreTutorSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PaginacionCursor
 
     def get_queryset(self):
-        return PadreTutor.objects.filter(usuario__activo=True)
+        estudiantes = Estudiante.objects.select_related('usuario', 'curso')
+        return (
+            PadreTutor.objects.filter(usuario__activo=True)
+            .select_related('usuario')
+            .prefetch_related(Prefetch('estudiantes', queryset=estudiantes))
+        )
 
 class PadreTutorDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PadreTutorSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return PadreTutor.objects.filter(usuario__activo=True)
+        estudiantes = Estudiante.objects.select_related('usuario', 'curso')
+        return (
+            PadreTutor.objects.filter(usuario__activo=True)
+            .select_related('usuario')
+            .prefetch_related(Prefetch('estudiantes', queryset=estudiantes))
+        )
 
     def perform_destroy(self, instance):
         # Realizar eliminación lógica del usuario asociado
@@ -177,36 +195,44 @@ class CrearAdminView(APIView):
         user.roles.add(admin_role)
         return Response({'mensaje': 'Usuario administrador creado correctamente.'}, status=201)
 
+class AltaMasivaView(APIView):
+    """
+    Alta de muchos estudiantes, docentes y padres/tutores en una sola
+    transacción. Recibe JSON ({"usuarios": [...]}) o un archivo CSV/JSON en el
+    campo `archivo`. Solo para administradores.
+    """
+    permission_classes = [TieneRolOPermiso]
+    roles_permitidos = ("ADMINISTRADOR",)
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    @swagger_auto_schema(request_body=AltaMasivaSerializer)
+    def post(self, request):
+        datos = request.data
+        archivo = request.FILES.get("archivo")
+        if archivo is not None:
+            try:
+                filas = leer_archivo(archivo.read(), archivo.name)
+            except (ValueError, UnicodeDecodeError) as e:
+                return Response({"error": f"No se pudo leer el archivo: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+            datos = {"usuarios": filas, "simular": request.data.get("simular", False)}
+
+        serializer = AltaMasivaSerializer(data=datos)
+        serializer.is_valid(raise_exception=True)
+        resultado = crear_usuarios(
+            serializer.validated_data["usuarios"], guardar=not serializer.validated_data["simular"]
+        )
+        codigo = status.HTTP_200_OK if serializer.validated_data["simular"] else status.HTTP_201_CREATED
+        return Response(resultado, status=codigo)
+
 class DocenteHorariosView(APIView):
     """Vista para obtener todos los horarios asignados a un docente"""
     
     def get(self, request, pk):
         try:
-            docente = Docente.objects.get(pk=pk)
-            
-            # Obtener todos los horarios del docente
-            horarios = Horario.objects.filter(
-                materia_cursos__docente=docente
-            ).distinct().order_by('dia_semana', 'hora_inicio')
+            docente = Docente.objects.select_related('usuario').get(pk=pk)
             
-            horarios_data = []
-            for horario in horarios:
-                # Obtener la información de materia y curso para este horario
-                materia_curso = MateriaCurso.objects.filter(
-                    docente=docente,
-                    horarios=horario
-                ).first()
-                
-                if materia_curso:
-                    horarios_data.append({
-                        'horario_id': horario.id,
-                        'nombre': horario.nombre,
-                        'dia_semana': horario.dia_semana,
-                        'hora_inicio': horario.hora_inicio,
-                        'hora_fin': horario.hora_fin,
-                        'materia': materia_curso.materia.nombre,
-                        'curso': f"{materia_curso.curso.nombre} - {materia_curso.curso.turno}"
-                    })
+            # Proyección precalculada (una consulta, guardada en cache por docente)
+            horarios_data = obtener_horario_docente(docente.pk)
             
             return Response({
                 'docente': f"{docente.usuario.first_name} {docente.usuario.last_name}",